@@ -0,0 +1,107 @@
+"""
+Compares the placement engines, and the placement strategies of the rectangles engine, on
+how densely they pack words and how fast they place them.
+
+Run from the root of the repository with `python -m benchmarks.placement_engines`.
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from wrdcld import ENGINES, STRATEGIES, LiveLayout, count_words
+from wrdcld.font import FontWrapper
+from wrdcld.layout import LAYOUT_BACKGROUND_COLOR
+from wrdcld.metrics import WordMetrics
+
+
+def run(
+    engine: str,
+    strategy: str,
+    word_counts,
+    width: int,
+    height: int,
+    minimum_font_size: int,
+    seed: int,
+):
+    font = FontWrapper(
+        color_func=lambda _: (255, 255, 255),
+        path=FontWrapper.default_font(),
+        size=100,
+        metrics=WordMetrics(FontWrapper.default_font()),
+    )
+    layout = LiveLayout(
+        width,
+        height,
+        font,
+        minimum_font_size,
+        math.sqrt,
+        engine,
+        rng=random.Random(seed),
+        strategy=STRATEGIES[strategy],
+    )
+    renderable_words = layout.renderable_words(word_counts)
+
+    start = time.perf_counter()
+    placements = layout.place_words(renderable_words)
+    seconds = time.perf_counter() - start
+
+    words_placed = sum(placement is not None for placement in placements)
+    canvas = np.asarray(layout.canvas.crop((0, 0, width, height)))
+    ink = (canvas != LAYOUT_BACKGROUND_COLOR).any(axis=-1).mean()
+
+    return {
+        "engine": engine,
+        "strategy": strategy,
+        "canvas": f"{width}x{height}",
+        "words": len(renderable_words),
+        "placed": words_placed,
+        "filled": f"{ink:.1%}",
+        "words/s": f"{words_placed / seconds:.0f}",
+        "ms/word": f"{1000 * seconds / len(renderable_words):.2f}",
+        "seconds": f"{seconds:.2f}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default="examples/dancingmen.txt")
+    parser.add_argument(
+        "--sizes", nargs="+", default=["500x500", "1000x800", "2000x1500"]
+    )
+    parser.add_argument("--minimum-font-size", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    word_counts = count_words([args.corpus])
+
+    rows = []
+    for size in args.sizes:
+        width, height = map(int, size.split("x"))
+        for engine in ENGINES:
+            # the strategies only apply to the rectangles engine
+            strategies = STRATEGIES if engine == "rectangles" else ["largest"]
+            for strategy in strategies:
+                rows.append(
+                    run(
+                        engine,
+                        strategy,
+                        word_counts,
+                        width,
+                        height,
+                        args.minimum_font_size,
+                        args.seed,
+                    )
+                )
+
+    columns = list(rows[0])
+    print("  ".join(f"{column:>15}" for column in columns))
+    for row in rows:
+        print("  ".join(f"{row[column]:>15}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
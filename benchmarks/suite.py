@@ -0,0 +1,297 @@
+"""
+Measures the word cloud pipeline on synthetic Zipf corpora, over a grid of corpus sizes,
+canvas sizes and font size ranges, and writes the results as JSON.
+
+The corpora follow a Zipf law, steeper or flatter so that about a tenth of their words
+are common enough to be drawn, so larger vocabularies also give larger layouts.
+
+Every case runs in a fresh process, so the caches start empty and the peak memory of a
+case isn't hidden by the ones before it. The peak memory of each stage is the peak
+resident memory while it ran on Linux; elsewhere the peak can only grow, so a stage
+shows the largest peak so far, and it isn't measured at all on Windows. The corpora and
+the layouts are seeded, so the same commit places the same words on every run.
+
+Run from the root of the repository with `python -m benchmarks.suite`, and compare two
+runs with `python -m benchmarks.suite --compare before.json after.json`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from datetime import datetime, timezone
+from pathlib import Path
+
+from wrdcld import collect_stats, compute_layout, count_words, render
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore[assignment]
+
+PRESETS = {
+    "quick": {
+        "words": [100, 10_000],
+        "canvases": ["500x500", "2000x1500"],
+        "font_ranges": ["10-100"],
+    },
+    "full": {
+        "words": [100, 1_000, 10_000, 100_000, 1_000_000],
+        "canvases": ["500x500", "1000x1000", "1920x1080", "3840x2160", "7680x4320"],
+        "font_ranges": ["5-50", "10-100", "20-300"],
+    },
+}
+
+# the most common word appears this many times
+ZIPF_TOP_COUNT = 1000
+# the share of the words of a corpus that are common enough to be drawn
+DRAWN_SHARE = 0.1
+
+
+def zipf_exponent(
+    unique_words: int, minimum_font_size: int, maximum_font_size: int
+) -> float:
+    """
+    Returns the exponent s of a Zipf law, where the word of rank r appears about
+    `ZIPF_TOP_COUNT / r**s` times, at which about `DRAWN_SHARE` of the words are common
+    enough to be drawn.
+
+    With the default square root scaling, a word is drawn if it appears at least
+    `(minimum_font_size / maximum_font_size) ** 2` times as often as the most common
+    one. With a fixed exponent that only depends on the rank, so the number of drawn
+    words wouldn't grow with the vocabulary.
+    """
+    drawn = max(2, round(unique_words * DRAWN_SHARE))
+    return 2 * math.log(maximum_font_size / minimum_font_size) / math.log(drawn)
+
+
+def write_zipf_corpus(path: Path, unique_words: int, seed: int, exponent: float = 1.0):
+    """
+    Writes a text file with `unique_words` distinct made-up words, where the word of
+    rank r appears about `ZIPF_TOP_COUNT / r**exponent` times (and at least once), in a
+    random order.
+    """
+    rng = random.Random(seed)
+
+    words: set[str] = set()
+    while len(words) < unique_words:
+        length = rng.randint(3, 10)
+        words.add("".join(rng.choices(string.ascii_lowercase, k=length)))
+    ranked = sorted(words)
+    rng.shuffle(ranked)
+
+    tokens = [
+        word
+        for rank, word in enumerate(ranked, start=1)
+        for _ in range(max(1, round(ZIPF_TOP_COUNT / rank**exponent)))
+    ]
+    rng.shuffle(tokens)
+
+    with open(path, "w", encoding="utf-8") as file:
+        for start in range(0, len(tokens), 20):
+            file.write(" ".join(tokens[start : start + 20]))
+            file.write("\n")
+
+
+def _reset_peak_rss():
+    """
+    Resets the peak resident memory of this process to its current size, on Linux.
+    """
+    with suppress(OSError):
+        Path("/proc/self/clear_refs").write_text("5", encoding="ascii")
+
+
+def _peak_rss() -> int | None:
+    with suppress(OSError):
+        status = Path("/proc/self/status").read_text(encoding="ascii")
+        match = re.search(r"VmHWM:\s+(\d+) kB", status)
+        if match:
+            return int(match.group(1)) * 1024
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(
+    unique_words: int,
+    width: int,
+    height: int,
+    minimum_font_size: int,
+    maximum_font_size: int,
+    seed: int,
+) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = Path(directory) / "corpus.txt"
+        write_zipf_corpus(
+            corpus,
+            unique_words,
+            seed,
+            zipf_exponent(unique_words, minimum_font_size, maximum_font_size),
+        )
+
+        with collect_stats() as stats:
+            wall = {}
+            peak_rss = {}
+
+            _reset_peak_rss()
+            start = time.perf_counter()
+            word_counts = count_words([corpus], processes=1)
+            wall["count_words"] = time.perf_counter() - start
+            peak_rss["count_words"] = _peak_rss()
+
+            _reset_peak_rss()
+            start = time.perf_counter()
+            layout = compute_layout(
+                word_counts,
+                width=width,
+                height=height,
+                minimum_font_size=minimum_font_size,
+                maximum_font_size=maximum_font_size,
+                seed=seed,
+            )
+            wall["compute_layout"] = time.perf_counter() - start
+            peak_rss["compute_layout"] = _peak_rss()
+
+            _reset_peak_rss()
+            start = time.perf_counter()
+            render(layout)
+            wall["render"] = time.perf_counter() - start
+            peak_rss["render"] = _peak_rss()
+            wall["total"] = sum(wall.values())
+
+    peaks = [peak for peak in peak_rss.values() if peak is not None]
+    return {
+        "unique_words": unique_words,
+        "canvas": f"{width}x{height}",
+        "font_range": f"{minimum_font_size}-{maximum_font_size}",
+        "seed": seed,
+        "words_placed": len(layout.words),
+        "wall_seconds": wall,
+        # stage times are inclusive, e.g. placement includes fill_space_around_word
+        "stages": {
+            stage: {"calls": stage_stats.calls, "seconds": stage_stats.seconds}
+            for stage, stage_stats in stats.stages.items()
+        },
+        "peak_rss_bytes": max(peaks) if peaks else None,
+        "stage_peak_rss_bytes": peak_rss,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(words, canvases, font_ranges, seed: int) -> dict:
+    cases = []
+    for unique_words in words:
+        for canvas in canvases:
+            width, height = (int(value) for value in canvas.split("x"))
+            for font_range in font_ranges:
+                minimum, maximum = (int(value) for value in font_range.split("-"))
+                cases.append((unique_words, width, height, minimum, maximum))
+
+    results = []
+    for case in cases:
+        # a new process per case, one case at a time, so they don't compete for the CPU
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(run_case, *case, seed).result()
+        peak = result["peak_rss_bytes"]
+        print(
+            f"{result['unique_words']:>9} words  {result['canvas']:>9}  "
+            f"{result['font_range']:>6}  {result['words_placed']:>5} placed  "
+            f"{result['wall_seconds']['total']:8.2f}s  "
+            + (f"{peak / 2**20:8.0f} MiB" if peak is not None else "       - MiB"),
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    return {
+        "commit": _commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare(before: dict, after: dict):
+    """
+    Prints the ratio of the total time and peak memory of every case in both runs.
+    """
+
+    def key(result):
+        return result["unique_words"], result["canvas"], result["font_range"]
+
+    before_results = {key(result): result for result in before["results"]}
+    print(f"{before['commit']} -> {after['commit']}")
+    for result in after["results"]:
+        old = before_results.get(key(result))
+        if old is None:
+            continue
+        time_ratio = result["wall_seconds"]["total"] / old["wall_seconds"]["total"]
+        memory = (
+            f"memory x{result['peak_rss_bytes'] / old['peak_rss_bytes']:.2f}"
+            if result["peak_rss_bytes"] and old["peak_rss_bytes"]
+            else "memory -"
+        )
+        print(
+            f"{result['unique_words']:>9} words  {result['canvas']:>9}  "
+            f"{result['font_range']:>6}  time x{time_ratio:.2f}  {memory}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--words", type=int, nargs="+")
+    parser.add_argument("--canvases", nargs="+")
+    parser.add_argument("--font-ranges", nargs="+")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after = (
+            json.loads(Path(path).read_text(encoding="utf-8")) for path in args.compare
+        )
+        compare(before, after)
+        return
+
+    preset = PRESETS[args.preset]
+    report = run_suite(
+        args.words or preset["words"],
+        args.canvases or preset["canvases"],
+        args.font_ranges or preset["font_ranges"],
+        args.seed,
+    )
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
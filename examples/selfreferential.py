@@ -1,25 +1,21 @@
-import os
-import re
 from pathlib import Path
 
-from wrdcld import make_word_cloud
+from wrdcld import Tokenizer, count_words, make_word_cloud
 
 FOLDER_PATH = Path("wrdcld")
 
-all_text = ""
-for filename in os.listdir(FOLDER_PATH):
-    if filename.endswith(".py"):
-        with open(FOLDER_PATH / filename, "r", encoding="utf-8") as f:
-            all_text += f.read()
+# count_words starts worker processes, which import this module again on platforms
+# that spawn them, so nothing may run at import time
+if __name__ == "__main__":
+    word_counts = count_words(
+        sorted(FOLDER_PATH.glob("*.py")),
+        tokenizer=Tokenizer(pattern=r"[a-zA-Z0-9_]+", strip_chars=""),
+    )
 
-cleaned_text = re.sub(r"[^a-zA-Z0-9_\s]", " ", all_text)
-all_words = cleaned_text.split()
+    img = make_word_cloud(
+        all_words=word_counts,
+        minimum_font_size=5,
+        word_padding=3,
+    )
 
-
-img = make_word_cloud(
-    all_words=all_words,
-    minimum_font_size=5,
-    word_padding=3,
-)
-
-img.show()
+    img.show()
@@ -1,11 +1,4 @@
-from pathlib import Path
-
-from wrdcld import make_word_cloud
-
-contents = Path("examples/dancingmen.txt").read_text(encoding="utf-8")
-
-all_words = [word.strip(" \n,.!?:-&\"'[]") for word in contents.split(" ")]
-all_words = [word for word in all_words if word]
+from wrdcld import count_words, make_word_cloud
 
 
 def color_func(frequency):
@@ -13,11 +6,16 @@ def color_func(frequency):
     return (x, x, x)
 
 
-img = make_word_cloud(
-    all_words=all_words,
-    font_color_func=color_func,
-    background_color=(255, 255, 255),
-    minimum_font_size=5,
-)
+# count_words can start worker processes, which import this module again on platforms
+# that spawn them, so nothing may run at import time
+if __name__ == "__main__":
+    word_counts = count_words(["examples/dancingmen.txt"])
+
+    img = make_word_cloud(
+        all_words=word_counts,
+        font_color_func=color_func,
+        background_color=(255, 255, 255),
+        minimum_font_size=5,
+    )
 
-img.show()
+    img.show()
@@ -0,0 +1,35 @@
+import hypothesis.strategies as st
+from PIL import Image, ImageChops
+
+
+def two_images_are_equal(image1, image2):
+    return ImageChops.difference(image1, image2).getbbox() is None
+
+
+def frequency_color(frequency):
+    """
+    a font_color_func that gives every frequency its own color
+    """
+    return (round(255 * frequency), 100, 7)
+
+
+@st.composite
+def paste_strategy(draw, max_x, max_y):
+    """
+    generate a color, a position up to (max_x, max_y) and a mask to paste onto a canvas
+    """
+    width = draw(st.integers(min_value=1, max_value=20))
+    height = draw(st.integers(min_value=1, max_value=20))
+    mask = Image.new("L", (width, height))
+    mask.putdata(
+        draw(
+            st.lists(
+                st.integers(0, 255), min_size=width * height, max_size=width * height
+            )
+        )
+    )
+    xy = (draw(st.integers(-30, max_x)), draw(st.integers(-30, max_y)))
+    color = draw(
+        st.tuples(st.integers(0, 255), st.integers(0, 255), st.integers(0, 255))
+    )
+    return color, xy, mask
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase
+
+from PIL import ImageChops
+
+from wrdcld import LayoutCancelled, make_word_cloud, make_word_cloud_async
+
+WORD_COUNTS = Counter(
+    {f"word{index}": count for index, count in enumerate(range(60, 0, -2))}
+)
+# takes a few seconds to lay out in full
+LARGE_WORD_COUNTS = Counter(
+    {f"word{index}": 10**5 // (index + 1) for index in range(5000)}
+)
+LARGE_PARAMS = {
+    "width": 1500,
+    "height": 1200,
+    "minimum_font_size": 4,
+    "maximum_font_size": 200,
+    "seed": 0,
+}
+
+
+class TestMakeWordCloudAsync(IsolatedAsyncioTestCase):
+    async def test_same_as_make_word_cloud(self):
+        image = await make_word_cloud_async(WORD_COUNTS, width=300, height=200, seed=0)
+        expected = make_word_cloud(WORD_COUNTS, width=300, height=200, seed=0)
+
+        self.assertIsNone(ImageChops.difference(image, expected).getbbox())
+
+    async def test_concurrent_renders_are_reproducible(self):
+        seeds = range(6)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            images = await asyncio.gather(
+                *(
+                    make_word_cloud_async(
+                        WORD_COUNTS, executor=executor, width=300, height=200, seed=seed
+                    )
+                    for seed in seeds
+                )
+            )
+
+        for seed, image in zip(seeds, images):
+            expected = make_word_cloud(WORD_COUNTS, width=300, height=200, seed=seed)
+            self.assertEqual(image.tobytes(), expected.tobytes())
+
+    async def test_cancelling_stops_the_render(self):
+        limit = asyncio.Semaphore(1)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            task = asyncio.create_task(
+                make_word_cloud_async(
+                    LARGE_WORD_COUNTS, executor=executor, limit=limit, **LARGE_PARAMS
+                )
+            )
+            await asyncio.sleep(0.3)
+            self.assertTrue(limit.locked())
+
+            start = time.perf_counter()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+            # the render gives up its slot as soon as it has stopped
+            async with limit:
+                self.assertLess(time.perf_counter() - start, 1)
+
+    def test_cancel_event(self):
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(LayoutCancelled):
+            make_word_cloud(WORD_COUNTS, width=300, height=200, cancel=cancel)
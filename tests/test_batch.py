@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from PIL import Image
+
+from wrdcld import job_seed, make_word_cloud, make_word_clouds
+
+JOBS = [
+    (["alpha", "beta", "beta", "gamma"] * 3, {}),
+    (["delta", "epsilon", "epsilon"], {"width": 300, "height": 200}),
+    (["zeta", "eta", "eta", "eta"], {"seed": 7}),
+]
+
+
+class TestBatch(TestCase):
+    def test_batch_matches_serial_run(self):
+        results = list(make_word_clouds(JOBS, seed="batch", max_workers=2))
+
+        self.assertEqual([result.index for result in results], [0, 1, 2])
+        self.assertEqual(results[2].seed, 7)
+
+        for result, (words, params) in zip(results, JOBS):
+            params = {"seed": job_seed("batch", result.index), **params}
+            expected = make_word_cloud(words, **params)
+            self.assertEqual(result.image.tobytes(), expected.tobytes())
+
+    def test_unordered_encoded_results(self):
+        results = list(
+            make_word_clouds(JOBS, max_workers=2, image_format="PNG", ordered=False)
+        )
+
+        self.assertEqual(sorted(result.index for result in results), [0, 1, 2])
+        for result in results:
+            self.assertIsInstance(result.image, bytes)
+            self.assertTrue(result.image.startswith(b"\x89PNG"))
+
+    def test_batch_returns_images(self):
+        (result,) = make_word_clouds(JOBS[:1], max_workers=1)
+        self.assertIsInstance(result.image, Image.Image)
+
+    def test_iterable_words(self):
+        words = [("alpha", 3), ("beta", 1)]
+        (result,) = make_word_clouds([(iter(words), {"seed": 1})], max_workers=1)
+        expected = make_word_cloud(words, seed=1)
+        self.assertEqual(result.image.tobytes(), expected.tobytes())
+
+    def test_return_exceptions(self):
+        jobs = [
+            JOBS[0],
+            (["theta"], {"maximum_font_size": 5}),
+            ValueError("unreadable"),
+        ]
+        results = list(make_word_clouds(jobs, max_workers=1, return_exceptions=True))
+
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, AssertionError)
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertEqual(results[2].seed, job_seed(0, 2))
+        self.assertRaises(AssertionError, list, make_word_clouds(jobs[1:2]))
+
+    def test_image_format_of_a_job(self):
+        jobs = [(*JOBS[0], "JPEG"), JOBS[1]]
+        results = list(make_word_clouds(jobs, max_workers=1, image_format="PNG"))
+        self.assertTrue(results[0].image.startswith(b"\xff\xd8"))
+        self.assertTrue(results[1].image.startswith(b"\x89PNG"))
@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from wrdcld.cache import BoundedLRU
+
+
+class TestBoundedLRU(TestCase):
+    def test_hits_and_misses(self):
+        cache: BoundedLRU[str, int] = BoundedLRU(max_size=10)
+
+        self.assertEqual(cache.get_or_create("a", lambda: 1), 1)
+        self.assertEqual(cache.get_or_create("a", lambda: 2), 1)
+
+        stats = cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache: BoundedLRU[str, str] = BoundedLRU(max_size=6, sizeof=len)
+        cache.get_or_create("a", lambda: "aaa")
+        cache.get_or_create("b", lambda: "bbb")
+        cache.get_or_create("a", lambda: "aaa")
+        cache.get_or_create("c", lambda: "cc")
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.size, 5)
+
+        cache.resize(0)
+        self.assertEqual(len(cache), 0)
+
+    def test_values_over_budget_are_not_cached(self):
+        cache: BoundedLRU[str, str] = BoundedLRU(max_size=2, sizeof=len)
+        self.assertEqual(cache.get_or_create("a", lambda: "aaa"), "aaa")
+        self.assertEqual(len(cache), 0)
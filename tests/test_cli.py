@@ -0,0 +1,168 @@
+import base64
+import io
+import json
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from collections import Counter
+from pathlib import Path
+from unittest import TestCase
+
+from PIL import Image
+
+from wrdcld import job_seed, make_word_cloud
+from wrdcld.cli import WordCloudServer, main, parse_job, run_batch
+
+JOBS = [
+    {"id": "counts", "words": {"alpha": 3, "beta": 1}, "params": {"width": 200}},
+    {"words": ["gamma", "delta", "delta"], "params": {"seed": 7}, "format": "jpeg"},
+    {"id": "bad", "words": ["epsilon"], "params": {"maximum_font_size": 5}},
+    {
+        "words": [["zeta", 2], ["eta", 1]],
+        "params": {"height": 150, "background_color": [0, 0, 0]},
+    },
+]
+
+
+class TestParseJob(TestCase):
+    def test_parse_job(self):
+        words, params, image_format = parse_job(JOBS[3])
+
+        self.assertEqual(words, [("zeta", 2), ("eta", 1)])
+        self.assertEqual(params, {"height": 150, "background_color": (0, 0, 0)})
+        self.assertEqual(image_format, "PNG")
+        self.assertEqual(parse_job(JOBS[0])[0], Counter({"alpha": 3, "beta": 1}))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            Image.new("L", (10, 10)).save(root / "mask.png")
+            job = {"words": ["a"], "params": {"mask": "mask.png"}}
+
+            _, params, _ = parse_job(job, file_root=root)
+            self.assertEqual(params["mask"].size, (10, 10))
+
+            for path in ("../mask.png", str(root.parent / "mask.png"), "/etc/hosts"):
+                with self.subTest(path=path):
+                    job = {"words": ["a"], "params": {"font_path": path}}
+                    self.assertRaises(PermissionError, parse_job, job, file_root=root)
+            self.assertRaises(PermissionError, parse_job, job, allow_files=False)
+
+
+class TestBatch(TestCase):
+    def test_batch(self):
+        lines = (
+            [json.dumps(job) for job in JOBS[:2]]
+            + ["", "not json"]
+            + [json.dumps(job) for job in JOBS[2:]]
+        )
+        output = io.StringIO()
+
+        failures = run_batch(lines, output, max_workers=2, seed="cron")
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(failures, 2)
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual(results[0]["id"], "counts")
+        self.assertEqual(results[1]["seed"], 7)
+        self.assertEqual(results[1]["format"], "JPEG")
+        self.assertIn("JSONDecodeError", results[2]["error"])
+        self.assertEqual(results[3]["id"], "bad")
+        self.assertIn("AssertionError", results[3]["error"])
+
+        for result, job in ((results[0], JOBS[0]), (results[4], JOBS[3])):
+            words, params, _ = parse_job(job)
+            expected = make_word_cloud(
+                words, seed=job_seed("cron", result["index"]), **params
+            )
+            image = Image.open(io.BytesIO(base64.b64decode(result["image"])))
+            self.assertEqual(image.convert("RGB").tobytes(), expected.tobytes())
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = Path(directory) / "jobs.jsonl"
+            results = Path(directory) / "results.jsonl"
+            jobs.write_text("\n".join(json.dumps(job) for job in JOBS[1:3]))
+
+            status = main(["--workers", "1", "batch", str(jobs), "-o", str(results)])
+            lines = results.read_text().splitlines()
+
+        self.assertEqual(status, 1)
+        self.assertEqual(len(lines), 2)
+        self.assertIn("image", json.loads(lines[0]))
+
+
+class TestServer(TestCase):
+    def setUp(self):
+        self.url = self.serve()
+
+    def serve(self, file_root=None):
+        server = WordCloudServer(("127.0.0.1", 0), max_workers=1, file_root=file_root)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(thread.join)
+        self.addCleanup(server.shutdown)
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def post(self, job, url=None):
+        request = urllib.request.Request(
+            f"{url or self.url}/render",
+            data=json.dumps(job).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            return response.headers["Content-Type"], response.read()
+
+    def test_render_and_metrics(self):
+        job = {"words": {"alpha": 3, "beta": 1}, "params": {"seed": 1, "width": 200}}
+        for _ in range(2):
+            content_type, body = self.post(job)
+            self.assertEqual(content_type, "image/png")
+
+        words, params, _ = parse_job(job)
+        image = Image.open(io.BytesIO(body))
+        self.assertEqual(image.tobytes(), make_word_cloud(words, **params).tobytes())
+
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.post({"params": {}})
+        self.assertEqual(error.exception.code, 400)
+        # the server has no files directory, so clients can't name files
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.post({"words": ["a"], "params": {"font_path": "/etc/hosts"}})
+        self.assertEqual(error.exception.code, 403)
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.post({"words": ["a"], "params": {"maximum_font_size": 5}})
+        self.assertEqual(error.exception.code, 422)
+
+        with urllib.request.urlopen(f"{self.url}/metrics") as response:
+            metrics = json.load(response)
+        self.assertEqual(metrics["requests"], 5)
+        self.assertEqual(metrics["errors"], 3)
+        self.assertEqual(metrics["in_flight"], 0)
+        self.assertEqual(metrics["latency_window"], 2)
+        self.assertGreater(metrics["latency_seconds"]["p50"], 0)
+        # the second request is served from the warm caches of the same worker
+        (worker,) = metrics["workers"]
+        self.assertGreater(worker["glyph_cache"]["hits"], 0)
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory) / "files"
+            root.mkdir()
+            Image.new("L", (200, 200)).save(root / "mask.png")
+            Image.new("L", (200, 200)).save(Path(directory) / "secret.png")
+            url = self.serve(file_root=root)
+
+            content_type, _ = self.post(
+                {"words": ["a"], "params": {"mask": "mask.png"}}, url
+            )
+            self.assertEqual(content_type, "image/png")
+
+            for path in ("../secret.png", str(Path(directory) / "secret.png")):
+                with self.subTest(path=path):
+                    with self.assertRaises(urllib.error.HTTPError) as error:
+                        self.post({"words": ["a"], "params": {"mask": path}}, url)
+                    self.assertEqual(error.exception.code, 403)
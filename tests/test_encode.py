@@ -0,0 +1,49 @@
+import io
+from collections import Counter
+from unittest import TestCase
+
+from PIL import Image
+
+from wrdcld import ENCODER_PRESETS, encode, encoder_options, make_word_cloud
+
+WORD_COUNTS = Counter({"alpha": 30, "beta": 20, "gamma": 10, "delta": 5})
+
+
+class TestEncode(TestCase):
+    def setUp(self):
+        self.image = make_word_cloud(WORD_COUNTS, width=300, height=200, seed=0)
+
+    def test_presets(self):
+        for preset in ENCODER_PRESETS:
+            for image_format in ("PNG", "WEBP", "JPEG"):
+                with self.subTest(preset=preset, image_format=image_format):
+                    output = io.BytesIO()
+                    encode(self.image, output, image_format, preset)
+                    output.seek(0)
+
+                    with Image.open(output) as decoded:
+                        self.assertEqual(decoded.format, image_format)
+                        self.assertEqual(decoded.size, self.image.size)
+                        # the presets encode WebP losslessly, unlike Pillow's default
+                        if image_format == "PNG" or (
+                            image_format == "WEBP" and preset != "default"
+                        ):
+                            self.assertEqual(
+                                decoded.convert("RGB").tobytes(), self.image.tobytes()
+                            )
+
+    def test_options_override_the_preset(self):
+        fast, uncompressed = io.BytesIO(), io.BytesIO()
+        encode(self.image, fast, "PNG", "fast")
+        encode(self.image, uncompressed, "PNG", "fast", compress_level=0)
+
+        self.assertLess(len(fast.getvalue()), len(uncompressed.getvalue()))
+        self.assertEqual(encoder_options("png", "default"), {})
+        self.assertRaises(AssertionError, encoder_options, "PNG", "fastest")
+
+    def test_fast_jpeg_is_no_larger_than_the_default(self):
+        fast, default = io.BytesIO(), io.BytesIO()
+        encode(self.image, fast, "JPEG", "fast")
+        encode(self.image, default, "JPEG", "default")
+
+        self.assertLessEqual(len(fast.getvalue()), len(default.getvalue()))
@@ -1,10 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import replace
 from unittest import TestCase
 
 import hypothesis.strategies as st
 from hypothesis import given
+from PIL import Image, ImageDraw
 
-from wrdcld.font import FontWrapper
+from wrdcld.font import (
+    FontRegistry,
+    FontWrapper,
+    draw_text,
+    font_registry_stats,
+    get_glyph_mask,
+    glyph_cache_stats,
+)
+from wrdcld.image import ImageWrapper
+from wrdcld.rectangle import Rectangle
+from wrdcld.stats import collect_stats
 
 
 class TestFont(TestCase):
@@ -14,6 +26,41 @@ class TestFont(TestCase):
         )
         self.assertTrue(font.path.exists())
 
+    def test_fonts_are_shared_between_colors(self):
+        black = FontWrapper(
+            color_func=lambda _: (0, 0, 0), path=FontWrapper.default_font(), size=23
+        )
+        white = FontWrapper(
+            color_func=lambda _: (255, 255, 255),
+            path=FontWrapper.default_font(),
+            size=46,
+        )[23]
+
+        hits_before = font_registry_stats().hits
+        self.assertIs(black.get(), white.get())
+        self.assertGreater(font_registry_stats().hits, hits_before)
+
+    def test_font_registry_evicts_faces(self):
+        registry = FontRegistry(max_faces=2)
+        for size in (10, 11, 12, 10):
+            registry.get(FontWrapper.default_font(), size)
+
+        stats = registry.stats
+        self.assertEqual((stats.hits, stats.misses), (0, 4))
+        self.assertEqual((stats.evictions, stats.entries), (2, 2))
+
+    def test_font_registry_has_faces_per_thread(self):
+        registry = FontRegistry(max_faces=2)
+        face = registry.get(FontWrapper.default_font(), 10)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_face = executor.submit(
+                registry.get, FontWrapper.default_font(), 10
+            ).result()
+
+            self.assertIsNot(face, other_face)
+            self.assertIs(registry.get(FontWrapper.default_font(), 10), face)
+            self.assertEqual(registry.stats.entries, 2)
+
     @given(
         word=st.text(min_size=1, max_size=5).filter(lambda s: not s.isspace()),
         required_width=st.integers(min_value=10, max_value=1000),
@@ -31,3 +78,44 @@ class TestFont(TestCase):
 
         self.assertTrue(new_font_size > 0)
         self.assertTrue(new_font.get_length_of_word(word) <= required_width)
+
+    def test_draw_text_reuses_cached_glyphs(self):
+        font = FontWrapper(
+            color_func=lambda _: (0, 0, 0), path=FontWrapper.default_font(), size=37
+        )
+        rectangle = Rectangle(
+            x=3, y=4, width=font.get_length_of_word("cache"), height=37
+        )
+        text_bbox = font.getbbox("cache")
+        expected = Image.new("RGB", (200, 100), (255, 255, 255))
+        ImageDraw.Draw(expected).text(
+            (3 - text_bbox.x, 4 - text_bbox.y), "cache", font=font.get(), fill=(0, 0, 0)
+        )
+
+        for _ in range(2):
+            image = ImageWrapper(
+                width=200, height=100, background_color=(255, 255, 255)
+            )
+            hits_before = glyph_cache_stats().hits
+            draw_text(image, rectangle, "cache", font, frequency=1.0)
+            self.assertEqual(image.img.tobytes(), expected.tobytes())
+
+        self.assertEqual(glyph_cache_stats().hits, hits_before + 1)
+
+    def test_rotated_glyphs_are_transposed(self):
+        font = FontWrapper(
+            color_func=lambda _: (0, 0, 0), path=FontWrapper.default_font(), size=41
+        )
+
+        with collect_stats() as stats:
+            rotated = get_glyph_mask(font, "transposed", rotate=True)
+            horizontal = get_glyph_mask(font, "transposed")
+            get_glyph_mask(font, "transposed", rotate=True)
+
+        # the word is only rasterized once, for both orientations
+        self.assertEqual(stats["glyph_rasterization"].calls, 1)
+        self.assertEqual(
+            rotated.tobytes(),
+            horizontal.transpose(Image.Transpose.ROTATE_90).tobytes(),
+        )
+        self.assertEqual(rotated.size, horizontal.size[::-1])
@@ -0,0 +1,80 @@
+from unittest import TestCase
+
+import hypothesis.strategies as st
+from hypothesis import given
+
+from wrdcld.freespace import FreeRectangles
+from wrdcld.rectangle import Rectangle
+
+small_rectangle_strategy = st.builds(
+    Rectangle,
+    width=st.integers(min_value=1, max_value=10),
+    height=st.integers(min_value=1, max_value=10),
+    x=st.integers(min_value=0, max_value=3),
+    y=st.integers(min_value=0, max_value=3),
+)
+
+
+def _largest_fitting_in_list(rectangles, width, height):
+    suitable = [r for r in rectangles if r.width >= width and r.height >= height]
+    return max(suitable, key=lambda r: r.area) if suitable else None
+
+
+class TestFreeRectangles(TestCase):
+    def test_remove_missing_rectangle(self):
+        free = FreeRectangles([Rectangle(width=5, height=5, x=0, y=0)])
+        self.assertRaises(
+            ValueError, free.remove, Rectangle(width=5, height=5, x=1, y=0)
+        )
+
+    @given(
+        rectangles=st.lists(small_rectangle_strategy, min_size=1),
+        queries=st.lists(
+            st.tuples(
+                st.integers(min_value=1, max_value=10),
+                st.integers(min_value=1, max_value=10),
+            ),
+            min_size=1,
+        ),
+    )
+    def test_matches_list_behaviour(self, rectangles, queries):
+        """
+        Test that the queries, removals and additions behave like on a plain list
+        """
+        free = FreeRectangles(rectangles)
+        reference = list(rectangles)
+
+        for width, height in queries:
+            chosen = free.largest_fitting(width, height)
+            self.assertIs(chosen, _largest_fitting_in_list(reference, width, height))
+            if chosen is None:
+                continue
+
+            free.remove(chosen)
+            reference.remove(chosen)
+
+            # add back a couple of pieces, including a duplicate
+            pieces = [chosen, Rectangle(width=1, height=1, x=0, y=0)]
+            free.extend(pieces)
+            reference.extend(pieces)
+            self.assertEqual(len(free), len(reference))
+
+    @given(
+        rectangles=st.lists(small_rectangle_strategy),
+        width=st.integers(min_value=1, max_value=10),
+        height=st.integers(min_value=1, max_value=10),
+        smallest_first=st.booleans(),
+    )
+    def test_fitting(self, rectangles, width, height, smallest_first):
+        fitting = list(
+            FreeRectangles(rectangles).fitting(width, height, smallest_first)
+        )
+
+        expected = [r for r in rectangles if r.width >= width and r.height >= height]
+        self.assertCountEqual(fitting, expected)
+        areas = [rectangle.area for rectangle in fitting]
+        self.assertEqual(areas, sorted(areas, reverse=not smallest_first))
+        if not smallest_first and fitting:
+            self.assertIs(
+                fitting[0], FreeRectangles(rectangles).largest_fitting(width, height)
+            )
@@ -0,0 +1,50 @@
+from collections import Counter
+from unittest import TestCase
+
+import hypothesis.strategies as st
+import numpy as np
+from hypothesis import given, settings
+from PIL import Image
+
+from tests.strategies import frequency_color, paste_strategy
+from wrdcld import ArrayCanvas, ImageWrapper, compute_layout, render, render_array
+
+
+class TestArrayCanvas(TestCase):
+    @settings(deadline=None, max_examples=50)
+    @given(
+        pastes=st.lists(paste_strategy(60, 50), max_size=8),
+        box=st.tuples(
+            st.floats(-10, 50), st.floats(-10, 40), st.floats(0, 70), st.floats(0, 50)
+        ),
+    )
+    def test_same_as_image(self, pastes, box):
+        image = ImageWrapper(50, 40, (10, 20, 30))
+        canvas = ArrayCanvas(50, 40, (10, 20, 30))
+
+        for color, xy, mask in pastes:
+            image.paste_mask(color, xy, mask)
+            canvas.paste_mask(color, xy, mask)
+        patch = Image.new("RGB", (20, 20), (1, 2, 3))
+        image.paste(patch, (35, -5))
+        canvas.paste(patch, (35, -5))
+
+        self.assertTrue(np.array_equal(canvas.array, np.asarray(image.img)))
+        left, top, width, height = box
+        box = (left, top, left + width, top + height)
+        self.assertEqual(canvas.crop(box).tobytes(), image.crop(box).tobytes())
+
+
+class TestRenderArray(TestCase):
+    @settings(deadline=None, max_examples=10)
+    @given(seed=st.integers(), scale=st.sampled_from([1, 0.5, 2.5]))
+    def test_same_as_render(self, seed, scale):
+        words = Counter({"alpha": 30, "beta": 20, "gamma": 10, "delta": 5})
+        layout = compute_layout(words, width=300, height=200, seed=seed)
+
+        array = render_array(layout, scale=scale, font_color_func=frequency_color)
+        image = render(layout, scale=scale, font_color_func=frequency_color)
+
+        self.assertEqual(array.shape, (image.height, image.width, 3))
+        self.assertTrue(array.flags.c_contiguous)
+        self.assertEqual(memoryview(array).tobytes(), image.tobytes())
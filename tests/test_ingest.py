@@ -0,0 +1,39 @@
+import tempfile
+from collections import Counter
+from pathlib import Path
+from unittest import TestCase
+
+from wrdcld.ingest import Tokenizer, count_words
+
+TEXT = """The adventure of the dancing men. "Well, Watson," said Holmes -- the
+dancing men are here!\n\tThé end, the END.
+"""
+
+
+class TestIngest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+
+        self.paths = [Path(directory.name) / f"text_{i}.txt" for i in range(2)]
+        for path in self.paths:
+            path.write_text(TEXT * 50, encoding="utf-8")
+        (Path(directory.name) / "empty.txt").touch()
+        self.paths.append(Path(directory.name) / "empty.txt")
+
+    def test_tokenizer(self):
+        tokenizer = Tokenizer(lowercase=True, min_length=2, stopwords=frozenset({"of"}))
+        self.assertEqual(
+            list(tokenizer.tokenize('"Well, Watson," said A -- the end of it.')),
+            ["well", "watson", "said", "the", "end", "it"],
+        )
+
+    def test_chunked_parallel_count_matches_serial_count(self):
+        tokenizer = Tokenizer(lowercase=True, normalization="NFKC")
+        expected = Counter(tokenizer.tokenize(TEXT * 100))
+
+        for processes in (1, 3):
+            counts = count_words(
+                self.paths, tokenizer=tokenizer, processes=processes, chunk_size=64
+            )
+            self.assertEqual(counts, expected)
@@ -0,0 +1,259 @@
+import copy
+import pickle
+from collections import Counter
+from unittest import TestCase
+
+import hypothesis.strategies as st
+from hypothesis import given, settings
+
+from tests.strategies import frequency_color, two_images_are_equal
+from wrdcld import (
+    Layout,
+    PlacedWord,
+    Rectangle,
+    collect_stats,
+    compute_layout,
+    find_overlaps,
+    make_live_layout,
+    make_word_cloud,
+    render,
+)
+from wrdcld.layout import LAYOUT_BACKGROUND_COLOR, LAYOUT_FONT_COLOR
+
+WORD_COUNTS = Counter(
+    {f"word{index}": count for index, count in enumerate(range(60, 0, -2))}
+)
+
+
+class TestLayout(TestCase):
+    @settings(deadline=None, max_examples=10)
+    @given(seed=st.integers(), engine=st.sampled_from(["rectangles", "occupancy"]))
+    def test_render_matches_make_word_cloud(self, seed, engine):
+        layout = compute_layout(WORD_COUNTS, width=300, height=200, seed=seed)
+        word_cloud = make_word_cloud(WORD_COUNTS, width=300, height=200, seed=seed)
+
+        self.assertTrue(two_images_are_equal(render(layout), word_cloud))
+
+        engine_layout = compute_layout(WORD_COUNTS, seed=seed, engine=engine)
+        self.assertEqual(
+            engine_layout, compute_layout(WORD_COUNTS, seed=seed, engine=engine)
+        )
+
+    @settings(deadline=None, max_examples=10)
+    @given(seed=st.integers())
+    def test_serialization(self, seed):
+        words = Counter(WORD_COUNTS)
+        words["ünïcödé"] = 50
+        layout = compute_layout(words, width=300, height=200, seed=seed)
+
+        self.assertEqual(Layout.from_json(layout.to_json()), layout)
+        self.assertEqual(Layout.from_bytes(layout.to_bytes()), layout)
+        self.assertLess(len(layout.to_bytes()), len(layout.to_json()))
+
+    def test_pickle_and_copy(self):
+        # layouts are returned from worker processes
+        layout = compute_layout(WORD_COUNTS, width=300, height=200, seed=1)
+
+        self.assertEqual(pickle.loads(pickle.dumps(layout)), layout)
+        self.assertEqual(copy.deepcopy(layout), layout)
+
+    def test_render_at_scale(self):
+        layout = compute_layout(WORD_COUNTS, width=300, height=200, seed=0)
+        image = render(layout, scale=2)
+
+        self.assertEqual(image.size, (600, 400))
+        self.assertNotEqual(
+            image.getbbox(), render(layout, background_color=(0, 0, 0)).getbbox()
+        )
+
+    def test_scaled(self):
+        layout = compute_layout(WORD_COUNTS, width=300, height=200, seed=0)
+        scaled = layout.scaled(600, 400)
+
+        self.assertEqual((scaled.width, scaled.height), (600, 400))
+        self.assertTrue(two_images_are_equal(render(scaled), render(layout, scale=2)))
+
+    @settings(deadline=None, max_examples=10)
+    @given(seed=st.integers(), layout_scale=st.sampled_from([0.25, 0.5, 0.7]))
+    def test_layout_scale(self, seed, layout_scale):
+        word_cloud = make_word_cloud(
+            WORD_COUNTS, width=601, height=401, seed=seed, layout_scale=layout_scale
+        )
+        self.assertEqual(word_cloud.size, (601, 401))
+
+        # the words scaled up from the draft hardly overlap
+        draft = compute_layout(
+            WORD_COUNTS,
+            width=round(601 * layout_scale),
+            height=round(401 * layout_scale),
+            minimum_font_size=max(1, round(10 * layout_scale)),
+            maximum_font_size=round(100 * layout_scale),
+            seed=seed,
+        )
+        report = find_overlaps(draft.scaled(601, 401))
+        self.assertLess(report.overlapping_fraction, 0.01)
+
+    def test_small_layout_scale(self):
+        # the font sizes 10 and 12 would both round to 1 in the draft, where words
+        # cover their whole rectangle
+        word_cloud = make_word_cloud(
+            WORD_COUNTS,
+            width=600,
+            height=400,
+            minimum_font_size=10,
+            maximum_font_size=12,
+            seed=0,
+            layout_scale=0.1,
+        )
+        self.assertEqual(word_cloud.size, (600, 400))
+        # but invalid sizes are still rejected before they are scaled
+        with self.assertRaises(AssertionError):
+            make_word_cloud(WORD_COUNTS, maximum_font_size=5, layout_scale=0.5)
+
+    def test_find_overlaps(self):
+        layout = compute_layout(WORD_COUNTS, width=300, height=200, seed=0)
+        word = PlacedWord(
+            word="overlap",
+            frequency=1.0,
+            font_size=20,
+            rectangle=Rectangle(x=10, y=10, width=60, height=20),
+            rotated=False,
+        )
+        report = find_overlaps(
+            Layout(
+                width=100, height=100, font_path=layout.font_path, words=(word, word)
+            )
+        )
+
+        self.assertEqual(report.pairs, ((0, 1),))
+        self.assertEqual(report.overlapping_pixels, report.ink_pixels / 2)
+
+    def test_invalid_binary_layout(self):
+        self.assertRaises(ValueError, Layout.from_bytes, b"PNG\x00" + bytes(16))
+
+
+class TestLiveLayout(TestCase):
+    def test_unchanged_counts_keep_the_layout(self):
+        live_layout = make_live_layout(WORD_COUNTS, width=300, height=300, seed=0)
+        layout = live_layout.layout
+
+        self.assertEqual(live_layout.update(WORD_COUNTS, seed=1), layout)
+
+    def test_render_only_draws_the_changes(self):
+        live_layout = make_live_layout(
+            WORD_COUNTS, width=600, height=400, maximum_font_size=40, seed=0
+        )
+        live_layout.render()
+
+        new_counts = Counter(WORD_COUNTS)
+        del new_counts["word5"]
+        new_counts["new"] = 30
+        layout = live_layout.update(new_counts)
+        with collect_stats() as stats:
+            image = live_layout.render()
+
+        self.assertTrue(two_images_are_equal(image, render(layout)))
+        self.assertIn("new", [placed.word for placed in layout.words])
+        self.assertLess(stats["draw_text"].calls, len(layout.words) // 2)
+
+        # other colors draw the whole image again
+        with collect_stats() as stats:
+            image = live_layout.render(font_color=(1, 2, 3))
+        self.assertEqual(stats["draw_text"].calls, len(layout.words))
+        self.assertTrue(two_images_are_equal(image, render(layout, (1, 2, 3))))
+
+    def test_update_frees_the_space_around_the_ink(self):
+        # glyphs like "j" and "_" can reach past the rectangle of their word
+        word_counts = Counter(
+            dict(
+                zip(
+                    "_j_ fjord jazz Wyj gjp jig f/j jj_ ___ jjjj quay".split(),
+                    range(60, 0, -5),
+                )
+            )
+        )
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                live_layout = make_live_layout(
+                    word_counts, width=200, height=200, minimum_font_size=6, seed=seed
+                )
+                before = list(live_layout.free_rectangles)
+                kept = live_layout.layout.words[::2]
+                live_layout.update(
+                    {placed.word: word_counts[placed.word] for placed in kept}
+                )
+
+                # so the space given back doesn't have any of the ink of the other words
+                for rectangle in live_layout.free_rectangles:
+                    if not any(rectangle is other for other in before):
+                        crop = live_layout.canvas.crop(rectangle.xyrb)
+                        self.assertIsNone(crop.getbbox())
+
+    @settings(deadline=None, max_examples=20)
+    @given(
+        changes=st.dictionaries(
+            st.sampled_from(sorted(WORD_COUNTS) + ["new0", "new1", "new2"]),
+            st.integers(min_value=-60, max_value=60),
+        ),
+        seed=st.integers(),
+    )
+    def test_update(self, changes, seed):
+        live_layout = make_live_layout(WORD_COUNTS, width=300, height=300, seed=seed)
+        before = {placed.word: placed for placed in live_layout.layout.words}
+        image = live_layout.render(
+            font_color_func=frequency_color, background_color=(9, 9, 9)
+        )
+
+        new_counts = Counter(WORD_COUNTS)
+        new_counts.update(changes)
+        new_counts = +new_counts
+        if not new_counts:
+            return
+
+        layout = live_layout.update(new_counts, seed=seed)
+        self.assertIs(
+            live_layout.render(
+                font_color_func=frequency_color, background_color=(9, 9, 9)
+            ),
+            image,
+        )
+
+        # words drawn at the same size stay where they were
+        for placed in layout.words:
+            if (
+                placed.word in before
+                and before[placed.word].font_size == placed.font_size
+            ):
+                self.assertEqual(placed.rectangle, before[placed.word].rectangle)
+
+        # the canvas is the same as drawing the words from scratch
+        self.assertTrue(
+            two_images_are_equal(
+                live_layout.canvas.crop((0, 0, layout.width, layout.height)),
+                render(
+                    layout,
+                    font_color=LAYOUT_FONT_COLOR,
+                    background_color=LAYOUT_BACKGROUND_COLOR,
+                ),
+            )
+        )
+
+        # the rendered image is the same as rendering the new layout
+        self.assertTrue(
+            two_images_are_equal(
+                image,
+                render(
+                    layout, font_color_func=frequency_color, background_color=(9, 9, 9)
+                ),
+            )
+        )
+
+        # the new words only touch the others at their antialiased edges, if at all
+        self.assertLess(find_overlaps(layout).overlapping_fraction, 0.001)
+
+        # and the free rectangles don't overlap each other
+        free_rectangles = list(live_layout.free_rectangles)
+        for index, first in enumerate(free_rectangles):
+            for second in free_rectangles[index + 1 :]:
+                overlap = first.intersection(second)
+                self.assertTrue(overlap is None or overlap.area < 1e-6)
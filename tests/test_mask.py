@@ -0,0 +1,87 @@
+from unittest import SkipTest, TestCase
+
+import hypothesis.strategies as st
+from hypothesis import given, settings
+from PIL import Image, ImageDraw
+
+from wrdcld import make_word_cloud
+from wrdcld.mask import decompose_mask, free_pixels, mask_cache_stats
+from wrdcld.rectangle import MIN_RECTANGLE_SIDE_LENGTH, Rectangle
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    raise SkipTest("numpy is not installed") from None
+
+
+@st.composite
+def mask_strategy(draw):
+    width = draw(st.integers(min_value=1, max_value=120))
+    height = draw(st.integers(min_value=1, max_value=120))
+    mask = Image.new("L", (width, height), 255)
+    canvas = ImageDraw.Draw(mask)
+    for _ in range(draw(st.integers(min_value=0, max_value=4))):
+        x0, x1 = sorted(draw(st.integers(0, width)) for _ in range(2))
+        y0, y1 = sorted(draw(st.integers(0, height)) for _ in range(2))
+        shape = draw(st.sampled_from([canvas.rectangle, canvas.ellipse]))
+        shape((x0, y0, x1, y1), fill=draw(st.sampled_from([0, 255])))
+    return mask
+
+
+class TestDecomposeMask(TestCase):
+    @given(mask=mask_strategy())
+    def test_rectangles_cover_free_pixels_once(self, mask):
+        free = free_pixels(mask, mask.width, mask.height)
+        covered = np.zeros(free.shape, dtype=int)
+
+        for rectangle in decompose_mask(mask, mask.width, mask.height):
+            self.assertGreaterEqual(rectangle.width, MIN_RECTANGLE_SIDE_LENGTH)
+            self.assertGreaterEqual(rectangle.height, MIN_RECTANGLE_SIDE_LENGTH)
+            x, y, right, bottom = rectangle.xyrb
+            covered[y:bottom, x:right] += 1
+
+        self.assertTrue(np.all(covered <= free))
+
+    def test_blank_mask_is_one_rectangle(self):
+        mask = Image.new("RGB", (300, 200), (0, 0, 0))
+        self.assertEqual(
+            decompose_mask(mask, 300, 200),
+            (Rectangle(width=300, height=200, x=0, y=0),),
+        )
+
+    def test_repeated_masks_are_cached(self):
+        mask = Image.new("L", (200, 200), 255)
+        ImageDraw.Draw(mask).ellipse((0, 0, 199, 199), fill=0)
+
+        first = decompose_mask(mask, 200, 200)
+        hits = mask_cache_stats().hits
+        second = decompose_mask(mask.copy(), 200, 200)
+
+        self.assertIs(first, second)
+        self.assertEqual(mask_cache_stats().hits, hits + 1)
+
+
+class TestMaskedWordCloud(TestCase):
+    @settings(deadline=None, max_examples=10)
+    @given(engine=st.sampled_from(["rectangles", "occupancy"]), seed=st.integers())
+    def test_words_stay_inside_the_mask(self, engine, seed):
+        words = ["alpha"] * 20 + ["beta"] * 10 + ["gamma"] * 5 + ["delta"] * 2
+        background_color = (0, 0, 0)
+
+        # only the left half of the canvas is free
+        mask = Image.new("L", (100, 50), 255)
+        mask.paste(0, (0, 0, 50, 50))
+
+        word_cloud = make_word_cloud(
+            words,
+            width=400,
+            height=200,
+            background_color=background_color,
+            mask=mask,
+            seed=seed,
+            engine=engine,
+        )
+
+        drawn = np.asarray(word_cloud).any(axis=-1)
+        self.assertTrue(drawn[:, :200].any())
+        self.assertFalse(drawn[:, 200:].any())
@@ -0,0 +1,52 @@
+from pathlib import Path
+from unittest import TestCase
+
+from wrdcld import make_word_cloud
+from wrdcld.font import FontWrapper
+from wrdcld.metrics import WordMetrics
+
+
+class TestWordMetrics(TestCase):
+    def test_metrics_match_freetype(self):
+        metrics = WordMetrics(FontWrapper.default_font())
+        font = FontWrapper(
+            color_func=lambda _: (0, 0, 0), path=FontWrapper.default_font(), size=20
+        )
+        measured_font = FontWrapper(
+            color_func=lambda _: (0, 0, 0),
+            path=FontWrapper.default_font(),
+            size=20,
+            metrics=metrics,
+        )
+
+        metrics.measure(font, [("metrics", 20), ("jumpy", 31)])
+        self.assertEqual(len(metrics), 2)
+
+        for word, size in (("metrics", 20), ("jumpy", 31), ("unmeasured", 12)):
+            self.assertEqual(
+                measured_font[size].get_length_of_word(word),
+                font[size].get_length_of_word(word),
+            )
+            self.assertEqual(
+                measured_font[size].getbbox(word), font[size].getbbox(word)
+            )
+
+        stats = metrics.stats
+        self.assertEqual((stats.entries, stats.hits, stats.misses), (3, 5, 1))
+
+    def test_metrics_are_for_one_font(self):
+        metrics = WordMetrics(Path("another-font.ttf"))
+        font = FontWrapper(
+            color_func=lambda _: (0, 0, 0),
+            path=FontWrapper.default_font(),
+            metrics=metrics,
+        )
+        self.assertRaises(ValueError, font.get_length_of_word, "word")
+
+    def test_word_cloud_uses_metrics(self):
+        metrics = WordMetrics(FontWrapper.default_font())
+        make_word_cloud(["a", "b", "b", "c", "c", "c"], metrics=metrics, seed=0)
+
+        stats = metrics.stats
+        self.assertGreater(stats.hits, 0)
+        self.assertGreater(stats.seconds_saved, 0)
@@ -0,0 +1,83 @@
+from unittest import SkipTest, TestCase
+
+import hypothesis.strategies as st
+from hypothesis import given, settings
+
+from wrdcld import make_word_cloud
+from wrdcld.occupancy import OccupancyMap
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    raise SkipTest("numpy is not installed") from None
+
+marks_strategy = st.lists(
+    st.tuples(
+        st.integers(min_value=-5, max_value=20),
+        st.integers(min_value=-5, max_value=20),
+        st.lists(
+            st.lists(st.booleans(), min_size=4, max_size=4), min_size=1, max_size=6
+        ),
+    ),
+    max_size=10,
+)
+
+
+class TestOccupancyMap(TestCase):
+    @given(marks=marks_strategy)
+    def test_integral_image_stays_in_step(self, marks):
+        """
+        Test that the incrementally updated integral image matches one computed from scratch
+        """
+        occupancy = OccupancyMap(width=17, height=13)
+        for x, y, mask in marks:
+            occupancy.mark(x, y, np.array(mask, dtype=bool))
+
+        expected = np.zeros((14, 18), dtype=np.int32)
+        expected[1:, 1:] = occupancy.occupied.cumsum(axis=0).cumsum(axis=1)
+        self.assertTrue(np.array_equal(occupancy.integral, expected))
+
+    @given(
+        marks=marks_strategy,
+        width=st.integers(min_value=1, max_value=20),
+        height=st.integers(min_value=1, max_value=15),
+    )
+    def test_free_positions(self, marks, width, height):
+        occupancy = OccupancyMap(width=17, height=13)
+        for x, y, mask in marks:
+            occupancy.mark(x, y, np.array(mask, dtype=bool))
+
+        expected = {
+            (x, y)
+            for y in range(13 - height + 1)
+            for x in range(17 - width + 1)
+            if not occupancy.occupied[y : y + height, x : x + width].any()
+        }
+        xs, ys = occupancy.free_positions(width, height)
+        self.assertEqual(set(zip(xs.tolist(), ys.tolist())), expected)
+
+        position = occupancy.find_position(width, height)
+        if expected:
+            self.assertIn(position, expected)
+        else:
+            self.assertIsNone(position)
+
+
+class TestOccupancyEngine(TestCase):
+    @settings(deadline=None, max_examples=20)
+    @given(seed=st.integers())
+    def test_make_word_cloud(self, seed):
+        words = ["alpha"] * 20 + ["beta"] * 10 + ["gamma"] * 5 + ["delta"]
+        background_color = (0, 0, 0)
+
+        word_cloud_1 = make_word_cloud(
+            words, background_color=background_color, seed=seed, engine="occupancy"
+        )
+        word_cloud_2 = make_word_cloud(
+            words, background_color=background_color, seed=seed, engine="occupancy"
+        )
+
+        self.assertEqual(word_cloud_1.tobytes(), word_cloud_2.tobytes())
+        self.assertTrue(
+            any(pixel != background_color for pixel in word_cloud_1.getdata())
+        )
@@ -1,5 +1,8 @@
+import copy
 import math
-from unittest import TestCase
+import pickle
+from importlib.util import find_spec
+from unittest import TestCase, skipIf
 
 import hypothesis.strategies as st
 from hypothesis import given
@@ -9,12 +12,17 @@ from wrdcld.image import ImageWrapper
 from wrdcld.rectangle import (
     MIN_RECTANGLE_SIDE_LENGTH,
     Rectangle,
+    RectangleArray,
     _remove_small_rectangles,
+    _scan_section_numpy,
+    _scan_section_python,
     fill_remaining_space_horizontal,
     fill_remaining_space_vertical,
     fill_space_around_word,
 )
 
+HAS_NUMPY = find_spec("numpy") is not None
+
 
 @st.composite
 def rectangle_strategy(draw):
@@ -90,6 +98,25 @@ def text_image_and_rectangle_strategy(draw):
     return image, img_rectangle
 
 
+@st.composite
+def blocky_image_and_rectangle_strategy(draw):
+    """
+    Generates an image made of random blocks of background and foreground pixels
+    """
+    width = draw(st.integers(min_value=1, max_value=40))
+    height = draw(st.integers(min_value=1, max_value=40))
+    image = ImageWrapper(width=width, height=height, background_color=(255, 255, 255))
+
+    for _ in range(draw(st.integers(min_value=0, max_value=10))):
+        x = draw(st.integers(min_value=0, max_value=width - 1))
+        y = draw(st.integers(min_value=0, max_value=height - 1))
+        w = draw(st.integers(min_value=1, max_value=width - x))
+        h = draw(st.integers(min_value=1, max_value=height - y))
+        image.canvas.rectangle((x, y, x + w - 1, y + h - 1), fill=(0, 0, 0))
+
+    return image, Rectangle(width=width, height=height, x=0, y=0)
+
+
 class TestRectangle(TestCase):
     def test_basic_properties(self):
         r = Rectangle(width=5, height=7, x=1, y=2)
@@ -111,6 +138,24 @@ class TestRectangle(TestCase):
 
         self.assertEqual(r.area, r_ccw.area)
 
+    @given(rectangle=rectangle_strategy())
+    def test_pickle_and_copy(self, rectangle):
+        self.assertEqual(pickle.loads(pickle.dumps(rectangle)), rectangle)
+        self.assertEqual(copy.deepcopy(rectangle), rectangle)
+        self.assertEqual(copy.copy(rectangle), rectangle)
+
+    @given(first=rectangle_strategy(), second=rectangle_strategy())
+    def test_intersection(self, first, second):
+        overlap = first.intersection(second)
+        if not first.overlaps(second):
+            self.assertIsNone(overlap)
+            return
+
+        self.assertEqual(overlap, second.intersection(first))
+        self.assertTrue(overlap.is_inside(first))
+        self.assertTrue(overlap.is_inside(second))
+        self.assertGreater(overlap.area, 0)
+
     @given(rectangles=st.lists(rectangle_strategy(), min_size=1))
     def test_remove_small_rectangles(self, rectangles):
         rectangles = _remove_small_rectangles(rectangles)
@@ -118,6 +163,40 @@ class TestRectangle(TestCase):
             self.assertTrue(r.width >= MIN_RECTANGLE_SIDE_LENGTH)
             self.assertTrue(r.height >= MIN_RECTANGLE_SIDE_LENGTH)
 
+    @skipIf(not HAS_NUMPY, "numpy is not installed")
+    @given(
+        rectangles=st.lists(rectangle_strategy()),
+        dx=st.floats(-50, 50),
+        dy=st.floats(-50, 50),
+    )
+    def test_rectangle_array(self, rectangles, dx, dy):
+        array = RectangleArray.from_rectangles(rectangles)
+        self.assertEqual(len(array), len(rectangles))
+        self.assertEqual(list(array), rectangles)
+
+        self.assertEqual(
+            array.without_small().to_list(), _remove_small_rectangles(rectangles)
+        )
+        self.assertEqual(
+            array.offset(dx, dy).to_list(),
+            [
+                Rectangle(x=r.x + dx, y=r.y + dy, width=r.width, height=r.height)
+                for r in rectangles
+            ],
+        )
+
+        # rotating back and forth within a square gives the same rectangles
+        rotated = array.rotated_ccw_in(200)
+        for index, rectangle in enumerate(rectangles):
+            self.assertEqual(rotated[index].area, rectangle.area)
+        self.assertEqual(
+            rotated.rotated_ccw_in(200)
+            .rotated_ccw_in(200)
+            .rotated_ccw_in(200)
+            .to_list(),
+            rectangles,
+        )
+
     @given(nested_rectangles=nested_rectangle_strategy())
     def test_fill_remaining_space_vertical(self, nested_rectangles):
         outer, inner = nested_rectangles
@@ -160,3 +239,26 @@ class TestRectangle(TestCase):
             img_on_rectangle = image.img.crop(r.xyrb)
             image_section_data = img_on_rectangle.getdata()
             self.assertTrue(all(d != (0, 0, 0) for d in image_section_data))
+
+    @skipIf(not HAS_NUMPY, "numpy is not installed")
+    @given(
+        text_image_and_rectangle=st.one_of(
+            text_image_and_rectangle_strategy(), blocky_image_and_rectangle_strategy()
+        ),
+        fill_direction=st.sampled_from(["vertical", "horizontal"]),
+    )
+    def test_numpy_scan_matches_python_scan(
+        self, text_image_and_rectangle, fill_direction
+    ):
+        image, img_rectangle = text_image_and_rectangle
+        img_section = image.img.crop(img_rectangle.xyrb)
+        quantised = img_section.quantize(2)
+
+        args = (img_section, quantised, image.background_color, fill_direction)
+        try:
+            expected = _scan_section_python(*args)
+        except ValueError:
+            self.assertRaises(ValueError, _scan_section_numpy, *args)
+            return
+
+        self.assertEqual(_scan_section_numpy(*args), expected)
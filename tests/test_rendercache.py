@@ -0,0 +1,152 @@
+import io
+import math
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+from unittest import TestCase
+
+from PIL import Image
+
+from wrdcld import (
+    COLOR_SCHEMES,
+    ColorScheme,
+    RenderCache,
+    cache_key,
+    compute_layout,
+    font_registry_stats,
+    make_word_cloud,
+)
+
+WORD_COUNTS = Counter({"alpha": 30, "beta": 20, "gamma": 10, "delta": 5})
+PARAMS = {"width": 300, "height": 200, "seed": 3, "color_scheme": "viridis"}
+
+
+class TestColorSchemes(TestCase):
+    def test_color_scheme(self):
+        scheme = ColorScheme(((0, 0, 0), (100, 200, 50), (200, 0, 250)))
+
+        self.assertEqual(scheme(0), (0, 0, 0))
+        self.assertEqual(scheme(0.25), (50, 100, 25))
+        self.assertEqual(scheme(1), (200, 0, 250))
+        self.assertEqual(scheme(2), (200, 0, 250))
+        self.assertEqual(ColorScheme(((1, 2, 3),))(0.5), (1, 2, 3))
+
+    def test_make_word_cloud_with_scheme(self):
+        scheme = COLOR_SCHEMES["viridis"]
+        self.assertEqual(
+            make_word_cloud(WORD_COUNTS, **PARAMS).tobytes(),
+            make_word_cloud(
+                WORD_COUNTS, width=300, height=200, seed=3, font_color_func=scheme
+            ).tobytes(),
+        )
+
+
+class TestCacheKey(TestCase):
+    def test_cache_key(self):
+        key = cache_key(make_word_cloud, WORD_COUNTS, PARAMS)
+
+        # defaults and arguments that don't change the image don't change the key
+        self.assertEqual(
+            key,
+            cache_key(
+                make_word_cloud,
+                dict(WORD_COUNTS),
+                {**PARAMS, "minimum_font_size": 10, "scaling_func": math.sqrt},
+            ),
+        )
+        self.assertEqual(
+            key, cache_key(make_word_cloud, WORD_COUNTS, {**PARAMS, "cancel": None})
+        )
+
+        for changed in (
+            {"width": 301},
+            {"seed": 4},
+            {"color_scheme": "magma"},
+            {"background_color": (0, 0, 0)},
+            {"strategy": "best_area"},
+            {"mask": Image.new("L", (300, 200))},
+        ):
+            with self.subTest(changed=changed):
+                self.assertNotEqual(
+                    key, cache_key(make_word_cloud, WORD_COUNTS, {**PARAMS, **changed})
+                )
+        self.assertNotEqual(
+            key, cache_key(make_word_cloud, WORD_COUNTS + Counter(["delta"]), PARAMS)
+        )
+        self.assertRaises(
+            TypeError,
+            cache_key,
+            make_word_cloud,
+            WORD_COUNTS,
+            {"seed": 3, "font_color_func": lambda _: (0, 0, 0)},
+        )
+
+
+class TestRenderCache(TestCase):
+    def test_hit_returns_the_same_image_without_loading_fonts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RenderCache(directory)
+            data = cache.make_word_cloud(WORD_COUNTS, **PARAMS)
+            with Image.open(io.BytesIO(data)) as image:
+                expected = make_word_cloud(WORD_COUNTS, **PARAMS)
+                self.assertEqual(image.convert("RGB").tobytes(), expected.tobytes())
+
+            fonts_before = font_registry_stats()
+            # another instance, like another process, reads the same entries
+            cached = RenderCache(directory).make_word_cloud(WORD_COUNTS, **PARAMS)
+            fonts_after = font_registry_stats()
+
+            self.assertEqual(cached, data)
+            self.assertEqual(
+                (fonts_before.hits, fonts_before.misses),
+                (fonts_after.hits, fonts_after.misses),
+            )
+            self.assertEqual((cache.stats.misses, cache.stats.entries), (1, 1))
+
+    def test_layouts_and_unseeded_calls(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RenderCache(directory)
+            layout = cache.compute_layout(WORD_COUNTS, seed=0)
+            self.assertEqual(layout, cache.compute_layout(WORD_COUNTS, seed=0))
+            self.assertEqual(layout, compute_layout(WORD_COUNTS, seed=0))
+            self.assertEqual(cache.stats.hits, 1)
+
+            cache.make_word_cloud(WORD_COUNTS)
+            self.assertEqual(cache.stats.entries, 1)
+
+    def test_one_shot_iterables(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RenderCache(directory)
+            pairs = list(WORD_COUNTS.items())
+
+            data = cache.make_word_cloud((pair for pair in pairs), **PARAMS)
+            self.assertEqual(data, cache.make_word_cloud(WORD_COUNTS, **PARAMS))
+            self.assertEqual(cache.stats.hits, 1)
+
+            layout = cache.compute_layout(iter(pairs), seed=0)
+            self.assertEqual(layout, compute_layout(WORD_COUNTS, seed=0))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RenderCache(directory)
+            seeds = range(4)
+            sizes = []
+            for seed in seeds:
+                sizes.append(len(cache.make_word_cloud(WORD_COUNTS, seed=seed)))
+                # modification times of files written in quick succession can be equal
+                for path in Path(directory).glob("*.entry"):
+                    stat = path.stat()
+                    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+
+            # room for the last two entries only
+            cache = RenderCache(directory, max_bytes=sum(sizes[-2:]) + 1)
+            cache.make_word_cloud(WORD_COUNTS, seed=3)  # a hit, so the most recent
+            cache.make_word_cloud(WORD_COUNTS, seed=4)  # a miss, which evicts
+
+            self.assertEqual(cache.stats.evictions, 3)
+            self.assertLessEqual(cache.stats.size, cache.max_bytes)
+            self.assertEqual(cache.stats.hits, 1)
+            cache.make_word_cloud(WORD_COUNTS, seed=3)
+            self.assertEqual(cache.stats.hits, 2)
+            self.assertEqual(list(Path(directory).glob("*.tmp")), [])
@@ -0,0 +1,78 @@
+import math
+from collections import Counter
+from unittest import TestCase
+
+import hypothesis.strategies as st
+from hypothesis import given
+
+from wrdcld.selection import (
+    iter_word_counts,
+    minimum_renderable_count,
+    select_renderable_words,
+)
+
+
+def _renderable_words_by_sorting(word_counts, maximum_font_size, minimum_font_size):
+    renderable = []
+    first_count = word_counts.most_common(1)[0][1]
+    for word, count in word_counts.most_common():
+        if maximum_font_size * math.sqrt(count / first_count) < minimum_font_size:
+            break
+        renderable.append((word, count))
+    return renderable
+
+
+class TestSelection(TestCase):
+    @given(
+        max_count=st.integers(min_value=1, max_value=10**9),
+        minimum_font_size=st.integers(min_value=1, max_value=99),
+    )
+    def test_minimum_renderable_count(self, max_count, minimum_font_size):
+        count = minimum_renderable_count(max_count, 100, minimum_font_size, math.sqrt)
+
+        self.assertGreaterEqual(100 * math.sqrt(count / max_count), minimum_font_size)
+        if count > 1:
+            self.assertLess(100 * math.sqrt((count - 1) / max_count), minimum_font_size)
+
+    @given(
+        word_counts=st.dictionaries(
+            st.text(min_size=1, max_size=3),
+            st.integers(min_value=1, max_value=1000),
+            min_size=1,
+        ),
+        minimum_font_size=st.integers(min_value=1, max_value=99),
+    )
+    def test_selection_matches_sorting(self, word_counts, minimum_font_size):
+        word_counts = Counter(word_counts)
+
+        self.assertEqual(
+            select_renderable_words(
+                iter(word_counts.items()), 100, minimum_font_size, math.sqrt
+            ),
+            _renderable_words_by_sorting(word_counts, 100, minimum_font_size),
+        )
+
+    @given(
+        word_counts=st.dictionaries(
+            st.text(min_size=1, max_size=3),
+            st.floats(min_value=0.001, max_value=1000),
+            min_size=1,
+        ),
+        minimum_font_size=st.integers(min_value=1, max_value=99),
+    )
+    def test_selection_of_weights(self, word_counts, minimum_font_size):
+        word_counts = Counter(word_counts)
+
+        self.assertEqual(
+            select_renderable_words(
+                iter(word_counts.items()), 100, minimum_font_size, math.sqrt
+            ),
+            _renderable_words_by_sorting(word_counts, 100, minimum_font_size),
+        )
+
+    def test_word_supplies(self):
+        expected = [("a", 2), ("b", 1)]
+        self.assertEqual(list(iter_word_counts(["a", "b", "a"])), expected)
+        self.assertEqual(list(iter_word_counts(Counter(a=2, b=1))), expected)
+        self.assertEqual(list(iter_word_counts(expected)), expected)
+        self.assertEqual(list(iter_word_counts(iter(expected))), expected)
@@ -0,0 +1,69 @@
+from collections import Counter
+from unittest import TestCase
+
+from PIL import ImageChops
+
+from wrdcld import RenderStats, collect_stats, compute_layout, make_word_cloud
+from wrdcld.stats import timed
+
+WORD_COUNTS = Counter(
+    {f"word{index}": count for index, count in enumerate(range(60, 0, -2))}
+)
+
+
+class TestRenderStats(TestCase):
+    def test_make_word_cloud_collects_stages(self):
+        stats = RenderStats()
+        image = make_word_cloud(WORD_COUNTS, width=300, height=200, seed=0, stats=stats)
+
+        self.assertIs(image.info["render_stats"], stats)
+        for stage in (
+            "font_sizing",
+            "rectangle_search",
+            "fill",
+            "draw_text",
+            "fill_space_around_word",
+            "fill_remaining_space",
+            "placement",
+            "render",
+        ):
+            self.assertGreater(stats[stage].calls, 0, stage)
+        # every word is drawn once to lay it out and once to render it
+        self.assertEqual(stats["draw_text"].calls, 2 * stats["fill"].calls)
+        self.assertGreaterEqual(stats["placement"].seconds, stats["fill"].seconds)
+
+        # timing doesn't change the word cloud
+        self.assertIsNone(
+            ImageChops.difference(
+                image, make_word_cloud(WORD_COUNTS, width=300, height=200, seed=0)
+            ).getbbox()
+        )
+
+    def test_nothing_is_collected_outside_the_context(self):
+        with collect_stats() as stats:
+            compute_layout(WORD_COUNTS, width=300, height=200, seed=0)
+        calls = stats["fill"].calls
+
+        compute_layout(WORD_COUNTS, width=300, height=200, seed=0)
+        self.assertEqual(stats["fill"].calls, calls)
+        self.assertEqual(stats["unknown"].calls, 0)
+
+    def test_record_can_be_overridden(self):
+        recorded = []
+
+        class Forwarding(RenderStats):
+            def record(self, stage, seconds):
+                recorded.append(stage)
+
+        @timed("outer")
+        def outer():
+            inner()
+
+        @timed("inner")
+        def inner():
+            pass
+
+        with collect_stats(Forwarding()):
+            outer()
+
+        self.assertEqual(recorded, ["inner", "outer"])
@@ -0,0 +1,110 @@
+import random
+from collections import Counter
+from unittest import TestCase
+
+from wrdcld import (
+    STRATEGIES,
+    BestAreaFit,
+    BestShortSideFit,
+    BottomLeft,
+    LargestFit,
+    PlacementStrategy,
+    collect_stats,
+    compute_layout,
+    find_overlaps,
+    make_word_cloud,
+)
+from wrdcld.freespace import FreeRectangles
+from wrdcld.rectangle import Rectangle
+
+WORD_COUNTS = Counter(
+    {f"word{index}": count for index, count in enumerate(range(80, 0, -2))}
+)
+FREE_SPACE = [
+    Rectangle(width=100, height=100, x=0, y=0),
+    Rectangle(width=30, height=12, x=150, y=20),
+    Rectangle(width=21, height=40, x=200, y=60),
+    Rectangle(width=50, height=15, x=120, y=150),
+]
+
+
+class TopLeft(PlacementStrategy):
+    def choose_rectangle(self, free_rectangles, width, height):
+        return min(
+            free_rectangles.fitting(width, height),
+            key=lambda rectangle: (rectangle.y, rectangle.x),
+            default=None,
+        )
+
+    def position(self, rectangle, width, height, rng):
+        return rectangle.x, rectangle.y
+
+
+class TestStrategies(TestCase):
+    def test_choose_rectangle(self):
+        free = FreeRectangles(FREE_SPACE)
+
+        self.assertEqual(BestAreaFit().choose_rectangle(free, 20, 10), FREE_SPACE[1])
+        self.assertEqual(
+            BestShortSideFit().choose_rectangle(free, 20, 10), FREE_SPACE[2]
+        )
+        self.assertEqual(BottomLeft().choose_rectangle(free, 20, 10), FREE_SPACE[3])
+        self.assertIsNone(BottomLeft().choose_rectangle(free, 101, 10))
+
+        position = BottomLeft().position(FREE_SPACE[3], 20, 10, random.Random(0))
+        self.assertEqual(position, (120, 155))
+
+    def test_layouts_dont_overlap(self):
+        for name in STRATEGIES:
+            with self.subTest(strategy=name):
+                layout = compute_layout(
+                    WORD_COUNTS, width=400, height=300, seed=0, strategy=name
+                )
+
+                self.assertGreater(len(layout.words), 0)
+                self.assertEqual(find_overlaps(layout).overlapping_pixels, 0)
+                for placed in layout.words:
+                    x, y, right, bottom = placed.rectangle.xyrb
+                    self.assertTrue(0 <= x <= right <= 400 and 0 <= y <= bottom <= 300)
+
+    def test_rectangle_search_is_timed(self):
+        free = FreeRectangles(FREE_SPACE)
+        for name, strategy in STRATEGIES.items():
+            with self.subTest(strategy=name):
+                with collect_stats() as stats:
+                    strategy.choose_rectangle(free, 20, 10)
+                self.assertEqual(stats["rectangle_search"].calls, 1)
+
+    def test_default_strategy(self):
+        image = make_word_cloud(WORD_COUNTS, seed=0)
+        self.assertEqual(
+            image.tobytes(),
+            make_word_cloud(WORD_COUNTS, seed=0, strategy="largest").tobytes(),
+        )
+
+    def test_custom_strategy(self):
+        layout = compute_layout(WORD_COUNTS, seed=0, strategy=TopLeft())
+
+        first = layout.words[0].rectangle
+        self.assertEqual((first.x, first.y), (0, 0))
+        self.assertRaises(
+            AssertionError, compute_layout, WORD_COUNTS, strategy="smallest"
+        )
+        # strategies must choose a rectangle
+        self.assertRaises(TypeError, PlacementStrategy)
+
+    def test_strategies_of_the_occupancy_engine(self):
+        layout = compute_layout(WORD_COUNTS, seed=0, engine="occupancy")
+        self.assertEqual(
+            layout,
+            compute_layout(
+                WORD_COUNTS, seed=0, engine="occupancy", strategy=LargestFit()
+            ),
+        )
+        self.assertRaises(
+            AssertionError,
+            compute_layout,
+            WORD_COUNTS,
+            engine="occupancy",
+            strategy="best_area",
+        )
@@ -0,0 +1,42 @@
+import io
+import xml.etree.ElementTree as ET
+from collections import Counter
+from unittest import TestCase
+
+import hypothesis.strategies as st
+from hypothesis import given, settings
+
+from wrdcld import compute_layout, render_svg
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+class TestRenderSvg(TestCase):
+    @settings(deadline=None, max_examples=10)
+    @given(seed=st.integers(), scale=st.sampled_from([1, 2.5, 40]))
+    def test_render_svg(self, seed, scale):
+        words = Counter({"alpha": 30, "<b>&": 20, "gamma": 10, "delta": 5})
+        layout = compute_layout(words, width=300, height=200, seed=seed)
+
+        output = io.StringIO()
+        render_svg(layout, output, scale=scale)
+        svg = ET.fromstring(output.getvalue())
+
+        self.assertEqual(float(svg.get("width")), 300 * scale)
+        self.assertEqual(float(svg.get("height")), 200 * scale)
+        self.assertEqual(svg.get("viewBox"), "0 0 300 200")
+
+        texts = svg.findall(f"{SVG}g/{SVG}text")
+        self.assertEqual([text.text for text in texts], [p.word for p in layout.words])
+        for text, placed in zip(texts, layout.words):
+            self.assertEqual(int(text.get("font-size")), placed.font_size)
+            self.assertEqual(text.get("transform") is not None, placed.rotated)
+
+    def test_embed_font(self):
+        layout = compute_layout(["word"], width=100, height=100, seed=0)
+
+        output = io.StringIO()
+        render_svg(layout, output, embed_font=True)
+
+        style = ET.fromstring(output.getvalue()).find(f"{SVG}style")
+        self.assertIn("base64,", style.text)
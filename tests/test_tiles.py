@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+from collections import Counter
+from unittest import TestCase, mock
+
+import hypothesis.strategies as st
+from hypothesis import given, settings
+from PIL import Image
+
+from tests.strategies import paste_strategy, two_images_are_equal
+from wrdcld import (
+    ImageWrapper,
+    TiledImage,
+    compute_layout,
+    make_live_layout,
+    render,
+    render_png,
+)
+
+
+class TestTiledImage(TestCase):
+    @settings(deadline=None, max_examples=50)
+    @given(
+        pastes=st.lists(paste_strategy(100, 80), max_size=8),
+        box=st.tuples(
+            st.floats(-10, 50), st.floats(-10, 40), st.floats(0, 120), st.floats(0, 100)
+        ),
+    )
+    def test_same_as_image(self, pastes, box):
+        image = ImageWrapper(100, 70, (10, 20, 30))
+        # room for 2 full tiles, so most tiles are spilled to disk and read back
+        tiled = TiledImage(
+            100, 70, (10, 20, 30), tile_size=16, max_memory=2 * 3 * 16**2
+        )
+
+        for color, xy, mask in pastes:
+            image.paste_mask(color, xy, mask)
+            tiled.paste_mask(color, xy, mask)
+        patch = Image.new("RGB", (20, 20), (1, 2, 3))
+        image.paste(patch, (45, 25))
+        tiled.paste(patch, (45, 25))
+
+        left, top, width, height = box
+        box = (left, top, left + width, top + height)
+        self.assertTrue(two_images_are_equal(image.crop(box), tiled.crop(box)))
+        self.assertTrue(two_images_are_equal(image.img, tiled.crop((0, 0, 100, 70))))
+        self.assertLessEqual(tiled.stats.size, tiled.stats.max_size)
+        tiled.close()
+
+    def test_layout_with_bounded_canvas_memory(self):
+        words = Counter({"alpha": 30, "beta": 20, "gamma": 10, "delta": 5, "eps": 1})
+        layout = compute_layout(words, width=1200, height=900, seed=0)
+        # one tile out of six in memory at a time
+        tiled_layout = compute_layout(
+            words, width=1200, height=900, seed=0, max_canvas_memory=3 * 512**2
+        )
+        self.assertEqual(layout, tiled_layout)
+
+    def test_spilled_tiles_are_deleted(self):
+        words = Counter({"alpha": 30, "beta": 20, "gamma": 10, "delta": 5, "eps": 1})
+        params = {
+            "width": 1200,
+            "height": 900,
+            "seed": 0,
+            "max_canvas_memory": 3 * 512**2,
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.object(tempfile, "tempdir", directory):
+                compute_layout(words, **params)
+                self.assertEqual(os.listdir(directory), [])
+
+                with make_live_layout(words, **params) as live_layout:
+                    self.assertEqual(len(os.listdir(directory)), 1)
+                    live_layout.update(words + Counter({"zeta": 20}))
+                self.assertEqual(os.listdir(directory), [])
+
+
+class TestRenderPng(TestCase):
+    @settings(deadline=None, max_examples=10)
+    @given(
+        seed=st.integers(),
+        scale=st.sampled_from([1, 0.5, 2.5]),
+        max_memory=st.sampled_from([1, 3 * 300 * 7, 10**9]),
+    )
+    def test_same_as_render(self, seed, scale, max_memory):
+        words = Counter({"alpha": 30, "beta": 20, "gamma": 10, "delta": 5})
+        layout = compute_layout(words, width=300, height=200, seed=seed)
+
+        output = io.BytesIO()
+        render_png(layout, output, scale=scale, max_memory=max_memory)
+        output.seek(0)
+
+        with Image.open(output) as image:
+            self.assertTrue(
+                two_images_are_equal(image.convert("RGB"), render(layout, scale=scale))
+            )
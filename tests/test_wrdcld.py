@@ -63,3 +63,19 @@ class TestWordCloud(TestCase):
         word_cloud_2 = make_word_cloud(counter, seed=seed)
 
         self.assertTrue(_two_images_are_equal(word_cloud_1, word_cloud_2))
+
+        word_cloud_3 = make_word_cloud(iter(counter.items()), seed=seed)
+        self.assertTrue(_two_images_are_equal(word_cloud_1, word_cloud_3))
+
+    @settings(deadline=None, max_examples=10)
+    @given(words=words_with_repeats_strategy(), seed=st.integers())
+    def test_weights(self, words: list[str], seed: int):
+        counter = Counter(words)
+        # dividing by a power of two keeps the frequencies exactly the same
+        weights = Counter({word: count / 128 for word, count in counter.items()})
+
+        self.assertTrue(
+            _two_images_are_equal(
+                make_word_cloud(counter, seed=seed), make_word_cloud(weights, seed=seed)
+            )
+        )
@@ -2,82 +2,260 @@ from __future__ import annotations
 
 import math
 import random
-from collections import Counter
+import threading
 from collections.abc import Callable
-from dataclasses import replace
+from contextlib import nullcontext
 from pathlib import Path
 
 from PIL.Image import Image
 
-from .font import FontWrapper
-from .image import ImageWrapper
-from .main import fill_next_word
-from .rectangle import Rectangle
+from .aio import make_word_cloud_async
+from .batch import CloudResult, job_seed, make_word_clouds
+from .colors import COLOR_SCHEMES, ColorScheme
+from .encode import ENCODER_PRESETS, encode, encoder_options
+from .font import (
+    FontWrapper,
+    font_registry_stats,
+    glyph_cache_stats,
+    set_font_registry_size,
+    set_glyph_cache_size,
+)
+from .freespace import FreeRectangles
+from .image import ArrayCanvas, ImageWrapper
+from .ingest import Tokenizer, count_words
+from .layout import (
+    ENGINES,
+    LAYOUT_FONT_COLOR,
+    Layout,
+    LayoutCancelled,
+    LiveLayout,
+    OverlapReport,
+    PlacedWord,
+    find_overlaps,
+)
+from .main import Placement, fill_next_word, place_next_word
+from .mask import decompose_mask, mask_cache_stats, set_mask_cache_size
+from .metrics import MetricsStats, WordMetrics
+from .occupancy import OccupancyMap, place_word
+from .raster import render, render_array, render_png
+from .rectangle import Rectangle, RectangleArray
+from .rendercache import RenderCache, cache_key
+from .selection import WordSupply, iter_word_counts, select_renderable_words
+from .stats import RenderStats, StageStats, collect_stats
+from .strategy import (
+    STRATEGIES,
+    BestAreaFit,
+    BestShortSideFit,
+    BottomLeft,
+    LargestFit,
+    PlacementStrategy,
+)
+from .svg import render_svg
+from .tiles import TiledImage
 from .util import Color
 
 
-# pylint: disable=unused-argument
-def make_word_cloud(
-    all_words: list[str] | Counter,
+# pylint: disable=unused-argument,too-many-arguments
+def make_live_layout(
+    all_words: WordSupply,
     width: int = 500,
     height: int = 500,
     font_path: Path | None = None,
-    font_color: Color = (255, 255, 0),
-    font_color_func: Callable[[float], Color] | None = None,
-    background_color: Color = (73, 109, 137),
     minimum_font_size: int = 10,
     maximum_font_size: int = 100,
     word_padding: int = 0,  # TODO
     scaling_func: Callable[[float], float] = math.sqrt,
-    mask: Image | None = None,  # TODO
+    mask: Image | None = None,
     seed: int | float | str | bytes | bytearray | None = None,
-) -> Image:
-    if seed is not None:
-        random.seed(seed)
+    metrics: WordMetrics | None = None,
+    engine: str = "rectangles",
+    max_canvas_memory: int | None = None,
+    cancel: threading.Event | None = None,
+    strategy: str | PlacementStrategy = "largest",
+) -> LiveLayout:
+    """
+    Lays out a word cloud like `compute_layout`, but returns a `LiveLayout`, which can be
+    updated with `LiveLayout.update` when the word counts change.
+
+    With `max_canvas_memory` (in bytes), the words are drawn on a `TiledImage` that keeps
+    at most that much of the canvas in memory, for canvases too large to hold at once.
 
+    If the `cancel` event is set, e.g. from another thread, `LayoutCancelled` is raised
+    before the next word is placed.
+
+    The `strategy` decides which free rectangle each word goes in with the rectangles
+    engine: one of `STRATEGIES` ("largest", "best_area", "best_short_side" or
+    "bottom_left"), or a custom `PlacementStrategy`.
+    """
     # Asserts
-    assert len(all_words) > 0, "No words in list"
     assert width > 0, "Width must be a positive number (in pixels)"
     assert height > 0, "Height must be a positive number (in pixels)"
     assert (
         0 < minimum_font_size < maximum_font_size
     ), "Invalid font sizes, must be positive (in pixels)"
-    assert (
-        font_color is not None or font_color_func is not None
-    ), "Must specify a fixed font color or function"
-    assert isinstance(all_words, (list, Counter)), "Word supply must be list or Counter"
-
-    # Count the words
-    if isinstance(all_words, list):
-        word_counts = Counter(all_words)
-    else:
-        word_counts = all_words
-    first_word, first_count = word_counts.most_common(1)[0]
+    assert not isinstance(all_words, str), "Word supply must not be a single string"
+    assert engine in ENGINES, f"Engine must be one of {ENGINES}"
+    if isinstance(strategy, str):
+        assert strategy in STRATEGIES, f"Strategy must be one of {tuple(STRATEGIES)}"
+        strategy = STRATEGIES[strategy]
+    assert engine == "rectangles" or isinstance(
+        strategy, LargestFit
+    ), "Placement strategies only apply to the rectangles engine"
 
-    # Create a new image and font
+    # Create the font
     font_path = font_path or FontWrapper.default_font()
-    font_color_func = font_color_func or (lambda _: font_color)
-    image = ImageWrapper(width, height, background_color)
+    if metrics is None:
+        metrics = WordMetrics(font_path)
     font = FontWrapper(
-        path=font_path, color_func=font_color_func, size=maximum_font_size
+        path=font_path,
+        color_func=lambda _: LAYOUT_FONT_COLOR,
+        size=maximum_font_size,
+        metrics=metrics,
     )
 
-    actual_max_fontsize = font.find_fontsize_for_width(width, first_word)
+    # Break the free space of the mask down into rectangles
+    free_space = None
+    if mask is not None:
+        free_space = decompose_mask(mask, width, height)
+        assert len(free_space) > 0, "The mask must leave some space for words"
+
+    live_layout = LiveLayout(
+        width,
+        height,
+        font,
+        minimum_font_size,
+        scaling_func,
+        engine,
+        free_space,
+        max_canvas_memory,
+        # every layout has its own generator, so concurrent layouts are reproducible
+        random.Random(seed),
+        strategy,
+    )
+    try:
+        live_layout.place_words(live_layout.renderable_words(all_words), cancel)
+    except BaseException:
+        live_layout.close()
+        raise
+
+    return live_layout
+
+
+def compute_layout(
+    all_words: WordSupply,
+    width: int = 500,
+    height: int = 500,
+    font_path: Path | None = None,
+    minimum_font_size: int = 10,
+    maximum_font_size: int = 100,
+    word_padding: int = 0,  # TODO
+    scaling_func: Callable[[float], float] = math.sqrt,
+    mask: Image | None = None,
+    seed: int | float | str | bytes | bytearray | None = None,
+    metrics: WordMetrics | None = None,
+    engine: str = "rectangles",
+    max_canvas_memory: int | None = None,
+    cancel: threading.Event | None = None,
+    strategy: str | PlacementStrategy = "largest",
+) -> Layout:
+    """
+    Works out where every word of a word cloud goes, without drawing it. The layout
+    doesn't depend on the colors, and can be drawn with `render`.
+    """
+    live_layout = make_live_layout(
+        all_words,
+        width=width,
+        height=height,
+        font_path=font_path,
+        minimum_font_size=minimum_font_size,
+        maximum_font_size=maximum_font_size,
+        word_padding=word_padding,
+        scaling_func=scaling_func,
+        mask=mask,
+        seed=seed,
+        metrics=metrics,
+        engine=engine,
+        max_canvas_memory=max_canvas_memory,
+        cancel=cancel,
+        strategy=strategy,
+    )
+    # only the words are kept, so a tiled canvas can be deleted
+    try:
+        return live_layout.layout
+    finally:
+        live_layout.close()
 
-    if actual_max_fontsize < maximum_font_size:
-        maximum_font_size = actual_max_fontsize
-        font = replace(font, size=actual_max_fontsize)
 
-    available_rectangles = [Rectangle(width=width, height=height, x=0, y=0)]
-    for word, count in word_counts.most_common():
-        frequency = count / first_count
-        required_font_size = maximum_font_size * scaling_func(frequency)
+def make_word_cloud(
+    all_words: WordSupply,
+    width: int = 500,
+    height: int = 500,
+    font_path: Path | None = None,
+    font_color: Color = (255, 255, 0),
+    font_color_func: Callable[[float], Color] | None = None,
+    background_color: Color = (73, 109, 137),
+    minimum_font_size: int = 10,
+    maximum_font_size: int = 100,
+    word_padding: int = 0,  # TODO
+    scaling_func: Callable[[float], float] = math.sqrt,
+    mask: Image | None = None,
+    seed: int | float | str | bytes | bytearray | None = None,
+    metrics: WordMetrics | None = None,
+    engine: str = "rectangles",
+    layout_scale: float = 1.0,
+    stats: RenderStats | None = None,
+    cancel: threading.Event | None = None,
+    strategy: str | PlacementStrategy = "largest",
+    color_scheme: str | None = None,
+) -> Image:
+    assert (
+        font_color is not None or font_color_func is not None
+    ), "Must specify a fixed font color or function"
+    if color_scheme is not None:
+        assert font_color_func is None, "Can't use both a color scheme and a function"
+        assert (
+            color_scheme in COLOR_SCHEMES
+        ), f"Color scheme must be one of {tuple(COLOR_SCHEMES)}"
+        font_color_func = COLOR_SCHEMES[color_scheme]
+    assert 0 < layout_scale <= 1, "Layout scale must be in (0, 1]"
+    assert (
+        0 < minimum_font_size < maximum_font_size
+    ), "Invalid font sizes, must be positive (in pixels)"
 
-        if required_font_size < minimum_font_size:
-            break
+    # the stages are only timed while a collector is given
+    with collect_stats(stats) if stats is not None else nullcontext():
+        # the words are placed at a draft resolution, and only drawn at full resolution,
+        # with font sizes that stay valid however small the draft is
+        draft_minimum_font_size = max(1, round(minimum_font_size * layout_scale))
+        draft_maximum_font_size = max(
+            draft_minimum_font_size + 1, round(maximum_font_size * layout_scale)
+        )
+        layout = compute_layout(
+            all_words,
+            width=max(1, round(width * layout_scale)),
+            height=max(1, round(height * layout_scale)),
+            font_path=font_path,
+            minimum_font_size=draft_minimum_font_size,
+            maximum_font_size=draft_maximum_font_size,
+            word_padding=word_padding,
+            scaling_func=scaling_func,
+            mask=mask,
+            seed=seed,
+            metrics=metrics,
+            engine=engine,
+            cancel=cancel,
+            strategy=strategy,
+        )
+        if layout_scale != 1:
+            layout = layout.scaled(width, height)
 
-        available_rectangles = fill_next_word(
-            word, available_rectangles, image, font[required_font_size], frequency
+        image = render(
+            layout,
+            font_color=font_color,
+            font_color_func=font_color_func,
+            background_color=background_color,
         )
 
-    return image.img
+    if stats is not None:
+        image.info["render_stats"] = stats
+    return image
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any
+
+from PIL.Image import Image
+
+from .selection import WordSupply
+
+_DEFAULT_EXECUTOR: ThreadPoolExecutor | None = None
+_DEFAULT_EXECUTOR_LOCK = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _DEFAULT_EXECUTOR  # pylint: disable=global-statement
+    with _DEFAULT_EXECUTOR_LOCK:
+        if _DEFAULT_EXECUTOR is None:
+            _DEFAULT_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="wrdcld")
+        return _DEFAULT_EXECUTOR
+
+
+def _release_on(loop: asyncio.AbstractEventLoop, limit: asyncio.Semaphore):
+    def release(_):
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(limit.release)
+
+    return release
+
+
+async def make_word_cloud_async(
+    all_words: WordSupply,
+    executor: Executor | None = None,
+    limit: asyncio.Semaphore | None = None,
+    **params: Any,
+) -> Image:
+    """
+    Makes a word cloud like `make_word_cloud`, in an executor, without blocking the
+    event loop.
+
+    When the awaiting task is cancelled, the render is told to stop and gives up before
+    placing its next word, so abandoned renders stop using the CPU right away. The
+    executor must run jobs in threads of this process, as the render is stopped through
+    a `threading.Event`.
+
+    Every render has its own random generator, so a seed reproduces the same word cloud
+    however many other renders run at the same time.
+
+    Args:
+        all_words (WordSupply): The words, as for `make_word_cloud`.
+        executor (Executor | None): Where to run the render, by default a shared thread pool.
+        limit (asyncio.Semaphore | None): Held while the render runs, to limit how many run at once. A cancelled render only releases it once it has stopped.
+        **params: The other arguments of `make_word_cloud`.
+
+    Returns:
+        Image: The word cloud.
+    """
+    # pylint: disable=import-outside-toplevel
+    from . import make_word_cloud
+
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+
+    if limit is not None:
+        await limit.acquire()
+    try:
+        job = (executor or _default_executor()).submit(
+            make_word_cloud, all_words, cancel=cancel, **params
+        )
+    except BaseException:
+        if limit is not None:
+            limit.release()
+        raise
+    if limit is not None:
+        job.add_done_callback(_release_on(loop, limit))
+
+    try:
+        return await asyncio.wrap_future(job)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
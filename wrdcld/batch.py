@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Union
+
+from PIL.Image import Image
+
+from .encode import encode
+from .font import FontWrapper
+from .metrics import WordMetrics
+from .selection import WordSupply
+
+# the image format of a job defaults to the one of the batch
+Job = Union[tuple[WordSupply, dict[str, Any]], tuple[WordSupply, dict[str, Any], str]]
+
+# the word metrics of each font, kept by every worker process across jobs
+_WORKER_METRICS: dict[Path, WordMetrics] = {}
+
+
+@dataclass(frozen=True)
+class CloudResult:
+    index: int
+    seed: int | float | str | bytes | bytearray
+    image: Image | bytes | None
+    error: BaseException | None = None
+
+
+def job_seed(seed: int | str, index: int) -> str:
+    """
+    Returns the seed used for a job in a batch that doesn't specify its own.
+
+    Passing it to `make_word_cloud` reproduces the job's image in a serial run.
+
+    Args:
+        seed (int | str): The seed of the batch.
+        index (int): The position of the job in the batch.
+
+    Returns:
+        str: The seed of the job.
+    """
+    return f"{seed}:{index}"
+
+
+def _warm_up():
+    """
+    Loads the default font in a new worker process, before its first job.
+    """
+    FontWrapper(color_func=lambda _: (0, 0, 0), path=FontWrapper.default_font()).get()
+
+
+def _render_job(
+    words: WordSupply,
+    params: dict[str, Any],
+    image_format: str | None,
+    encoder_preset: str = "default",
+) -> Image | bytes:
+    # pylint: disable=import-outside-toplevel
+    from . import make_word_cloud
+
+    # fonts are cached in the worker process, so only the first job in each worker loads
+    # them, and so are the word metrics of each font
+    if "metrics" not in params:
+        font_path = Path(params.get("font_path") or FontWrapper.default_font())
+        if font_path not in _WORKER_METRICS:
+            _WORKER_METRICS[font_path] = WordMetrics(font_path)
+        params = {**params, "metrics": _WORKER_METRICS[font_path]}
+
+    img = make_word_cloud(words, **params)
+    if image_format is None:
+        return img
+
+    buffer = BytesIO()
+    encode(img, buffer, image_format, encoder_preset)
+    return buffer.getvalue()
+
+
+def _submit(
+    executor: ProcessPoolExecutor,
+    job: Job | BaseException,
+    default_seed: str,
+    image_format: str | None,
+    encoder_preset: str,
+) -> tuple[Future, Any]:
+    if isinstance(job, BaseException):
+        failed: Future = Future()
+        failed.set_exception(job)
+        return failed, default_seed
+
+    words, params, *job_format = job
+    # iterators can't be sent to other processes, so they are read here
+    if not isinstance(words, (list, Mapping)):
+        words = list(words)
+    params = {"seed": default_seed, **params}
+    future = executor.submit(
+        _render_job,
+        words,
+        params,
+        job_format[0] if job_format else image_format,
+        encoder_preset,
+    )
+    return future, params["seed"]
+
+
+def _pop_done(pending: deque[Future], ordered: bool) -> list[Future]:
+    if ordered:
+        return [pending.popleft()]
+
+    done_set, _ = wait(pending, return_when=FIRST_COMPLETED)
+    done = [future for future in pending if future in done_set]
+    for future in done:
+        pending.remove(future)
+    return done
+
+
+def _result(
+    future: Future, index: int, seed: Any, return_exceptions: bool
+) -> CloudResult:
+    try:
+        image = future.result()
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        if not return_exceptions:
+            raise
+        return CloudResult(index=index, seed=seed, image=None, error=error)
+    return CloudResult(index=index, seed=seed, image=image)
+
+
+def make_word_clouds(
+    jobs: Iterable[Job | BaseException],
+    seed: int | str = 0,
+    max_workers: int | None = None,
+    image_format: str | None = None,
+    ordered: bool = True,
+    encoder_preset: str = "default",
+    return_exceptions: bool = False,
+) -> Iterator[CloudResult]:
+    """
+    Makes many word clouds in parallel over a pool of processes.
+
+    Each job is a `(words, params)` pair, where `words` are in any form `make_word_cloud`
+    accepts and `params` are keyword arguments for it. A job can also give its own image
+    format, as a third element. Jobs are sent to other processes, so `font_color_func` and
+    `scaling_func` must be module level functions rather than lambdas. Jobs without a
+    `seed` get `job_seed(seed, index)`, so every image is the same as in a serial run.
+
+    Args:
+        jobs (Iterable[Job | BaseException]): The words and parameters of each word cloud.
+        seed (int | str): The seed the seeds of the individual jobs are derived from.
+        max_workers (int | None): The number of processes, by default the number of CPUs.
+        image_format (str | None): If given, images are returned encoded in this format (e.g. "PNG").
+        ordered (bool): Whether to return the results in the order of the jobs, or as they complete.
+        encoder_preset (str): The encoder options of the image format, one of `ENCODER_PRESETS`.
+        return_exceptions (bool): Whether a job that fails gives a result with its `error`, rather than stopping the batch. The jobs can then also be exceptions (e.g. from reading them), which are returned the same way.
+
+    Returns:
+        Iterator[CloudResult]: The word clouds, along with the index and seed of their job.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    # limit the number of jobs in flight, so long job iterables aren't read all at once
+    max_pending = 4 * max_workers
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_warm_up) as executor:
+        seeds: dict[Future, tuple[int, Any]] = {}
+        pending: deque[Future] = deque()
+        remaining_jobs = enumerate(jobs)
+
+        def submit_next() -> bool:
+            for index, job in remaining_jobs:
+                assert return_exceptions or not isinstance(
+                    job, BaseException
+                ), "Jobs can only be exceptions with return_exceptions"
+                future, used_seed = _submit(
+                    executor, job, job_seed(seed, index), image_format, encoder_preset
+                )
+                seeds[future] = (index, used_seed)
+                pending.append(future)
+                return True
+            return False
+
+        try:
+            while len(pending) < max_pending and submit_next():
+                pass
+
+            while pending:
+                for future in _pop_done(pending, ordered):
+                    index, used_seed = seeds.pop(future)
+                    yield _result(future, index, used_seed, return_exceptions)
+                    submit_next()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+    max_size: int
+
+
+class BoundedLRU(Generic[K, V]):
+    """
+    A least-recently-used cache that evicts entries once their total size exceeds a budget.
+
+    The size of each entry is given by `sizeof`, which counts every entry as 1 by default,
+    and `on_evict` is called with every entry that is evicted.
+
+    The cache can be shared between threads. Values are created outside of its lock, so
+    two threads that miss the same key at once may both create it, and the first one to
+    finish is kept.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        sizeof: Callable[[V], int] = lambda _: 1,
+        on_evict: Callable[[K, V], None] | None = None,
+    ):
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._max_size = max_size
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: K, create: Callable[[], V]) -> V:
+        """
+        Returns the cached value for the key, creating and caching it on a miss.
+
+        Args:
+            key (K): The cache key.
+            create (Callable[[], V]): Creates the value if it isn't cached.
+
+        Returns:
+            V: The cached or newly created value.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self._misses += 1
+
+        value = create()
+        with self._lock:
+            # another thread may have created it in the meantime
+            if key in self._entries:
+                return self._entries[key]
+            self._insert(key, value)
+        return value
+
+    def _insert(self, key: K, value: V):
+        size = self._sizeof(value)
+        # values bigger than the whole budget are never cached
+        if size > self._max_size:
+            return
+
+        self._entries[key] = value
+        self._size += size
+        self._evict()
+
+    def _evict(self):
+        while self._size > self._max_size:
+            key, value = self._entries.popitem(last=False)
+            self._size -= self._sizeof(value)
+            self._evictions += 1
+            if self._on_evict is not None:
+                self._on_evict(key, value)
+
+    def resize(self, max_size: int):
+        """
+        Changes the budget, evicting the least recently used entries if needed.
+
+        Args:
+            max_size (int): The new budget.
+        """
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size=self._size,
+                max_size=self._max_size,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
@@ -0,0 +1,437 @@
+"""
+The `python -m wrdcld` command line, which makes word clouds in a long-lived process.
+
+`python -m wrdcld batch` reads one JSON job per line and writes one JSON result per line,
+in the same order. `python -m wrdcld serve` answers jobs posted over HTTP. In both modes
+the word clouds are made by a pool of worker processes that live as long as the command,
+so fonts, word metrics and glyph masks are only loaded once per worker.
+
+A job is a JSON object like
+
+    {"id": "weekly", "words": {"alpha": 3, "beta": 1}, "params": {"width": 300}, "format": "PNG"}
+
+where `words` is a mapping from words to counts, a list of words, or a list of
+[word, count] pairs, and `params` are keyword arguments for `make_word_cloud` that can be
+written in JSON. `font_path` and `mask` are paths, and colors are [r, g, b] lists.
+
+The server reads files on behalf of its clients, so it only accepts `font_path` and
+`mask` when it is given a directory with `--files`, and only paths inside it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, TextIO
+
+from PIL import Image
+
+from .batch import _WORKER_METRICS, Job, _render_job, _warm_up, make_word_clouds
+from .encode import ENCODER_PRESETS
+from .font import font_registry_stats, glyph_cache_stats
+
+DEFAULT_IMAGE_FORMAT = "PNG"
+# the number of recent requests the latency percentiles of the server are taken over
+LATENCY_WINDOW = 1000
+
+_PATH_PARAMS = ("font_path", "mask")
+_COLOR_PARAMS = ("font_color", "background_color")
+
+
+def _job_path(value: str, file_root: Path | None) -> Path:
+    path = Path(value)
+    if file_root is None:
+        return path
+
+    # resolved, so that neither ".." nor symlinks lead out of the directory
+    resolved = (file_root / path).resolve()
+    if not resolved.is_relative_to(file_root.resolve()):
+        raise PermissionError(f"{value} is outside the files directory")
+    return resolved
+
+
+def parse_job(
+    job: dict[str, Any],
+    default_format: str = DEFAULT_IMAGE_FORMAT,
+    file_root: Path | None = None,
+    allow_files: bool = True,
+) -> tuple[Counter | list, dict[str, Any], str]:
+    """
+    Turns a JSON job into the arguments of `make_word_cloud`.
+
+    Args:
+        job (dict[str, Any]): The decoded JSON job.
+        default_format (str): The image format of jobs that don't give one.
+        file_root (Path | None): If given, paths are relative to this directory and must stay inside it.
+        allow_files (bool): Whether the job may name files at all.
+
+    Returns:
+        tuple[Counter | list, dict[str, Any], str]: The words, the keyword arguments and the image format.
+
+    Raises:
+        PermissionError: If the job names a file it isn't allowed to read.
+    """
+    assert isinstance(job, dict), "A job must be a JSON object"
+    assert "words" in job, "A job must have words"
+
+    words = job["words"]
+    if isinstance(words, dict):
+        words = Counter(words)
+    elif words and not isinstance(words[0], str):
+        words = [tuple(pair) for pair in words]
+
+    params = dict(job.get("params", {}))
+    for name in _PATH_PARAMS:
+        if name in params:
+            if not allow_files:
+                raise PermissionError(f"{name} isn't allowed without a files directory")
+            params[name] = _job_path(params[name], file_root)
+    for name in _COLOR_PARAMS:
+        if name in params:
+            params[name] = tuple(params[name])
+    if "mask" in params:
+        with Image.open(params["mask"]) as mask:
+            params["mask"] = mask.copy()
+
+    return words, params, str(job.get("format", default_format)).upper()
+
+
+def _render_served_job(
+    words: Counter | list, params: dict[str, Any], image_format: str, preset: str
+) -> tuple[bytes, dict[str, Any]]:
+    image = _render_job(words, params, image_format, preset)
+    assert isinstance(image, bytes)
+    caches = {
+        "pid": os.getpid(),
+        "font_registry": asdict(font_registry_stats()),
+        "glyph_cache": asdict(glyph_cache_stats()),
+        "word_metrics": sum(len(metrics) for metrics in _WORKER_METRICS.values()),
+    }
+    return image, caches
+
+
+def _error_message(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+def run_batch(
+    lines: Iterable[str],
+    output: TextIO,
+    max_workers: int | None = None,
+    seed: int | str = 0,
+    image_format: str = DEFAULT_IMAGE_FORMAT,
+    preset: str = "fast",
+) -> int:
+    """
+    Makes the word cloud of every JSON job in `lines`, and writes a JSON result per job.
+
+    Results are written in the order of the jobs, as soon as they and the jobs before them
+    are done. A result has the `index` and `id` of its job, and either the `seed`, `format`
+    and base64 encoded `image`, or an `error`. A job that fails doesn't stop the others.
+
+    Args:
+        lines (Iterable[str]): The jobs, one JSON object per line. Blank lines are skipped.
+        output (TextIO): Where to write the results, one JSON object per line.
+        max_workers (int | None): The number of processes, by default the number of CPUs.
+        seed (int | str): The seed of jobs without one is `job_seed(seed, index)`.
+        image_format (str): The image format of jobs that don't give one.
+        preset (str): The encoder options of the image format, one of `ENCODER_PRESETS`.
+
+    Returns:
+        int: The number of jobs that failed.
+    """
+    # the start of the result of each job that is read but not yet written
+    results: dict[int, dict[str, Any]] = {}
+
+    def read_jobs() -> Iterator[Job | BaseException]:
+        for index, line in enumerate(line for line in lines if line.strip()):
+            result: dict[str, Any] = {"index": index, "id": None}
+            results[index] = result
+            try:
+                job = json.loads(line)
+                result["id"] = job.get("id") if isinstance(job, dict) else None
+                words, params, result["format"] = parse_job(job, image_format)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                yield error
+                continue
+            yield words, params, result["format"]
+
+    failures = 0
+    for cloud in make_word_clouds(
+        read_jobs(),
+        seed,
+        max_workers,
+        encoder_preset=preset,
+        return_exceptions=True,
+    ):
+        result = results.pop(cloud.index)
+        if cloud.error is None:
+            assert isinstance(cloud.image, bytes)
+            result["seed"] = cloud.seed
+            result["image"] = base64.b64encode(cloud.image).decode("ascii")
+        else:
+            failures += 1
+            result = {
+                "index": result["index"],
+                "id": result["id"],
+                "error": _error_message(cloud.error),
+            }
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    return failures
+
+
+class ServerMetrics:
+    """
+    Counts the requests of the server, and keeps the latencies of the most recent ones.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._workers: dict[int, dict[str, Any]] = {}
+
+    def start(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def finish(self, seconds: float, ok: bool, caches: dict[str, Any] | None = None):
+        with self._lock:
+            self._in_flight -= 1
+            self._requests += 1
+            if ok:
+                self._latencies.append(seconds)
+            else:
+                self._errors += 1
+            if caches is not None:
+                self._workers[caches["pid"]] = caches
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns the metrics as a JSON serializable dict.
+        """
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            latencies = sorted(self._latencies)
+            completed = self._requests - self._errors
+
+            latency: dict[str, float | None] = dict.fromkeys(
+                ("mean", "p50", "p90", "p99", "max")
+            )
+            if latencies:
+                latency["mean"] = statistics.fmean(latencies)
+                for name, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                    latency[name] = latencies[
+                        min(len(latencies) - 1, int(quantile * len(latencies)))
+                    ]
+                latency["max"] = latencies[-1]
+
+            return {
+                "uptime_seconds": uptime,
+                "requests": self._requests,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+                "clouds_per_second": completed / uptime if uptime > 0 else 0.0,
+                "latency_seconds": latency,
+                "latency_window": len(latencies),
+                "workers": sorted(self._workers.values(), key=lambda w: w["pid"]),
+            }
+
+
+class WordCloudServer(ThreadingHTTPServer):
+    """
+    An HTTP server that makes word clouds with a pool of long-lived worker processes.
+
+    `POST /render` with a JSON job answers with the encoded image, `GET /metrics` with
+    the throughput and latency of the server and the cache statistics of its workers.
+
+    Jobs can only name fonts and masks inside `file_root`, and none without it, so that
+    clients can't read other files of the host.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        max_workers: int | None = None,
+        image_format: str = DEFAULT_IMAGE_FORMAT,
+        preset: str = "fast",
+        verbose: bool = False,
+        file_root: Path | None = None,
+    ):
+        super().__init__(address, _RequestHandler)
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_warm_up
+        )
+        self.image_format = image_format
+        self.preset = preset
+        self.metrics = ServerMetrics()
+        self.verbose = verbose
+        self.file_root = file_root
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: WordCloudServer
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, value: Any):
+        self._send(status, json.dumps(value).encode("utf-8"), "application/json")
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.server.metrics.snapshot())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        if self.path != "/render":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+
+        metrics = self.server.metrics
+        metrics.start()
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            words, params, image_format = parse_job(
+                json.loads(self.rfile.read(length)),
+                self.server.image_format,
+                file_root=self.server.file_root,
+                allow_files=self.server.file_root is not None,
+            )
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            metrics.finish(time.perf_counter() - start, ok=False)
+            status = (
+                HTTPStatus.FORBIDDEN
+                if isinstance(error, PermissionError)
+                else HTTPStatus.BAD_REQUEST
+            )
+            self._send_json(status, {"error": _error_message(error)})
+            return
+
+        try:
+            image, caches = self.server.executor.submit(
+                _render_served_job, words, params, image_format, self.server.preset
+            ).result()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            metrics.finish(time.perf_counter() - start, ok=False)
+            self._send_json(
+                HTTPStatus.UNPROCESSABLE_ENTITY, {"error": _error_message(error)}
+            )
+            return
+
+        metrics.finish(time.perf_counter() - start, ok=True, caches=caches)
+        Image.init()
+        mime = Image.MIME.get(image_format, "application/octet-stream")
+        self._send(HTTPStatus.OK, image, mime)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m wrdcld",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--workers", type=int, help="number of worker processes (default: CPUs)"
+    )
+    parser.add_argument("--format", default=DEFAULT_IMAGE_FORMAT, help="image format")
+    parser.add_argument(
+        "--preset",
+        choices=sorted(ENCODER_PRESETS),
+        default="fast",
+        help="encoder options of the image format",
+    )
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    batch = modes.add_parser("batch", help="make the word clouds of JSONL jobs")
+    batch.add_argument(
+        "input", nargs="?", default="-", help="jobs file (default: stdin)"
+    )
+    batch.add_argument(
+        "-o", "--output", default="-", help="results file (default: stdout)"
+    )
+    batch.add_argument("--seed", default="0", help="seed of jobs without one")
+
+    serve = modes.add_parser("serve", help="make word clouds over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    serve.add_argument(
+        "--files",
+        type=Path,
+        help="directory of the fonts and masks that jobs may use (default: none)",
+    )
+
+    args = parser.parse_args(argv)
+    max_workers = args.workers or os.cpu_count() or 1
+    image_format = args.format.upper()
+
+    if args.mode == "serve":
+        with WordCloudServer(
+            (args.host, args.port),
+            max_workers,
+            image_format,
+            preset=args.preset,
+            verbose=args.verbose,
+            file_root=args.files,
+        ) as server:
+            print(
+                f"Serving word clouds on http://{args.host}:{server.server_port}",
+                file=sys.stderr,
+            )
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    # pylint: disable=consider-using-with
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    seed = int(args.seed) if args.seed.lstrip("-").isdigit() else args.seed
+    try:
+        failures = run_batch(
+            source, output, max_workers, seed, image_format, args.preset
+        )
+    finally:
+        for file in (source, output):
+            if file not in (sys.stdin, sys.stdout):
+                file.close()
+
+    return 1 if failures else 0
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .util import Color
+
+
+@dataclass(frozen=True)
+class ColorScheme:
+    """
+    Colors words by their frequency, going evenly through a list of colors from the
+    rarest words (frequency 0) to the most common word (frequency 1).
+
+    Unlike a lambda, a color scheme can be compared, pickled and named, so word clouds
+    colored with one can be made in other processes and cached.
+    """
+
+    stops: tuple[Color, ...]
+
+    def __post_init__(self):
+        assert len(self.stops) > 0, "A color scheme needs at least one color"
+
+    def __call__(self, frequency: float) -> Color:
+        if len(self.stops) == 1:
+            return self.stops[0]
+
+        position = min(max(frequency, 0.0), 1.0) * (len(self.stops) - 1)
+        index = min(int(position), len(self.stops) - 2)
+        fraction = position - index
+        start, end = self.stops[index], self.stops[index + 1]
+        return (
+            round(start[0] + (end[0] - start[0]) * fraction),
+            round(start[1] + (end[1] - start[1]) * fraction),
+            round(start[2] + (end[2] - start[2]) * fraction),
+        )
+
+
+COLOR_SCHEMES: dict[str, ColorScheme] = {
+    "viridis": ColorScheme(
+        ((68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37))
+    ),
+    "magma": ColorScheme(
+        ((0, 0, 4), (81, 18, 124), (183, 55, 121), (252, 137, 97), (252, 253, 191))
+    ),
+    "ocean": ColorScheme(((158, 202, 225), (49, 130, 189), (8, 48, 107))),
+    "sunset": ColorScheme(((254, 217, 118), (253, 141, 60), (227, 26, 28))),
+    "grayscale": ColorScheme(((190, 190, 190), (0, 0, 0))),
+}
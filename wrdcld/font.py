@@ -1,31 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import weakref
 from collections.abc import Callable
-from dataclasses import dataclass, replace
-from functools import lru_cache
+from dataclasses import dataclass, field, replace
+from io import BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from PIL import Image, ImageDraw, ImageFont
 from PIL.ImageFont import FreeTypeFont
 
-from .image import ImageWrapper
+from .cache import BoundedLRU, CacheStats
+from .image import Canvas
 from .rectangle import Rectangle
+from .stats import timed
 from .util import Color, get_repo_root
 
+if TYPE_CHECKING:
+    from .metrics import WordMetrics
+
+DEFAULT_GLYPH_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_FONT_FACES = 128
+
+
+class FontRegistry:
+    """
+    A registry of font faces, shared by every word cloud in the process.
+
+    Each font file is read into memory once, and faces of each size are built from that
+    buffer. Faces are keyed by the digest of the file contents and the size, and the least
+    recently used faces are evicted once there are more than `max_faces`.
+
+    FreeType faces can't be used by several threads at once, so every thread gets its own
+    pool of faces, of up to `max_faces` each. The font files are shared by all threads.
+    """
+
+    def __init__(self, max_faces: int = DEFAULT_MAX_FONT_FACES):
+        self._digests: dict[Path, str] = {}
+        self._buffers: dict[str, bytes] = {}
+        self._max_faces = max_faces
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # the pools of the threads that are still alive
+        self._pools: weakref.WeakSet[BoundedLRU[tuple[str, int], FreeTypeFont]] = (
+            weakref.WeakSet()
+        )
+
+    def _faces(self) -> BoundedLRU[tuple[str, int], FreeTypeFont]:
+        faces = getattr(self._local, "faces", None)
+        if faces is None:
+            faces = BoundedLRU(max_size=self._max_faces)
+            with self._lock:
+                self._pools.add(faces)
+            self._local.faces = faces
+        return faces
+
+    def digest(self, path: Path) -> str:
+        """
+        Reads a font file, if it hasn't been read already, and returns the digest of its contents.
+
+        Args:
+            path (Path): The path to the font file.
+
+        Returns:
+            str: The sha256 digest of the font file.
+        """
+        path = Path(path)
+        digest = self._digests.get(path)
+        if digest is None:
+            font_bytes = path.read_bytes()
+            digest = hashlib.sha256(font_bytes).hexdigest()
+            with self._lock:
+                self._buffers.setdefault(digest, font_bytes)
+                self._digests[path] = digest
+
+        return digest
+
+    def get(self, path: Path, size: int) -> FreeTypeFont:
+        """
+        Returns a face of the font at the given size, owned by the calling thread.
+
+        Args:
+            path (Path): The path to the font file.
+            size (int): The font size.
+
+        Returns:
+            FreeTypeFont: The font face.
+        """
+        digest = self.digest(path)
+        return self._faces().get_or_create(
+            (digest, size),
+            lambda: _load_face(self._buffers[digest], size),
+        )
+
+    def resize(self, max_faces: int):
+        with self._lock:
+            self._max_faces = max_faces
+            pools = list(self._pools)
+        for faces in pools:
+            faces.resize(max_faces)
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        The statistics of the face pools of all live threads, added up. `max_size` is the
+        size of each pool.
+        """
+        with self._lock:
+            pools = [faces.stats for faces in self._pools]
+            max_faces = self._max_faces
+
+        return CacheStats(
+            hits=sum(pool.hits for pool in pools),
+            misses=sum(pool.misses for pool in pools),
+            evictions=sum(pool.evictions for pool in pools),
+            entries=sum(pool.entries for pool in pools),
+            size=sum(pool.size for pool in pools),
+            max_size=max_faces,
+        )
+
+
+_FONT_REGISTRY = FontRegistry()
+
+
+@timed("font_loading")
+def _load_face(data: bytes, size: int) -> FreeTypeFont:
+    return ImageFont.truetype(BytesIO(data), size)
+
+
+def set_font_registry_size(max_faces: int):
+    """
+    Sets how many font faces each thread keeps in memory, evicting faces if it is now too small.
+
+    Args:
+        max_faces (int): The maximum number of font faces per thread.
+    """
+    _FONT_REGISTRY.resize(max_faces)
+
+
+def font_registry_stats() -> CacheStats:
+    """
+    Returns the hit, miss and eviction counts of the font registry.
+    """
+    return _FONT_REGISTRY.stats
+
 
 @dataclass(frozen=True)
 class FontWrapper:
-    color_func: Callable[[float], Color]
+    # the color doesn't change the glyphs, so it isn't part of the font's identity
+    color_func: Callable[[float], Color] = field(compare=False)
     path: Path
     size: int = 1
+    # optional table of precomputed word metrics, used instead of measuring with FreeType
+    metrics: WordMetrics | None = field(default=None, compare=False)
 
     def color(self, frequency: float) -> Color:
         return self.color_func(frequency)
 
-    @lru_cache(maxsize=1024)
     def get(self) -> FreeTypeFont:
-        return ImageFont.truetype(str(self.path), self.size)
+        return _FONT_REGISTRY.get(self.path, self.size)
 
-    @lru_cache(maxsize=1024)
     def getbbox(self, word: str) -> Rectangle:
+        if self.metrics is not None:
+            return self.metrics.bbox(self, word)
+
         bbox = self.get().getbbox(word)
         return Rectangle(
             x=bbox[0], y=bbox[1], width=bbox[2] - bbox[0], height=bbox[3] - bbox[1]
@@ -36,8 +176,12 @@ class FontWrapper:
         return replace(self, size=rounded_new_size)
 
     def get_length_of_word(self, word: str) -> float:
+        if self.metrics is not None:
+            return self.metrics.length(self, word)
+
         return self.get().getlength(word)
 
+    @timed("font_sizing")
     def find_fontsize_for_width(self, width: int, word: str) -> int:
         # Check if the word can fit even with the smallest font size
         test_font = replace(self, size=1)
@@ -76,8 +220,85 @@ class FontWrapper:
         return get_repo_root() / "fonts" / "OpenSans-Regular.ttf"
 
 
+@timed("glyph_rasterization")
+def _render_glyph_mask(font: FontWrapper, word: str) -> Image.Image:
+    """
+    Renders a word into a single channel mask, cropped to its bounding box.
+    """
+    text_bbox = font.getbbox(word)
+    mask = Image.new("L", text_bbox.wh, 0)
+    ImageDraw.Draw(mask).text(
+        (-text_bbox.x, -text_bbox.y), word, font=font.get(), fill=255
+    )
+    return mask
+
+
+_GLYPH_CACHE: BoundedLRU[tuple[str, int, str, bool], Image.Image] = BoundedLRU(
+    max_size=DEFAULT_GLYPH_CACHE_BYTES, sizeof=lambda mask: mask.width * mask.height
+)
+
+
+def get_glyph_mask(font: FontWrapper, word: str, rotate: bool = False) -> Image.Image:
+    """
+    Returns the rendered mask of a word, from the process-wide glyph cache if possible.
+
+    Words are only rasterized horizontally. Rotated masks are transposed from the
+    horizontal ones, which is exact and much cheaper than drawing the text again.
+
+    Args:
+        font (FontWrapper): The font, at the size to render.
+        word (str): The word to render.
+        rotate (bool): Whether the word is rotated 90 degrees counter-clockwise.
+
+    Returns:
+        Image: A mode "L" mask of the word, cropped to its bounding box.
+    """
+    if rotate:
+        return _GLYPH_CACHE.get_or_create(
+            (str(font.path), font.size, word, True),
+            lambda: get_glyph_mask(font, word).transpose(Image.Transpose.ROTATE_90),
+        )
+
+    return _GLYPH_CACHE.get_or_create(
+        (str(font.path), font.size, word, False),
+        lambda: _render_glyph_mask(font, word),
+    )
+
+
+def set_glyph_cache_size(max_bytes: int):
+    """
+    Sets the memory budget of the glyph cache, evicting masks if it is now too small.
+
+    Args:
+        max_bytes (int): The maximum total size of the cached masks, in bytes.
+    """
+    _GLYPH_CACHE.resize(max_bytes)
+
+
+def glyph_cache_stats() -> CacheStats:
+    """
+    Returns the hit, miss and eviction counts of the glyph cache.
+    """
+    return _GLYPH_CACHE.stats
+
+
+def glyph_origin(
+    rectangle: Rectangle, mask: Image.Image, rotate: bool = False
+) -> tuple[int, int]:
+    """
+    Returns where the top left of a glyph mask goes, for text drawn in the rectangle.
+    """
+    x, y = rectangle.xy
+    if rotate:
+        # the rotated text runs up from the bottom of the rectangle
+        y += rectangle.wh[1] - mask.height
+
+    return x, y
+
+
+@timed("draw_text")
 def draw_text(
-    image: ImageWrapper,
+    image: Canvas,
     rectangle: Rectangle,
     word: str,
     font: FontWrapper,
@@ -87,26 +308,8 @@ def draw_text(
     """
     Draws the text on the img with the correct orientation.
     """
-    # text can sometimes have a negative bounding box, so we need to account for that
-    text_bbox = font.getbbox(word)
+    mask = get_glyph_mask(font, word, rotate)
+    if mask.width == 0 or mask.height == 0:
+        return
 
-    if rotate:
-        text_image = Image.new("RGB", rectangle.rotated_ccw.wh, image.background_color)  # type: ignore
-        text_draw = ImageDraw.Draw(text_image)
-
-        text_draw.text(
-            (-text_bbox.x, -text_bbox.y),
-            word,
-            font=font.get(),
-            fill=font.color(frequency),
-        )
-        rotated_text_image = text_image.rotate(90, expand=True)
-        image.img.paste(rotated_text_image, rectangle.xy)  # type: ignore
-
-    else:
-        image.canvas.text(
-            (rectangle.x - text_bbox.x, rectangle.y - text_bbox.y),
-            word,
-            font=font.get(),
-            fill=font.color(frequency),
-        )
+    image.paste_mask(font.color(frequency), glyph_origin(rectangle, mask, rotate), mask)
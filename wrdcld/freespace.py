@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable, Iterator
+
+from .rectangle import Rectangle
+
+
+class FreeRectangles:
+    """
+    The rectangles of free space on the canvas, kept sorted from the largest to the
+    smallest area. Rectangles with the same area are kept in the order they were added,
+    so queries give the same answer as `max(..., key=area)` over a list built in that order.
+
+    Adding and removing a rectangle bisects the sorted keys, but then shifts the keys
+    after it, so both are O(n) in the worst case, with a small constant (a memmove of a
+    list). Queries skip the rectangles that are too small in area and stop at the first
+    one that fits, but they are O(n) in the worst case too, when most large rectangles
+    are too narrow or too flat for the word.
+    """
+
+    def __init__(self, rectangles: Iterable[Rectangle] = ()):
+        # (-area, insertion number), sorted, so the largest rectangles come first
+        self._keys: list[tuple[float, int]] = []
+        self._rectangles: dict[int, Rectangle] = {}
+        # insertion numbers of each distinct rectangle, oldest first
+        self._insertions: dict[Rectangle, list[int]] = {}
+        self._counter = 0
+
+        self.extend(rectangles)
+
+    def add(self, rectangle: Rectangle):
+        """
+        Adds a rectangle of free space.
+
+        Args:
+            rectangle (Rectangle): The rectangle to add.
+        """
+        insertion = self._counter
+        self._counter += 1
+
+        insort(self._keys, (-rectangle.area, insertion))
+        self._rectangles[insertion] = rectangle
+        self._insertions.setdefault(rectangle, []).append(insertion)
+
+    def extend(self, rectangles: Iterable[Rectangle]):
+        """
+        Adds several rectangles of free space, in order.
+
+        Args:
+            rectangles (Iterable[Rectangle]): The rectangles to add.
+        """
+        for rectangle in rectangles:
+            self.add(rectangle)
+
+    def remove(self, rectangle: Rectangle):
+        """
+        Removes the oldest copy of a rectangle, like `list.remove`.
+
+        Args:
+            rectangle (Rectangle): The rectangle to remove.
+
+        Raises:
+            ValueError: If the rectangle is not in the collection.
+        """
+        insertions = self._insertions.get(rectangle)
+        if not insertions:
+            raise ValueError(f"{rectangle} is not a free rectangle")
+
+        insertion = insertions.pop(0)
+        if not insertions:
+            del self._insertions[rectangle]
+        del self._rectangles[insertion]
+
+        key_ind = bisect_left(self._keys, (-rectangle.area, insertion))
+        del self._keys[key_ind]
+
+    def largest_fitting(self, width: float, height: float) -> Rectangle | None:
+        """
+        Finds the largest rectangle that is at least as wide and as tall as requested.
+
+        Only rectangles with an area of at least `width * height` are looked at, and the
+        search stops at the first one that fits, which usually is one of the first few.
+
+        Args:
+            width (float): The minimum width.
+            height (float): The minimum height.
+
+        Returns:
+            Rectangle | None: The largest fitting rectangle, or None if nothing fits.
+        """
+        min_area = width * height
+        for negative_area, insertion in self._keys:
+            if -negative_area < min_area:
+                break
+            rectangle = self._rectangles[insertion]
+            if rectangle.width >= width and rectangle.height >= height:
+                return rectangle
+
+        return None
+
+    def fitting(
+        self, width: float, height: float, smallest_first: bool = False
+    ) -> Iterator[Rectangle]:
+        """
+        Yields every rectangle that is at least as wide and as tall as requested.
+
+        Only rectangles with an area of at least `width * height` are looked at. The
+        collection must not change while the rectangles are being yielded.
+
+        Args:
+            width (float): The minimum width.
+            height (float): The minimum height.
+            smallest_first (bool): Whether to go from the smallest to the largest area, instead of the other way around.
+
+        Yields:
+            Rectangle: The fitting rectangles, ordered by area.
+        """
+        # the rectangles with at least the minimum area are the ones at the start
+        end = bisect_right(self._keys, (-width * height, math.inf))
+        indices = range(end - 1, -1, -1) if smallest_first else range(end)
+        for index in indices:
+            rectangle = self._rectangles[self._keys[index][1]]
+            if rectangle.width >= width and rectangle.height >= height:
+                yield rectangle
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Rectangle]:
+        return (self._rectangles[insertion] for _, insertion in self._keys)
+
+    def __contains__(self, rectangle: object) -> bool:
+        return rectangle in self._insertions
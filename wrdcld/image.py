@@ -1,7 +1,41 @@
+from __future__ import annotations
+
+from typing import Protocol
+
 from PIL import Image, ImageDraw
 
 from .util import Color
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+class Canvas(Protocol):
+    """
+    What drawing words and scanning the space around them needs from an image.
+    """
+
+    width: int
+    height: int
+    background_color: Color
+
+    def paste_mask(self, color: Color, xy: tuple[int, int], mask: Image.Image):
+        """
+        Fills the pixels of the mask, with its top left at xy, with a color.
+        """
+
+    def paste(self, image: Image.Image, xy: tuple[int, int]):
+        """
+        Copies an image onto the canvas, with its top left at xy.
+        """
+
+    def crop(self, box: tuple[float, float, float, float]) -> Image.Image:
+        """
+        Returns a copy of the (left, top, right, bottom) box, with the coordinates rounded.
+        """
+
 
 class ImageWrapper:
     def __init__(self, width: int, height: int, background_color: Color):
@@ -10,3 +44,85 @@ class ImageWrapper:
         self.background_color = background_color
         self.img = Image.new("RGB", (width, height), color=background_color)
         self.canvas = ImageDraw.Draw(self.img)
+
+    def paste_mask(self, color: Color, xy: tuple[int, int], mask: Image.Image):
+        self.img.paste(color, xy, mask)
+
+    def paste(self, image: Image.Image, xy: tuple[int, int]):
+        self.img.paste(image, xy)
+
+    def crop(self, box: tuple[float, float, float, float]) -> Image.Image:
+        return self.img.crop(box)  # type: ignore[arg-type]
+
+
+def _clip(
+    xy: tuple[int, int], size: tuple[int, int], width: int, height: int
+) -> tuple[slice, slice, slice, slice] | None:
+    """
+    Returns the rows and columns of the canvas that a patch covers, and the same rows and
+    columns of the patch, or None if the patch is entirely outside the canvas.
+    """
+    x, y = xy
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + size[0], width), min(y + size[1], height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return slice(y0, y1), slice(x0, x1), slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)
+
+
+class ArrayCanvas:
+    """
+    A canvas whose pixels are a (height, width, 3) numpy array, which is drawn on in place.
+
+    The words are blended in exactly like `PIL.Image.paste` does, so the array has the
+    same pixels as an `ImageWrapper` that was drawn on in the same way, and can be handed
+    out without copying or converting it.
+    """
+
+    def __init__(self, width: int, height: int, background_color: Color):
+        if np is None:
+            raise ImportError("Drawing on arrays requires numpy")
+
+        self.width = width
+        self.height = height
+        self.background_color = background_color
+        self.array = np.empty((height, width, 3), dtype=np.uint8)
+        # filling from a whole row is much faster than broadcasting a single color
+        self.array[:] = np.tile(np.array(background_color, dtype=np.uint8), (width, 1))
+
+    def paste_mask(self, color: Color, xy: tuple[int, int], mask: Image.Image):
+        clipped = _clip(xy, mask.size, self.width, self.height)
+        if clipped is None:
+            return
+        rows, columns, mask_rows, mask_columns = clipped
+
+        alpha = np.asarray(mask)[mask_rows, mask_columns, np.newaxis].astype(np.uint16)
+        region = self.array[rows, columns]
+        # (a * (255 - alpha) + b * alpha) / 255, rounded the way Pillow does it, which
+        # never exceeds 255 * 255 + 128 so it fits in 16 bits
+        blended = (
+            region * (255 - alpha) + np.array(color, dtype=np.uint16) * alpha + 128
+        )
+        region[...] = ((blended >> 8) + blended) >> 8
+
+    def paste(self, image: Image.Image, xy: tuple[int, int]):
+        clipped = _clip(xy, image.size, self.width, self.height)
+        if clipped is None:
+            return
+        rows, columns, image_rows, image_columns = clipped
+
+        self.array[rows, columns] = np.asarray(image.convert("RGB"))[
+            image_rows, image_columns
+        ]
+
+    def crop(self, box: tuple[float, float, float, float]) -> Image.Image:
+        left, top, right, bottom = (round(value) for value in box)
+        # like Image.crop, the parts outside of the canvas are black
+        patch = np.zeros((max(bottom - top, 0), max(right - left, 0), 3), np.uint8)
+        clipped = _clip(
+            (left, top), (right - left, bottom - top), self.width, self.height
+        )
+        if clipped is not None:
+            rows, columns, patch_rows, patch_columns = clipped
+            patch[patch_rows, patch_columns] = self.array[rows, columns]
+        return Image.fromarray(patch)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import string
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+_WHITESPACE = re.compile(rb"\s")
+
+
+@dataclass(frozen=True)
+class Tokenizer:
+    """
+    Rules for splitting text into words.
+
+    Tokens are matched with `pattern`, stripped of `strip_chars` at both ends, optionally
+    unicode normalized and lowercased, and dropped if they are shorter than `min_length`
+    or are in `stopwords`.
+    """
+
+    pattern: str = r"\S+"
+    strip_chars: str = string.punctuation
+    lowercase: bool = False
+    normalization: str | None = None
+    min_length: int = 1
+    stopwords: frozenset[str] = frozenset()
+
+    def tokenize(self, text: str) -> Iterator[str]:
+        """
+        Splits text into words.
+
+        Args:
+            text (str): The text to split.
+
+        Yields:
+            str: The words, in the order they appear.
+        """
+        for match in re.finditer(self.pattern, text):
+            token = match.group().strip(self.strip_chars)
+            if self.normalization is not None:
+                token = unicodedata.normalize(self.normalization, token)  # type: ignore[arg-type]
+            if self.lowercase:
+                token = token.lower()
+            if len(token) >= self.min_length and token not in self.stopwords:
+                yield token
+
+
+def _chunk_boundaries(path: Path, chunk_size: int) -> list[tuple[int, int]]:
+    """
+    Splits a file into chunks of roughly `chunk_size` bytes, moving every boundary forward
+    to the next whitespace byte so that no word is split between two chunks.
+    """
+    file_size = path.stat().st_size
+    if file_size == 0:
+        return []
+
+    boundaries = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while boundaries[-1] + chunk_size < file_size:
+            whitespace = _WHITESPACE.search(mm, boundaries[-1] + chunk_size)
+            if whitespace is None:
+                break
+            boundaries.append(whitespace.start())
+
+    boundaries.append(file_size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _count_chunk(
+    chunk: tuple[Path, int, int], tokenizer: Tokenizer, encoding: str
+) -> Counter:
+    path, start, end = chunk
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode(encoding, errors="replace")
+
+    return Counter(tokenizer.tokenize(text))
+
+
+def count_words(
+    paths: Iterable[Path | str],
+    tokenizer: Tokenizer = Tokenizer(),
+    processes: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> Counter:
+    """
+    Counts the words in text files, which can be far larger than memory.
+
+    The files are memory-mapped and split into chunks on whitespace, and the chunks are
+    counted in parallel. Only one chunk per process is decoded at a time, so memory use
+    depends on the chunk size and the size of the vocabulary, not on the size of the files.
+    The encoding must be ASCII compatible (e.g. utf-8 or latin-1).
+
+    Args:
+        paths (Iterable[Path | str]): The text files to count the words of.
+        tokenizer (Tokenizer): The rules for splitting the text into words.
+        processes (int | None): The number of processes, by default the number of CPUs. With 1, everything runs in this process.
+        chunk_size (int): The approximate size of each chunk, in bytes.
+        encoding (str): The encoding of the files.
+
+    Returns:
+        Counter: The number of times each word appears, ready to pass to `make_word_cloud`.
+    """
+    assert chunk_size > 0, "Chunk size must be a positive number (in bytes)"
+
+    chunks = [
+        (Path(path), start, end)
+        for path in paths
+        for start, end in _chunk_boundaries(Path(path), chunk_size)
+    ]
+
+    processes = min(processes or os.cpu_count() or 1, max(len(chunks), 1))
+
+    word_counts: Counter = Counter()
+    if processes == 1:
+        for chunk in chunks:
+            word_counts.update(_count_chunk(chunk, tokenizer, encoding))
+        return word_counts
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        remaining_chunks = iter(chunks)
+        pending: set[Future] = set()
+        while True:
+            # only a couple of chunks per process are in flight, so at most that many
+            # partial counts wait to be merged
+            for chunk in islice(remaining_chunks, 2 * processes - len(pending)):
+                pending.add(executor.submit(_count_chunk, chunk, tokenizer, encoding))
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                word_counts.update(future.result())
+
+    return word_counts
@@ -0,0 +1,796 @@
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import random
+import struct
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from PIL import Image, ImageChops
+
+from .font import FontWrapper, draw_text, get_glyph_mask, glyph_origin
+from .freespace import FreeRectangles
+from .image import Canvas, ImageWrapper
+from .main import Placement, place_next_word
+from .occupancy import OccupancyMap, place_word
+from .rectangle import (
+    Rectangle,
+    _remove_small_rectangles,
+    fill_remaining_space_horizontal,
+)
+from .selection import WordSupply, iter_word_counts, select_renderable_words
+from .stats import timed
+from .strategy import DEFAULT_STRATEGY, PlacementStrategy
+from .tiles import TiledImage
+from .util import Color
+
+ENGINES = ("rectangles", "occupancy")
+# the size of the cells that rectangles are bucketed into when looking for overlaps
+GRID_CELL_SIZE = 64
+
+
+# words are laid out in white on black, so that the layout doesn't depend on the colors
+LAYOUT_BACKGROUND_COLOR: Color = (0, 0, 0)
+LAYOUT_FONT_COLOR: Color = (255, 255, 255)
+
+_JSON_VERSION = 1
+_BINARY_MAGIC = b"WCLD"
+_BINARY_VERSION = 1
+# magic, version, width, height, length of the font path, number of words
+_BINARY_HEADER = struct.Struct("<4sHIIHI")
+# frequency, font size, x, y, width, height, rotated, length of the word
+_BINARY_WORD = struct.Struct("<dHddddBH")
+
+
+class LayoutCancelled(Exception):
+    """
+    Raised when a layout is stopped by its cancel event before all words are placed.
+    """
+
+
+@dataclass(frozen=True)
+class PlacedWord:
+    word: str
+    frequency: float
+    font_size: int
+    rectangle: Rectangle
+    rotated: bool
+
+
+@timed("word_selection")
+def _renderable_words(
+    word_counts: list[tuple[str, int]],
+    font: FontWrapper,
+    width: int,
+    minimum_font_size: int,
+    scaling_func: Callable[[float], float],
+) -> list[tuple[str, float, FontWrapper]]:
+    """
+    Works out the font of every word that is large enough to be drawn, and measures them.
+    """
+    first_word, first_count = word_counts[0]
+    maximum_font_size = font.size
+
+    actual_max_fontsize = font.find_fontsize_for_width(width, first_word)
+
+    if actual_max_fontsize < maximum_font_size:
+        maximum_font_size = actual_max_fontsize
+        font = replace(font, size=actual_max_fontsize)
+
+    renderable_words = []
+    for word, count in word_counts:
+        frequency = count / first_count
+        required_font_size = maximum_font_size * scaling_func(frequency)
+
+        if required_font_size < minimum_font_size:
+            break
+
+        renderable_words.append((word, frequency, font[required_font_size]))
+
+    # measure every word up front, so the placement loop doesn't call FreeType
+    if font.metrics is not None:
+        font.metrics.measure(
+            font, ((word, word_font.size) for word, _, word_font in renderable_words)
+        )
+
+    return renderable_words
+
+
+def _ink_box(
+    font: FontWrapper, word: str, rectangle: Rectangle, rotated: bool
+) -> Rectangle:
+    """
+    Returns the rectangle of a drawn word, grown to cover all of its drawn pixels.
+    """
+    mask = get_glyph_mask(font, word, rotated)
+    x, y = glyph_origin(rectangle, mask, rotated)
+
+    left = min(x, rectangle.x)
+    top = min(y, rectangle.y)
+    return Rectangle(
+        x=left,
+        y=top,
+        width=max(x + mask.width, rectangle.right) - left,
+        height=max(y + mask.height, rectangle.bottom) - top,
+    )
+
+
+def _grid_cells(rectangle: Rectangle) -> Iterator[tuple[int, int]]:
+    for row in range(
+        int(rectangle.y) // GRID_CELL_SIZE, int(rectangle.bottom) // GRID_CELL_SIZE + 1
+    ):
+        for col in range(
+            int(rectangle.x) // GRID_CELL_SIZE,
+            int(rectangle.right) // GRID_CELL_SIZE + 1,
+        ):
+            yield row, col
+
+
+def _overlapping(
+    rectangles: Sequence[Rectangle], others: Iterable[Rectangle]
+) -> list[list[Rectangle]]:
+    """
+    Finds the others that overlap each of the rectangles, only comparing rectangles that
+    share a cell of a coarse grid.
+    """
+    cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for index, rectangle in enumerate(rectangles):
+        for cell in _grid_cells(rectangle):
+            cells[cell].append(index)
+
+    overlapping: list[list[Rectangle]] = [[] for _ in rectangles]
+    for other in others:
+        candidates = {
+            index for cell in _grid_cells(other) for index in cells.get(cell, ())
+        }
+        for index in candidates:
+            if other.overlaps(rectangles[index]):
+                overlapping[index].append(other)
+
+    return overlapping
+
+
+def _subtract(rectangle: Rectangle, others: Iterable[Rectangle]) -> list[Rectangle]:
+    """
+    Splits the part of the rectangle that isn't covered by any of the others into
+    rectangles that don't overlap, dropping the pieces that are too small.
+    """
+    pieces = [rectangle]
+    for other in others:
+        remaining = []
+        for piece in pieces:
+            overlap = piece.intersection(other)
+            if overlap is None:
+                remaining.append(piece)
+            else:
+                remaining.extend(fill_remaining_space_horizontal(piece, overlap))
+        pieces = remaining
+
+    return _remove_small_rectangles(pieces)
+
+
+@dataclass(frozen=True)
+class Layout:
+    """
+    Where every word of a word cloud goes, without the colors, so that it can be cached,
+    sent to other processes and rendered with `render` at any size or in any colors.
+    """
+
+    width: int
+    height: int
+    font_path: str
+    words: tuple[PlacedWord, ...]
+
+    def scaled(self, width: int, height: int) -> "Layout":
+        """
+        Scales the layout to another size, e.g. to draw a layout made at a draft
+        resolution at full resolution. The positions are stretched to the new size, and
+        the font sizes are scaled by the smaller of the two factors.
+        """
+        scale_x, scale_y = width / self.width, height / self.height
+        font_scale = min(scale_x, scale_y)
+
+        words = tuple(
+            replace(
+                placed,
+                font_size=round(placed.font_size * font_scale),
+                rectangle=Rectangle(
+                    x=placed.rectangle.x * scale_x,
+                    y=placed.rectangle.y * scale_y,
+                    width=placed.rectangle.width * scale_x,
+                    height=placed.rectangle.height * scale_y,
+                ),
+            )
+            for placed in self.words
+        )
+        return replace(self, width=width, height=height, words=words)
+
+    def to_json(self) -> str:
+        """
+        Serializes the layout to compact JSON, with a list of values for every word.
+        """
+        return json.dumps(
+            {
+                "version": _JSON_VERSION,
+                "width": self.width,
+                "height": self.height,
+                "font_path": self.font_path,
+                "words": [
+                    [
+                        placed.word,
+                        placed.frequency,
+                        placed.font_size,
+                        placed.rectangle.x,
+                        placed.rectangle.y,
+                        placed.rectangle.width,
+                        placed.rectangle.height,
+                        placed.rotated,
+                    ]
+                    for placed in self.words
+                ],
+            },
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "Layout":
+        """
+        Reads a layout written by `to_json`.
+        """
+        layout = json.loads(data)
+        if layout.get("version") != _JSON_VERSION:
+            raise ValueError(f"Unsupported layout version {layout.get('version')}")
+
+        return cls(
+            width=layout["width"],
+            height=layout["height"],
+            font_path=layout["font_path"],
+            words=tuple(
+                PlacedWord(
+                    word=word,
+                    frequency=frequency,
+                    font_size=font_size,
+                    rectangle=Rectangle(x=x, y=y, width=width, height=height),
+                    rotated=rotated,
+                )
+                for word, frequency, font_size, x, y, width, height, rotated in layout[
+                    "words"
+                ]
+            ),
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the layout to a compact binary form, with the coordinates of the words
+        as doubles so that they render exactly the same.
+        """
+        font_path = self.font_path.encode()
+        parts = [
+            _BINARY_HEADER.pack(
+                _BINARY_MAGIC,
+                _BINARY_VERSION,
+                self.width,
+                self.height,
+                len(font_path),
+                len(self.words),
+            ),
+            font_path,
+        ]
+        for placed in self.words:
+            word = placed.word.encode()
+            parts.append(
+                _BINARY_WORD.pack(
+                    placed.frequency,
+                    placed.font_size,
+                    placed.rectangle.x,
+                    placed.rectangle.y,
+                    placed.rectangle.width,
+                    placed.rectangle.height,
+                    placed.rotated,
+                    len(word),
+                )
+            )
+            parts.append(word)
+
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Layout":
+        """
+        Reads a layout written by `to_bytes`.
+        """
+        magic, version, width, height, font_path_length, n_words = (
+            _BINARY_HEADER.unpack_from(data)
+        )
+        if magic != _BINARY_MAGIC:
+            raise ValueError("Not a serialized layout")
+        if version != _BINARY_VERSION:
+            raise ValueError(f"Unsupported layout version {version}")
+
+        offset = _BINARY_HEADER.size
+        font_path = data[offset : offset + font_path_length].decode()
+        offset += font_path_length
+
+        words = []
+        for _ in range(n_words):
+            frequency, font_size, x, y, w, h, rotated, word_length = (
+                _BINARY_WORD.unpack_from(data, offset)
+            )
+            offset += _BINARY_WORD.size
+            word = data[offset : offset + word_length].decode()
+            offset += word_length
+
+            words.append(
+                PlacedWord(
+                    word=word,
+                    frequency=frequency,
+                    font_size=font_size,
+                    rectangle=Rectangle(x=x, y=y, width=w, height=h),
+                    rotated=bool(rotated),
+                )
+            )
+
+        return cls(width=width, height=height, font_path=font_path, words=tuple(words))
+
+
+@dataclass(frozen=True)
+class OverlapReport:
+    # the pairs of words whose drawn pixels overlap, by their index in the layout
+    pairs: tuple[tuple[int, int], ...]
+    overlapping_pixels: int
+    ink_pixels: int
+
+    @property
+    def overlapping_fraction(self) -> float:
+        return self.overlapping_pixels / self.ink_pixels if self.ink_pixels else 0.0
+
+
+def _ink(mask: Image.Image) -> Image.Image:
+    return mask.point(lambda value: 255 if value else 0)
+
+
+def find_overlaps(layout: Layout) -> OverlapReport:
+    """
+    Draws the glyphs of every word of a layout, and counts the pixels that are drawn by
+    more than one word, including their antialiased edges.
+
+    Only the words whose glyphs share a cell of a coarse grid are compared.
+    """
+    font = FontWrapper(
+        path=Path(layout.font_path), color_func=lambda _: LAYOUT_FONT_COLOR
+    )
+
+    glyphs: list[tuple[Rectangle, tuple[int, int], Image.Image]] = []
+    cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+    ink_pixels = 0
+    for index, placed in enumerate(layout.words):
+        mask = _ink(get_glyph_mask(font[placed.font_size], placed.word, placed.rotated))
+        x, y = glyph_origin(placed.rectangle, mask, placed.rotated)
+        box = Rectangle(x=x, y=y, width=mask.width, height=mask.height)
+        glyphs.append((box, (x, y), mask))
+        ink_pixels += mask.histogram()[255]
+        for cell in _grid_cells(box):
+            cells[cell].append(index)
+
+    candidates = {
+        (first, second)
+        for indices in cells.values()
+        for position, first in enumerate(indices)
+        for second in indices[position + 1 :]
+    }
+
+    pairs = []
+    overlapping_pixels = 0
+    for first, second in sorted(candidates):
+        overlap = glyphs[first][0].intersection(glyphs[second][0])
+        if overlap is None:
+            continue
+
+        left, top, right, bottom = (int(value) for value in overlap.xyrb)
+        both = ImageChops.darker(
+            *(
+                mask.crop((left - x, top - y, right - x, bottom - y))
+                for _, (x, y), mask in (glyphs[first], glyphs[second])
+            )
+        )
+        pixels = both.histogram()[255]
+        if pixels:
+            pairs.append((first, second))
+            overlapping_pixels += pixels
+
+    return OverlapReport(
+        pairs=tuple(pairs),
+        overlapping_pixels=overlapping_pixels,
+        ink_pixels=ink_pixels,
+    )
+
+
+class LiveLayout:  # pylint: disable=too-many-instance-attributes
+    """
+    A layout that is being made, along with the space that is still free, so that it can
+    be updated when the word counts change instead of laid out again.
+
+    The words are drawn on a canvas as they are placed, because the space around each
+    word is found by scanning the canvas. The random choices of the placement are made
+    with the layout's own `rng`, so layouts made in several threads at once don't change
+    each other's results.
+
+    `render` draws the layout in color, and after an update only draws the areas of the
+    words that changed again, so the cost of keeping an image up to date also depends on
+    the size of the change.
+
+    A tiled canvas spills to temporary files, which `close` deletes. Live layouts can be
+    used as context managers to close them.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        font: FontWrapper,
+        minimum_font_size: int,
+        scaling_func: Callable[[float], float],
+        engine: str = "rectangles",
+        free_space: Sequence[Rectangle] | None = None,
+        max_canvas_memory: int | None = None,
+        rng: random.Random | None = None,
+        strategy: PlacementStrategy = DEFAULT_STRATEGY,
+    ):
+        if free_space is None:
+            free_space = [Rectangle(width=width, height=height, x=0, y=0)]
+
+        self.canvas: Canvas
+        if max_canvas_memory is None:
+            self.canvas = ImageWrapper(width, height, LAYOUT_BACKGROUND_COLOR)
+        else:
+            self.canvas = TiledImage(
+                width, height, LAYOUT_BACKGROUND_COLOR, max_memory=max_canvas_memory
+            )
+        self.font = replace(font, color_func=lambda _: LAYOUT_FONT_COLOR)
+        self.minimum_font_size = minimum_font_size
+        self.scaling_func = scaling_func
+        self.engine = engine
+        self.rng = rng if rng is not None else random.Random()
+        self.strategy = strategy
+        # the most common word is fitted to the widest free space
+        self.available_width = max(math.floor(rect.width) for rect in free_space)
+        self.words: dict[str, PlacedWord] = {}
+        # the rectangles covering every pixel drawn for each word, the words with ink in
+        # each cell of a coarse grid, and the order the words were placed in
+        self._ink: dict[str, Rectangle] = {}
+        self._ink_cells: dict[tuple[int, int], set[str]] = defaultdict(set)
+        self._order: dict[str, int] = {}
+        self._placements = itertools.count()
+        # the image drawn by render, its colors, and the areas to draw again since
+        self._image: ImageWrapper | None = None
+        self._image_colors: tuple | None = None
+        self._image_font: FontWrapper | None = None
+        self._dirty: list[Rectangle] = []
+
+        self.free_rectangles: FreeRectangles | None = None
+        self.occupancy: OccupancyMap | None = None
+        if engine == "occupancy":
+            self.occupancy = OccupancyMap(width, height)
+            self.occupancy.mark_outside(free_space)
+        else:
+            self.free_rectangles = FreeRectangles(free_space)
+
+    def close(self):
+        """
+        Deletes the temporary files of a tiled canvas. The layout can't be updated after.
+        """
+        if isinstance(self.canvas, TiledImage):
+            self.canvas.close()
+        self._image = None
+        self._dirty = []
+
+    def __enter__(self) -> LiveLayout:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def layout(self) -> Layout:
+        """
+        The placed words, in the order they were placed.
+        """
+        return Layout(
+            width=self.canvas.width,
+            height=self.canvas.height,
+            font_path=str(self.font.path),
+            words=tuple(self.words.values()),
+        )
+
+    def renderable_words(
+        self, all_words: WordSupply
+    ) -> list[tuple[str, float, FontWrapper]]:
+        """
+        Selects the words that are common enough to be drawn, and works out their fonts.
+
+        Args:
+            all_words (WordSupply): The words, in any form `make_word_cloud` accepts.
+
+        Returns:
+            list[tuple[str, float, FontWrapper]]: The word, frequency and font of every word to draw, most common first.
+        """
+        word_counts = select_renderable_words(
+            iter_word_counts(all_words),
+            self.font.size,
+            self.minimum_font_size,
+            self.scaling_func,
+        )
+        assert len(word_counts) > 0, "No words in list"
+
+        return _renderable_words(
+            word_counts,
+            self.font,
+            self.available_width,
+            self.minimum_font_size,
+            self.scaling_func,
+        )
+
+    @timed("placement")
+    def place_words(
+        self,
+        renderable_words: Iterable[tuple[str, float, FontWrapper]],
+        cancel: threading.Event | None = None,
+    ) -> list[Placement | None]:
+        """
+        Places the words one by one, with the placement engine of the layout.
+
+        Args:
+            renderable_words (Iterable[tuple[str, float, FontWrapper]]): The words, their frequency and font.
+            cancel (threading.Event | None): Checked before every word, to stop early when it is set.
+
+        Returns:
+            list[Placement | None]: Where each word was placed, or None if it didn't fit anywhere.
+
+        Raises:
+            LayoutCancelled: If the cancel event is set. The words placed so far stay placed.
+        """
+        placements = []
+        for word, frequency, word_font in renderable_words:
+            if cancel is not None and cancel.is_set():
+                raise LayoutCancelled()
+
+            if self.occupancy is not None:
+                placement = place_word(
+                    word, self.occupancy, self.canvas, word_font, frequency, self.rng
+                )
+            else:
+                assert self.free_rectangles is not None
+                placement = place_next_word(
+                    word,
+                    self.free_rectangles,
+                    self.canvas,
+                    word_font,
+                    frequency,
+                    self.rng,
+                    self.strategy,
+                )
+
+            placements.append(placement)
+            if placement is not None:
+                self.words[word] = PlacedWord(
+                    word=word,
+                    frequency=frequency,
+                    font_size=word_font.size,
+                    rectangle=placement.rectangle,
+                    rotated=placement.rotated,
+                )
+                ink = _ink_box(word_font, word, placement.rectangle, placement.rotated)
+                self._add_ink(word, ink)
+                if self._image is not None:
+                    self._dirty.append(ink)
+
+        return placements
+
+    def update(
+        self,
+        all_words: WordSupply,
+        seed: int | float | str | bytes | bytearray | None = None,
+    ) -> Layout:
+        """
+        Updates the layout in place for new word counts.
+
+        Words that are still drawn at the same (rounded) font size keep their position.
+        The words that were removed or resized are erased and their space is freed, then
+        the words that were added or resized are placed in the free space.
+
+        Selecting the words to draw and comparing them with the placed words goes over
+        every word, and freeing space goes over the free rectangles once. Erasing and
+        placing words, and drawing them again, only look at the words near the ones that
+        changed, which are found through a grid of the space their ink covers.
+
+        Only layouts made with the rectangles engine can be updated.
+
+        Args:
+            all_words (WordSupply): The new words, in any form `make_word_cloud` accepts.
+            seed (int | float | str | bytes | bytearray | None): Seeds the placement of the new words.
+
+        Returns:
+            Layout: The updated layout.
+        """
+        assert (
+            self.free_rectangles is not None
+        ), "Only layouts made with the rectangles engine can be updated"
+
+        if seed is not None:
+            self.rng.seed(seed)
+
+        renderable_words = self.renderable_words(all_words)
+        new_words = {
+            word: (frequency, word_font.size)
+            for word, frequency, word_font in renderable_words
+        }
+
+        erased: list[PlacedWord] = []
+        erased_ink: list[Rectangle] = []
+        for word, placed in list(self.words.items()):
+            if word not in new_words or new_words[word][1] != placed.font_size:
+                erased.append(placed)
+                erased_ink.append(self._remove_ink(word))
+                del self.words[word]
+            elif new_words[word][0] != placed.frequency:
+                self.words[word] = replace(placed, frequency=new_words[word][0])
+                # its color can depend on the frequency
+                if self._image is not None:
+                    self._dirty.append(self._ink[word])
+
+        self._free([placed.rectangle for placed in erased])
+        for ink in erased_ink:
+            self._redraw(self.canvas, ink, self.font, LAYOUT_BACKGROUND_COLOR)
+        if self._image is not None:
+            self._dirty.extend(erased_ink)
+
+        self.place_words(
+            (word, frequency, word_font)
+            for word, frequency, word_font in renderable_words
+            if word not in self.words
+        )
+
+        return self.layout
+
+    def _add_ink(self, word: str, ink: Rectangle):
+        self._ink[word] = ink
+        self._order[word] = next(self._placements)
+        for cell in _grid_cells(ink):
+            self._ink_cells[cell].add(word)
+
+    def _remove_ink(self, word: str) -> Rectangle:
+        ink = self._ink.pop(word)
+        del self._order[word]
+        for cell in _grid_cells(ink):
+            words = self._ink_cells[cell]
+            words.discard(word)
+            if not words:
+                del self._ink_cells[cell]
+        return ink
+
+    def _words_near(self, box: Rectangle) -> list[str]:
+        """
+        Returns the words whose ink overlaps the box, in the order they were placed.
+        """
+        words = {
+            word for cell in _grid_cells(box) for word in self._ink_cells.get(cell, ())
+        }
+        return sorted(
+            (word for word in words if self._ink[word].overlaps(box)),
+            key=self._order.__getitem__,
+        )
+
+    def _free(self, rectangles: Sequence[Rectangle]):
+        """
+        Gives the space of erased words back, merging in the free space between their
+        letters and leaving out everything the words that are still placed drew there.
+        """
+        free_rectangles = self.free_rectangles
+        assert free_rectangles is not None
+
+        free_overlaps = _overlapping(rectangles, list(free_rectangles))
+
+        merged: set[int] = set()
+        freed: list[Rectangle] = []
+        for rectangle, free in zip(rectangles, free_overlaps):
+            # the ink of a word can reach past its rectangle, e.g. the tail of a "j"
+            taken = [self._ink[word] for word in self._words_near(rectangle)]
+            for free_rectangle in free:
+                if id(free_rectangle) in merged:
+                    continue
+                if free_rectangle.is_inside(rectangle):
+                    free_rectangles.remove(free_rectangle)
+                    merged.add(id(free_rectangle))
+                else:
+                    taken.append(free_rectangle)
+
+            # erased words can overlap, e.g. a small word in the gap of a large one
+            taken.extend(piece for piece in freed if piece.overlaps(rectangle))
+            freed.extend(_subtract(rectangle, taken))
+
+        free_rectangles.extend(freed)
+
+    @timed("render")
+    def render(
+        self,
+        font_color: Color = (255, 255, 0),
+        font_color_func: Callable[[float], Color] | None = None,
+        background_color: Color = (73, 109, 137),
+    ) -> Image.Image:
+        """
+        Draws the layout like `render`, into an image that is kept and updated in place.
+
+        The first call draws every word. After `update`, only the areas of the words that
+        were erased, placed or changed frequency are drawn again, as long as the colors
+        (and the same `font_color_func` object) are passed again; other colors draw the
+        whole image again.
+
+        Args:
+            font_color (Color): The color of the words, if there is no font_color_func.
+            font_color_func (Callable[[float], Color] | None): Maps the frequency of a word to its color.
+            background_color (Color): The color of the background.
+
+        Returns:
+            Image: The word cloud, which later calls change. Copy it to keep it as it is.
+        """
+        colors = (font_color, font_color_func, background_color)
+        if (
+            self._image is None
+            or self._image_font is None
+            or self._image_colors != colors
+        ):
+            self._image = ImageWrapper(
+                self.canvas.width, self.canvas.height, background_color
+            )
+            self._image_colors = colors
+            self._image_font = replace(
+                self.font, color_func=font_color_func or (lambda _: font_color)
+            )
+            self._dirty = [
+                Rectangle(x=0, y=0, width=self.canvas.width, height=self.canvas.height)
+            ]
+
+        for box in self._dirty:
+            self._redraw(self._image, box, self._image_font, background_color)
+        self._dirty = []
+
+        return self._image.img
+
+    def _redraw(
+        self, canvas: Canvas, box: Rectangle, font: FontWrapper, background_color: Color
+    ):
+        """
+        Draws the part of a canvas inside the box again, from the words that are placed.
+        """
+        left, top = max(math.floor(box.x), 0), max(math.floor(box.y), 0)
+        right = min(math.ceil(box.right), canvas.width)
+        bottom = min(math.ceil(box.bottom), canvas.height)
+        if left >= right or top >= bottom:
+            return
+
+        region = Rectangle(x=left, y=top, width=right - left, height=bottom - top)
+        patch = ImageWrapper(right - left, bottom - top, background_color)
+
+        # words are drawn in the order they were placed, like when the layout was made
+        for word in self._words_near(region):
+            placed = self.words[word]
+            draw_text(
+                patch,
+                replace(
+                    placed.rectangle,
+                    x=placed.rectangle.x - left,
+                    y=placed.rectangle.y - top,
+                ),
+                placed.word,
+                replace(font, size=placed.font_size),
+                placed.frequency,
+                rotate=placed.rotated,
+            )
+
+        canvas.paste(patch.img, (left, top))
@@ -1,88 +1,76 @@
+from __future__ import annotations
+
 import random
+from dataclasses import dataclass
+from types import ModuleType
 
 from .font import FontWrapper, draw_text
-from .image import ImageWrapper
+from .freespace import FreeRectangles
+from .image import Canvas
 from .rectangle import (
     Rectangle,
     fill_remaining_space_horizontal,
     fill_remaining_space_vertical,
     fill_space_around_word,
 )
+from .stats import timed
+from .strategy import DEFAULT_STRATEGY, PlacementStrategy
+
+
+@dataclass(frozen=True)
+class Placement:
+    rectangle: Rectangle
+    rotated: bool
 
 
+@timed("fill")
 def _fill(
     rectangle: Rectangle,
-    image: ImageWrapper,
+    image: Canvas,
     word_length: float,
     word: str,
     font: FontWrapper,
     frequency: float,
     rotate: bool = False,
+    rng: random.Random | ModuleType = random,
+    strategy: PlacementStrategy = DEFAULT_STRATEGY,
 ):
-    word_height = font.size
-
-    if not rotate:
-        text_rectangle = Rectangle(
-            x=random.uniform(
-                rectangle.x,
-                rectangle.x + rectangle.width - word_length,
-            ),
-            y=random.uniform(
-                rectangle.y,
-                rectangle.y + rectangle.height - word_height,
-            ),
-            width=word_length,
-            height=word_height,
-        )
-    else:
-        text_rectangle = Rectangle(
-            x=random.uniform(
-                rectangle.x,
-                rectangle.x + rectangle.width - word_height,
-            ),
-            y=random.uniform(
-                rectangle.y,
-                rectangle.y + rectangle.height - word_length,
-            ),
-            width=word_height,
-            height=word_length,
-        )
+    width, height = (font.size, word_length) if rotate else (word_length, font.size)
+    x, y = strategy.position(rectangle, width, height, rng)
+    text_rectangle = Rectangle(x=x, y=y, width=width, height=height)
 
     draw_text(image, text_rectangle, word, font, frequency, rotate=rotate)
 
     return text_rectangle
 
 
-def fill_next_word(
+def place_next_word(
     word: str,
-    available_rectangles: list,
-    image: ImageWrapper,
+    available_rectangles: FreeRectangles,
+    image: Canvas,
     font: FontWrapper,
     frequency: float,
-):
+    rng: random.Random | None = None,
+    strategy: PlacementStrategy = DEFAULT_STRATEGY,
+) -> Placement | None:
+    """
+    Draws the word in a free rectangle it fits in, and updates the free rectangles.
+
+    The rectangle, and where the word goes in it, are chosen by the placement strategy,
+    by default at a random position in the largest rectangle. The random choices are made
+    with `rng`, or with the functions of the `random` module if it isn't given.
+
+    Returns:
+        Placement | None: Where the word was drawn, or None if it didn't fit anywhere.
+    """
+    generator = rng if rng is not None else random
     word_length = font.get_length_of_word(word)
 
-    suitable_horizontal_rectangles = [
-        rectangle
-        for rectangle in available_rectangles
-        if rectangle.width >= word_length and rectangle.height >= font.size
-    ]
-
-    suitable_vertical_rectangles = [
-        rectangle
-        for rectangle in available_rectangles
-        if rectangle.height >= word_length and rectangle.width >= font.size
-    ]
-
-    horizontal_option = (
-        max(suitable_horizontal_rectangles, key=lambda x: x.area)
-        if suitable_horizontal_rectangles
-        else None
+    horizontal_option = strategy.choose_rectangle(
+        available_rectangles, word_length, font.size
     )
-    vertical_option = (
-        max(suitable_vertical_rectangles, key=lambda x: x.area)
-        if suitable_vertical_rectangles
-        else None
+    vertical_option = strategy.choose_rectangle(
+        available_rectangles, font.size, word_length
     )
 
     options = []
@@ -93,23 +81,32 @@ def fill_next_word(
 
     if not options:
         # print(f"skipping word '{word}', couldn't find a good rectangle")
-        return available_rectangles
+        return None
 
     if len(options) == 1:
         option = options[0]
     else:
-        option = random.choices(options, weights=(0.9, 0.1))[0]
+        option = generator.choices(options, weights=(0.9, 0.1))[0]
 
     if option == "horizontal":
-        available_rectangles.remove(horizontal_option)
+        assert horizontal_option is not None
         chosen_rectangle = horizontal_option
+        available_rectangles.remove(chosen_rectangle)
         text_rectangle = _fill(
-            chosen_rectangle, image, word_length, word, font, frequency
+            chosen_rectangle,
+            image,
+            word_length,
+            word,
+            font,
+            frequency,
+            rng=generator,
+            strategy=strategy,
         )
 
     else:
-        available_rectangles.remove(vertical_option)
+        assert vertical_option is not None
         chosen_rectangle = vertical_option
+        available_rectangles.remove(chosen_rectangle)
         text_rectangle = _fill(
             chosen_rectangle,
             image,
@@ -118,22 +115,33 @@ def fill_next_word(
             font,
             frequency,
             rotate=True,
+            rng=generator,
+            strategy=strategy,
         )
 
-    fill_direction = random.choice(["horizontal", "vertical"])
+    fill_direction = generator.choice(["horizontal", "vertical"])
 
     # figure out new available rectangles
-    fill_func = random.choice(
+    fill_func = generator.choice(
         [fill_remaining_space_horizontal, fill_remaining_space_vertical]
     )
-    new_available_rectangles = fill_func(chosen_rectangle, text_rectangle)
+    available_rectangles.extend(fill_func(chosen_rectangle, text_rectangle))
 
-    available_rectangles_around_word = fill_space_around_word(
-        image, text_rectangle, fill_direction
+    available_rectangles.extend(
+        fill_space_around_word(image, text_rectangle, fill_direction)
     )
 
-    return (
-        available_rectangles
-        + new_available_rectangles
-        + available_rectangles_around_word
-    )
+    return Placement(rectangle=text_rectangle, rotated=option == "vertical")
+
+
+def fill_next_word(
+    word: str,
+    available_rectangles: FreeRectangles,
+    image: Canvas,
+    font: FontWrapper,
+    frequency: float,
+    rng: random.Random | None = None,
+    strategy: PlacementStrategy = DEFAULT_STRATEGY,
+) -> FreeRectangles:
+    place_next_word(word, available_rectangles, image, font, frequency, rng, strategy)
+    return available_rectangles
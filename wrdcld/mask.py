@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+
+from PIL import Image
+from PIL.Image import Image as PILImage
+
+from .cache import BoundedLRU, CacheStats
+from .rectangle import (
+    MIN_RECTANGLE_SIDE_LENGTH,
+    Rectangle,
+    _rectangle_array_from_background_mask,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+# the number of cells along the longer side of the coarse grid the big rectangles are found on
+MASK_GRID_CELLS = 64
+# big rectangles smaller than this many cells are left to the row scan
+MIN_GRID_RECTANGLE_CELLS = 4
+MAX_GRID_RECTANGLES = 128
+DEFAULT_MASK_CACHE_ENTRIES = 32
+
+
+def free_pixels(mask: PILImage, width: int, height: int) -> np.ndarray:
+    """
+    Finds the pixels of the canvas that words can be drawn on.
+
+    White pixels of the mask are masked out, and every other pixel is free. The mask is
+    stretched to the size of the canvas if needed.
+
+    Args:
+        mask (Image): The mask, in any mode.
+        width (int): The width of the canvas.
+        height (int): The height of the canvas.
+
+    Returns:
+        np.ndarray: 2D boolean array, True where words can be drawn.
+    """
+    if np is None:
+        raise ImportError("Masks require numpy")
+
+    grey = mask.convert("L")
+    if grey.size != (width, height):
+        grey = grey.resize((width, height), Image.Resampling.NEAREST)
+
+    return np.asarray(grey) < 255
+
+
+def _largest_grid_rectangle(grid: np.ndarray) -> tuple[int, int, int, int]:
+    """
+    Finds the largest rectangle of True cells, with the largest rectangle in a histogram of
+    the run of True cells above every cell, row by row.
+
+    Returns:
+        tuple[int, int, int, int]: The top, left, bottom and right of the rectangle, in cells.
+    """
+    n_rows, n_cols = grid.shape
+    best_area, best = 0, (0, 0, 0, 0)
+    heights = np.zeros(n_cols, dtype=np.int64)
+
+    for row in range(n_rows):
+        heights = np.where(grid[row], heights + 1, 0)
+        row_heights = heights.tolist() + [0]
+
+        # columns with increasing heights, each with the leftmost column it extends to
+        stack: list[tuple[int, int]] = []
+        for col, col_height in enumerate(row_heights):
+            left = col
+            while stack and row_heights[stack[-1][1]] >= col_height:
+                left, top_col = stack.pop()
+                area = row_heights[top_col] * (col - left)
+                if area > best_area:
+                    best_area = area
+                    best = (row + 1 - row_heights[top_col], left, row + 1, col)
+            stack.append((left, col))
+
+    return best
+
+
+def _grow(
+    free: np.ndarray, top: int, left: int, bottom: int, right: int
+) -> tuple[int, int, int, int]:
+    """
+    Grows a rectangle of free pixels one row or column at a time, as long as the new row
+    or column is free, so that it can't be grown in any direction.
+    """
+    n_rows, n_cols = free.shape
+    while left > 0 and free[top:bottom, left - 1].all():
+        left -= 1
+    while right < n_cols and free[top:bottom, right].all():
+        right += 1
+    while top > 0 and free[top - 1, left:right].all():
+        top -= 1
+    while bottom < n_rows and free[bottom, left:right].all():
+        bottom += 1
+    return top, left, bottom, right
+
+
+def _decompose(free: np.ndarray) -> tuple[Rectangle, ...]:
+    free = free.copy()
+    n_rows, n_cols = free.shape
+
+    rectangles = []
+
+    # the big rectangles are found on a coarse grid, where a cell is free if all of its
+    # pixels are, then grown to the pixel and cut out of the free pixels
+    cell = max(MIN_RECTANGLE_SIDE_LENGTH, -(-max(n_rows, n_cols) // MASK_GRID_CELLS))
+    grid_rows, grid_cols = n_rows // cell, n_cols // cell
+
+    def free_cells(row_slice: slice, col_slice: slice) -> np.ndarray:
+        rows = range(grid_rows)[row_slice]
+        cols = range(grid_cols)[col_slice]
+        pixels = free[
+            rows.start * cell : rows.stop * cell, cols.start * cell : cols.stop * cell
+        ]
+        cells = pixels.reshape(len(rows), cell, len(cols), cell)
+        return cells.all(axis=(1, 3))  # type: ignore[return-value]
+
+    grid = free_cells(slice(None), slice(None))
+    for _ in range(MAX_GRID_RECTANGLES):
+        top, left, bottom, right = _largest_grid_rectangle(grid)
+        if (bottom - top) * (right - left) < MIN_GRID_RECTANGLE_CELLS:
+            break
+
+        top, left, bottom, right = _grow(
+            free, top * cell, left * cell, bottom * cell, right * cell
+        )
+        rectangles.append(
+            Rectangle(x=left, y=top, width=right - left, height=bottom - top)
+        )
+        free[top:bottom, left:right] = False
+
+        # only the cells the rectangle touches have changed
+        changed = (
+            slice(top // cell, min(-(-bottom // cell), grid_rows)),
+            slice(left // cell, min(-(-right // cell), grid_cols)),
+        )
+        grid[changed] = free_cells(*changed)
+
+    # the rest is split into runs of free pixels, stacked into rectangles row by row
+    rectangles.extend(_rectangle_array_from_background_mask(free).without_small())
+
+    return tuple(rectangles)
+
+
+_MASK_CACHE: BoundedLRU[tuple[str, int, int], tuple[Rectangle, ...]] = BoundedLRU(
+    DEFAULT_MASK_CACHE_ENTRIES
+)
+
+
+def decompose_mask(mask: PILImage, width: int, height: int) -> tuple[Rectangle, ...]:
+    """
+    Breaks the free space of a mask down into rectangles that don't overlap, to start
+    placing words in.
+
+    The largest rectangles are cut out first, so that the largest words have room, and
+    the rest of the free space is covered with rectangles of identical runs of free pixels
+    in consecutive rows. Pieces narrower than `MIN_RECTANGLE_SIDE_LENGTH` are dropped.
+
+    Decompositions are cached by the content of the mask, so rendering with the same mask
+    again skips this step.
+
+    Args:
+        mask (Image): The mask, where white pixels are masked out.
+        width (int): The width of the canvas.
+        height (int): The height of the canvas.
+
+    Returns:
+        tuple[Rectangle, ...]: The free rectangles, starting with the big ones.
+    """
+    digest = hashlib.sha256(mask.mode.encode())
+    digest.update(repr(mask.size).encode())
+    digest.update(mask.tobytes())
+
+    return _MASK_CACHE.get_or_create(
+        (digest.hexdigest(), width, height),
+        lambda: _decompose(free_pixels(mask, width, height)),
+    )
+
+
+def set_mask_cache_size(max_entries: int):
+    """
+    Sets how many mask decompositions are cached, evicting the least recently used ones
+    if needed.
+
+    Args:
+        max_entries (int): The maximum number of cached decompositions. 0 disables caching.
+    """
+    _MASK_CACHE.resize(max_entries)
+
+
+def mask_cache_stats() -> CacheStats:
+    """
+    Returns the hits, misses and size of the mask decomposition cache.
+    """
+    return _MASK_CACHE.stats
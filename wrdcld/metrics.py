@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .rectangle import Rectangle
+
+if TYPE_CHECKING:
+    from .font import FontWrapper
+
+
+@dataclass(frozen=True)
+class MetricsStats:
+    entries: int
+    hits: int
+    misses: int
+    measure_seconds: float
+    seconds_saved: float
+
+
+class WordMetrics:
+    """
+    A table of the advance width and bounding box of words in one font, at integer sizes.
+
+    The table is filled up front with `measure`, and pairs that are looked up without
+    having been measured are added on the fly. The widths and boxes are kept in flat
+    arrays, indexed by a dict from (word, size) to the row of the pair.
+    """
+
+    def __init__(self, font_path: Path):
+        self.font_path = Path(font_path)
+        self._rows: dict[tuple[str, int], int] = {}
+        self._lengths = array("d")
+        self._bboxes = array("i")  # x, y, width, height of each row
+
+        self._length_hits = 0
+        self._bbox_hits = 0
+        self._misses = 0
+        self._length_seconds = 0.0
+        self._bbox_seconds = 0.0
+        # renders in several threads may add pairs to the same table
+        self._lock = threading.Lock()
+
+    def _add(self, font: FontWrapper, word: str) -> int:
+        if Path(font.path) != self.font_path:
+            raise ValueError(
+                f"Metrics for {self.font_path} can't be used for font {font.path}"
+            )
+
+        face = font.get()
+
+        start = time.perf_counter()
+        length = face.getlength(word)
+        measured = time.perf_counter()
+        left, top, right, bottom = face.getbbox(word)
+        finished = time.perf_counter()
+
+        with self._lock:
+            row = self._rows.get((word, font.size))
+            if row is not None:
+                return row
+
+            row = len(self._rows)
+            self._lengths.append(length)
+            self._bboxes.extend(
+                (int(left), int(top), int(right - left), int(bottom - top))
+            )
+            self._rows[(word, font.size)] = row
+            self._length_seconds += measured - start
+            self._bbox_seconds += finished - measured
+        return row
+
+    def _lookup(self, font: FontWrapper, word: str) -> int | None:
+        row = self._rows.get((word, font.size))
+        if row is None:
+            self._misses += 1
+        return row
+
+    def measure(self, font: FontWrapper, words_and_sizes: Iterable[tuple[str, int]]):
+        """
+        Measures every (word, size) pair that isn't in the table yet.
+
+        Args:
+            font (FontWrapper): The font to measure with, at any size.
+            words_and_sizes (Iterable[tuple[str, int]]): The words and the sizes they will be drawn at.
+        """
+        for word, size in words_and_sizes:
+            if (word, size) not in self._rows:
+                self._add(replace(font, size=size), word)
+
+    def length(self, font: FontWrapper, word: str) -> float:
+        """
+        Returns the advance width of the word at the size of the font.
+        """
+        row = self._lookup(font, word)
+        if row is None:
+            row = self._add(font, word)
+        else:
+            self._length_hits += 1
+
+        return self._lengths[row]
+
+    def bbox(self, font: FontWrapper, word: str) -> Rectangle:
+        """
+        Returns the bounding box of the word at the size of the font.
+        """
+        row = self._lookup(font, word)
+        if row is None:
+            row = self._add(font, word)
+        else:
+            self._bbox_hits += 1
+
+        x, y, width, height = self._bboxes[4 * row : 4 * row + 4]
+        return Rectangle(x=x, y=y, width=width, height=height)
+
+    @property
+    def stats(self) -> MetricsStats:
+        """
+        How often the table was used, and an estimate of the time it saved, taking every
+        hit as a call to FreeType that didn't have to be made.
+        """
+        entries = len(self._rows)
+        seconds_per_length = self._length_seconds / entries if entries else 0.0
+        seconds_per_bbox = self._bbox_seconds / entries if entries else 0.0
+
+        return MetricsStats(
+            entries=entries,
+            hits=self._length_hits + self._bbox_hits,
+            misses=self._misses,
+            measure_seconds=self._length_seconds + self._bbox_seconds,
+            seconds_saved=self._length_hits * seconds_per_length
+            + self._bbox_hits * seconds_per_bbox,
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
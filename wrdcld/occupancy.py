@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import math
+import random
+from collections.abc import Iterable
+from types import ModuleType
+
+from .font import FontWrapper, draw_text, get_glyph_mask
+from .image import Canvas
+from .main import Placement
+from .rectangle import Rectangle
+from .stats import timed
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+class OccupancyMap:
+    """
+    A bitmap of the pixels of the canvas that have been drawn on, kept in step with an
+    integral image (summed-area table) of the bitmap.
+
+    `integral[y, x]` is the number of occupied pixels above and to the left of (x, y), so
+    the number of occupied pixels in any box takes four lookups.
+    """
+
+    def __init__(self, width: int, height: int):
+        if np is None:
+            raise ImportError("The occupancy engine requires numpy")
+
+        self.width = width
+        self.height = height
+        self.occupied = np.zeros((height, width), dtype=bool)
+        self.integral = np.zeros((height + 1, width + 1), dtype=np.int32)
+        # boxes that didn't fit anywhere; pixels are never freed, so nothing larger ever will
+        self._failed_sizes: list[tuple[int, int]] = []
+
+    def count(self, x: int, y: int, width: int, height: int) -> int:
+        """
+        Returns the number of occupied pixels in a box, which must lie inside the canvas.
+        """
+        integral = self.integral
+        return int(
+            integral[y + height, x + width]
+            - integral[y, x + width]
+            - integral[y + height, x]
+            + integral[y, x]
+        )
+
+    def is_free(self, x: int, y: int, width: int, height: int) -> bool:
+        """
+        Returns True if the box lies inside the canvas and none of its pixels are occupied.
+        """
+        if x < 0 or y < 0 or x + width > self.width or y + height > self.height:
+            return False
+        return self.count(x, y, width, height) == 0
+
+    def free_positions(
+        self, width: int, height: int, step: int = 1
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds every position, on a grid with the given step, where a box fits without
+        covering any occupied pixels.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The x and y coordinates of the top left of each free box.
+        """
+        if width > self.width or height > self.height:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        integral = self.integral
+        last_y = self.height - height + 1
+        last_x = self.width - width + 1
+        counts = (
+            integral[height::step, width::step]
+            - integral[:last_y:step, width::step]
+            - integral[height::step, :last_x:step]
+            + integral[:last_y:step, :last_x:step]
+        )
+        ys, xs = np.nonzero(counts == 0)
+        return xs * step, ys * step
+
+    @timed("position_search")
+    def find_position(
+        self,
+        width: int,
+        height: int,
+        probes: int = 32,
+        rng: random.Random | ModuleType = random,
+    ) -> tuple[int, int] | None:
+        """
+        Finds a random position where a box fits without covering any occupied pixels.
+
+        A few random positions are checked first, each in constant time. If none of them
+        are free, every position is checked at once, first on a coarse grid and then on
+        every pixel.
+
+        Returns:
+            tuple[int, int] | None: The top left of the box, or None if it doesn't fit anywhere.
+        """
+        if any(
+            width >= failed_width and height >= failed_height
+            for failed_width, failed_height in self._failed_sizes
+        ):
+            return None
+
+        if width <= self.width and height <= self.height:
+            for _ in range(probes):
+                x = rng.randint(0, self.width - width)
+                y = rng.randint(0, self.height - height)
+                if self.count(x, y, width, height) == 0:
+                    return x, y
+
+        coarse_step = max(1, min(width, height) // 4)
+        for step in sorted({coarse_step, 1}, reverse=True):
+            xs, ys = self.free_positions(width, height, step)
+            if len(xs) > 0:
+                position = rng.randrange(len(xs))
+                return int(xs[position]), int(ys[position])
+
+        self._failed_sizes.append((width, height))
+        return None
+
+    @timed("mark_occupied")
+    def mark(self, x: int, y: int, mask: np.ndarray):
+        """
+        Marks the pixels of a boolean mask, with its top left at (x, y), as occupied.
+
+        The integral image only changes below and to the right of the newly occupied
+        pixels, so only that part of it is updated.
+        """
+        x0, y0 = max(x, 0), max(y, 0)
+        x1 = min(x + mask.shape[1], self.width)
+        y1 = min(y + mask.shape[0], self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        region = self.occupied[y0:y1, x0:x1]
+        newly_occupied = mask[y0 - y : y1 - y, x0 - x : x1 - x] & ~region
+        if not newly_occupied.any():
+            return
+        region |= newly_occupied
+
+        partial_sums = newly_occupied.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+        integral = self.integral
+        integral[y0 + 1 : y1 + 1, x0 + 1 : x1 + 1] += partial_sums
+        integral[y0 + 1 : y1 + 1, x1 + 1 :] += partial_sums[:, -1:]
+        integral[y1 + 1 :, x0 + 1 : x1 + 1] += partial_sums[-1:, :]
+        integral[y1 + 1 :, x1 + 1 :] += partial_sums[-1, -1]
+
+    def mark_outside(self, rectangles: Iterable[Rectangle]):
+        """
+        Marks every pixel that isn't inside one of the rectangles as occupied, e.g. to
+        start from the free space of a mask.
+        """
+        outside = np.ones((self.height, self.width), dtype=bool)
+        for rectangle in rectangles:
+            x, y, right, bottom = (int(value) for value in rectangle.xyrb)
+            outside[y:bottom, x:right] = False
+        self.mark(0, 0, outside)
+
+    @property
+    def occupied_fraction(self) -> float:
+        return float(self.integral[-1, -1]) / (self.width * self.height)
+
+
+def place_word(
+    word: str,
+    occupancy: OccupancyMap,
+    image: Canvas,
+    font: FontWrapper,
+    frequency: float,
+    rng: random.Random | None = None,
+) -> Placement | None:
+    """
+    Draws the word at a random position where its glyphs don't cover any drawn pixels.
+
+    The box of the word only has to avoid the pixels of other words, not their boxes,
+    so small words can be placed in the gaps inside and between larger words. The random
+    choices are made with `rng`, or with the functions of the `random` module if it isn't
+    given.
+
+    Returns:
+        Placement | None: Where the word was drawn, or None if it didn't fit anywhere.
+    """
+    generator = rng if rng is not None else random
+    word_length = font.get_length_of_word(word)
+
+    # try the orientations in a random order, mostly horizontal first
+    orientations = [False, True]
+    if generator.random() < 0.1:
+        orientations.reverse()
+
+    for rotate in orientations:
+        mask = get_glyph_mask(font, word, rotate)
+        if mask.width == 0 or mask.height == 0:
+            return None
+
+        position = occupancy.find_position(mask.width, mask.height, rng=generator)
+        if position is not None:
+            break
+    else:
+        return None
+
+    x, y = position
+    if not rotate:
+        text_rectangle = Rectangle(x=x, y=y, width=word_length, height=font.size)
+    else:
+        # draw_text puts the bottom of rotated glyphs at the bottom of the rectangle
+        text_rectangle = Rectangle(
+            x=x,
+            y=y + mask.height - math.ceil(word_length),
+            width=font.size,
+            height=word_length,
+        )
+
+    draw_text(image, text_rectangle, word, font, frequency, rotate=rotate)
+    occupancy.mark(x, y, np.asarray(mask) > 0)
+
+    return Placement(rectangle=text_rectangle, rotated=rotate)
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
+from typing import BinaryIO
+
+from PIL.Image import Image as PILImage
+
+from .font import FontWrapper, draw_text, get_glyph_mask, glyph_origin
+from .image import ArrayCanvas, Canvas, ImageWrapper
+from .layout import Layout, PlacedWord
+from .rectangle import Rectangle
+from .stats import timed
+from .util import Color
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+DEFAULT_BAND_MEMORY = 64 * 1024 * 1024
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _scaled_rectangle(placed: PlacedWord, scale: float) -> Rectangle:
+    rectangle = placed.rectangle
+    if scale == 1:
+        return rectangle
+    return Rectangle(
+        x=rectangle.x * scale,
+        y=rectangle.y * scale,
+        width=rectangle.width * scale,
+        height=rectangle.height * scale,
+    )
+
+
+@timed("render")
+def render(
+    layout: Layout,
+    font_color: Color = (255, 255, 0),
+    font_color_func: Callable[[float], Color] | None = None,
+    background_color: Color = (73, 109, 137),
+    scale: float = 1.0,
+    font_path: Path | str | None = None,
+) -> PILImage:
+    """
+    Draws a layout, without placing any words again.
+
+    Args:
+        layout (Layout): The layout to draw.
+        font_color (Color): The color of the words, if there is no font_color_func.
+        font_color_func (Callable[[float], Color] | None): Maps the frequency of a word to its color.
+        background_color (Color): The color of the background.
+        scale (float): Scales the image, the positions of the words and their font sizes.
+        font_path (Path | str | None): The font to draw with, by default the font the layout was made with.
+
+    Returns:
+        Image: The word cloud.
+    """
+    assert scale > 0, "Scale must be a positive number"
+
+    image = ImageWrapper(
+        round(layout.width * scale), round(layout.height * scale), background_color
+    )
+    _draw(layout, image, font_color, font_color_func, scale, font_path)
+    return image.img
+
+
+@timed("render")
+def render_array(
+    layout: Layout,
+    font_color: Color = (255, 255, 0),
+    font_color_func: Callable[[float], Color] | None = None,
+    background_color: Color = (73, 109, 137),
+    scale: float = 1.0,
+    font_path: Path | str | None = None,
+) -> np.ndarray:
+    """
+    Draws a layout like `render`, straight into a numpy array (requires numpy).
+
+    The words are drawn into the returned array, so no image has to be copied or
+    converted afterwards, and the canvas is only ever in memory once, as 3 bytes per
+    pixel. `memoryview(array)` exposes the same pixels through the buffer protocol.
+    Blending each word in numpy costs more than in Pillow, so for small canvases with
+    many words, `np.asarray(render(layout))` can be faster.
+
+    Args:
+        layout (Layout): The layout to draw.
+        font_color (Color): The color of the words, if there is no font_color_func.
+        font_color_func (Callable[[float], Color] | None): Maps the frequency of a word to its color.
+        background_color (Color): The color of the background.
+        scale (float): Scales the image, the positions of the words and their font sizes.
+        font_path (Path | str | None): The font to draw with, by default the font the layout was made with.
+
+    Returns:
+        np.ndarray: The word cloud, as a C-contiguous (height, width, 3) array of uint8.
+    """
+    assert scale > 0, "Scale must be a positive number"
+
+    canvas = ArrayCanvas(
+        round(layout.width * scale), round(layout.height * scale), background_color
+    )
+    _draw(layout, canvas, font_color, font_color_func, scale, font_path)
+    return canvas.array
+
+
+def _draw(
+    layout: Layout,
+    canvas: Canvas,
+    font_color: Color,
+    font_color_func: Callable[[float], Color] | None,
+    scale: float,
+    font_path: Path | str | None,
+):
+    font = FontWrapper(
+        color_func=font_color_func or (lambda _: font_color),
+        path=Path(font_path or layout.font_path),
+    )
+
+    for placed in layout.words:
+        rectangle = _scaled_rectangle(placed, scale)
+        draw_text(
+            canvas,
+            rectangle,
+            placed.word,
+            font[placed.font_size * scale],
+            placed.frequency,
+            rotate=placed.rotated,
+        )
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def _bands(
+    layout: Layout, font: FontWrapper, scale: float, height: int, band_height: int
+) -> defaultdict[int, list[tuple[PlacedWord, Rectangle]]]:
+    """
+    Returns the words each band of rows has to draw, from the rows their glyphs cover.
+    """
+    bands: defaultdict[int, list[tuple[PlacedWord, Rectangle]]] = defaultdict(list)
+    for placed in layout.words:
+        rectangle = _scaled_rectangle(placed, scale)
+        mask = get_glyph_mask(
+            font[placed.font_size * scale], placed.word, placed.rotated
+        )
+        _, top = glyph_origin(rectangle, mask, placed.rotated)
+        bottom = min(top + mask.height, height)
+        for band in range(max(top, 0) // band_height, (bottom - 1) // band_height + 1):
+            bands[band].append((placed, rectangle))
+    return bands
+
+
+def render_png(
+    layout: Layout,
+    file: BinaryIO,
+    font_color: Color = (255, 255, 0),
+    font_color_func: Callable[[float], Color] | None = None,
+    background_color: Color = (73, 109, 137),
+    scale: float = 1.0,
+    font_path: Path | str | None = None,
+    max_memory: int = DEFAULT_BAND_MEMORY,
+    compress_level: int = zlib.Z_DEFAULT_COMPRESSION,
+):
+    """
+    Draws a layout like `render`, and writes it as a PNG image, one band of rows at a time,
+    so that only a band of the image is ever in memory.
+
+    Each band only draws the words whose glyphs overlap it.
+
+    Args:
+        layout (Layout): The layout to draw.
+        file (BinaryIO): Where to write the PNG image.
+        font_color (Color): The color of the words, if there is no font_color_func.
+        font_color_func (Callable[[float], Color] | None): Maps the frequency of a word to its color.
+        background_color (Color): The color of the background.
+        scale (float): Scales the image, the positions of the words and their font sizes.
+        font_path (Path | str | None): The font to draw with, by default the font the layout was made with.
+        max_memory (int): The size of a band in bytes, which is at least one row.
+        compress_level (int): The zlib compression level, from 0 (none) and 1 (fastest) to 9 (smallest).
+    """
+    assert scale > 0, "Scale must be a positive number"
+
+    width = round(layout.width * scale)
+    height = round(layout.height * scale)
+    row_bytes = 3 * width
+    band_height = max(1, min(height, max_memory // row_bytes))
+    font = FontWrapper(
+        color_func=font_color_func or (lambda _: font_color),
+        path=Path(font_path or layout.font_path),
+    )
+
+    bands = _bands(layout, font, scale, height, band_height)
+
+    file.write(_PNG_SIGNATURE)
+    # 8 bit RGB, not interlaced
+    file.write(
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+    )
+
+    compressor = zlib.compressobj(compress_level)
+    for band, band_top in enumerate(range(0, height, band_height)):
+        image = ImageWrapper(
+            width, min(band_height, height - band_top), background_color
+        )
+        for placed, rectangle in bands.pop(band, []):
+            draw_text(
+                image,
+                Rectangle(
+                    x=rectangle.x,
+                    y=rectangle.y - band_top,
+                    width=rectangle.width,
+                    height=rectangle.height,
+                ),
+                placed.word,
+                font[placed.font_size * scale],
+                placed.frequency,
+                rotate=placed.rotated,
+            )
+
+        pixels = memoryview(image.img.tobytes())
+        compressed = []
+        for row in range(image.height):
+            # every row starts with its filter type, none
+            compressed.append(compressor.compress(b"\x00"))
+            compressed.append(
+                compressor.compress(pixels[row * row_bytes : (row + 1) * row_bytes])
+            )
+        data = b"".join(compressed)
+        if data:
+            file.write(_png_chunk(b"IDAT", data))
+
+    file.write(_png_chunk(b"IDAT", compressor.flush()))
+    file.write(_png_chunk(b"IEND", b""))
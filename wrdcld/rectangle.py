@@ -1,27 +1,49 @@
 import math
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 
-from .image import ImageWrapper
+from PIL.Image import Image as PILImage
+
+from .image import Canvas
+from .stats import timed
+from .util import Color
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
 
 MIN_RECTANGLE_SIDE_LENGTH = 5
 
 
 @dataclass(frozen=True)
 class Rectangle:
+    # no __dict__, as the hot loops create a lot of rectangles
+    __slots__ = ("width", "height", "x", "y")
+
     width: float
     height: float
     x: float
     y: float
 
+    # frozen dataclasses with __slots__ can't be unpickled or copied by assigning the
+    # fields, so the state is set the way __init__ does
+    def __getstate__(self) -> tuple[float, float, float, float]:
+        return (self.width, self.height, self.x, self.y)
+
+    def __setstate__(self, state: tuple[float, float, float, float]):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
     @property
-    def xy(self) -> tuple[float, float]:
+    def xy(self) -> tuple[int, int]:
         """
         Returns the coordinates of the rectangle as a tuple (x, y).
         """
-        return (int(self.x + 0.5), int(self.y + 0.5))
+        return (math.floor(self.x + 0.5), math.floor(self.y + 0.5))
 
     @property
-    def wh(self) -> tuple[float, float]:
+    def wh(self) -> tuple[int, int]:
         """
         Returns the width and height of the rectangle as a tuple (width, height).
         """
@@ -95,6 +117,28 @@ class Rectangle:
             and self.bottom > other.y
         )
 
+    def intersection(self, other: "Rectangle") -> "Rectangle | None":
+        """
+        Returns the part of the rectangle that is also in the other rectangle.
+
+        Args:
+            other (Rectangle): The other rectangle.
+
+        Returns:
+            Rectangle | None: The overlap, or None if the rectangles don't overlap.
+        """
+        if not self.overlaps(other):
+            return None
+
+        x = max(self.x, other.x)
+        y = max(self.y, other.y)
+        return Rectangle(
+            x=x,
+            y=y,
+            width=min(self.right, other.right) - x,
+            height=min(self.bottom, other.bottom) - y,
+        )
+
     def contains_other(self, other: "Rectangle") -> bool:
         """
         Returns True if the rectangle contains the other rectangle.
@@ -111,6 +155,81 @@ class Rectangle:
         return f"Rectangle(x={int(self.x)} y={int(self.y)} w={int(self.width)} h={int(self.height)})"
 
 
+class RectangleArray:
+    """
+    Rectangles stored as the rows of a numpy array (x, y, width and height), so that they
+    can be filtered, moved and rotated in bulk without creating a `Rectangle` for each
+    of them.
+
+    Indexing and iterating give `Rectangle`s, so it can be read like a list of them.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: "np.ndarray"):
+        if np is None:
+            raise ImportError("RectangleArray requires numpy")
+
+        # shape (4, number of rectangles)
+        self.columns = columns
+
+    @classmethod
+    def from_columns(cls, x, y, width, height) -> "RectangleArray":
+        """
+        Makes the rectangles from sequences of their x, y, width and height.
+        """
+        return cls(np.array([x, y, width, height]).reshape(4, -1))
+
+    @classmethod
+    def from_rectangles(cls, rectangles: Iterable[Rectangle]) -> "RectangleArray":
+        columns = list(
+            zip(*((rect.x, rect.y, rect.width, rect.height) for rect in rectangles))
+        )
+        return cls.from_columns(*columns or ([], [], [], []))
+
+    def __len__(self) -> int:
+        return int(self.columns.shape[1])
+
+    def __getitem__(self, index: int) -> Rectangle:
+        x, y, width, height = self.columns[:, index].tolist()
+        return Rectangle(x=x, y=y, width=width, height=height)
+
+    def __iter__(self) -> Iterator[Rectangle]:
+        return iter(self.to_list())
+
+    def to_list(self) -> list[Rectangle]:
+        """
+        Returns the rectangles as `Rectangle`s.
+        """
+        return [
+            Rectangle(x=x, y=y, width=width, height=height)
+            for x, y, width, height in zip(*self.columns.tolist())
+        ]
+
+    def without_small(
+        self, min_side: float = MIN_RECTANGLE_SIDE_LENGTH
+    ) -> "RectangleArray":
+        """
+        Returns the rectangles whose sides are all at least `min_side` long.
+        """
+        keep = (self.columns[2] >= min_side) & (self.columns[3] >= min_side)
+        return RectangleArray(self.columns[:, keep])
+
+    def offset(self, dx: float, dy: float) -> "RectangleArray":
+        """
+        Returns the rectangles moved by (dx, dy).
+        """
+        return RectangleArray(self.columns + np.array([[dx], [dy], [0], [0]]))
+
+    def rotated_ccw_in(self, height: float) -> "RectangleArray":
+        """
+        Returns the rectangles rotated 90 degrees counter-clockwise, within a space that
+        is `height` tall after the rotation.
+        """
+        x, y, width, rect_height = self.columns
+        return RectangleArray(np.stack([y, height - (x + width), rect_height, width]))
+
+
 def _remove_small_rectangles(rectangles: list[Rectangle]) -> list[Rectangle]:
     """
     Removes rectangles that are smaller than the minimum rectangle side length.
@@ -129,6 +248,7 @@ def _remove_small_rectangles(rectangles: list[Rectangle]) -> list[Rectangle]:
     ]
 
 
+@timed("fill_remaining_space")
 def fill_remaining_space_horizontal(
     outer_rect: Rectangle, inner_rect: Rectangle
 ) -> list[Rectangle]:
@@ -202,6 +322,7 @@ def fill_remaining_space_horizontal(
     return rectangles
 
 
+@timed("fill_remaining_space")
 def fill_remaining_space_vertical(
     outer_rect: Rectangle, inner_rect: Rectangle
 ) -> list[Rectangle]:
@@ -309,80 +430,39 @@ def _find_gaps_for_img_row(
     return left_inds, right_inds
 
 
-def _make_new_rectangles(
-    rectangles: list[Rectangle],
-    row_ind: int,
-    left_inds: list[int],
-    right_inds: list[int],
-) -> list[Rectangle]:
-
-    new_rectangles = []
-    for left_ind, right_ind in zip(left_inds, right_inds):
-        # if the rectangle is too small
-        if right_ind - left_ind < MIN_RECTANGLE_SIDE_LENGTH:
-            continue
-        # if this is a continuation of an existing rectangle
-        extended = False
-        for rect_ind, rectangle in enumerate(rectangles):
-            if (
-                rectangle.bottom == row_ind
-                and rectangle.x == left_ind
-                and rectangle.right == right_ind
-            ):
-                rectangles[rect_ind] = Rectangle(
-                    x=rectangle.x,
-                    y=rectangle.y,
-                    width=rectangle.width,
-                    height=rectangle.height + 1,
-                )
-                extended = True
-                break
-        # otherwise it's a new rectangle
-        if not extended:
-            new_rectangles.append(
-                Rectangle(x=left_ind, y=row_ind, width=right_ind - left_ind, height=1)
-            )
-
-    return new_rectangles
-
-
-def fill_space_around_word(
-    image: ImageWrapper,
-    text_rect: Rectangle,
+def _scan_section_python(
+    img_section: PILImage,
+    quantised: PILImage,
+    background_color: Color,
     fill_direction: str,
 ) -> list[Rectangle]:
     """
-    Returns a list of rectangles that fill the remaining space
+    Scans an image section row by row for runs of background pixels.
 
     Args:
-        image (Image): the overall wordcloud image.
-        text_rect (Rectangle): The rectangle containing the new text.
+        img_section (Image): The section of the wordcloud image to scan.
+        quantised (Image): The section quantised to two colors.
+        background_color (Color): The background color of the wordcloud.
         fill_direction (str): The direction to fill the space in. Either "horizontal" or "vertical".
 
     Returns:
-        list[Rectangle]: List of rectangles that fill the remaining space.
+        list[Rectangle]: The rectangles found, in the coordinates of the (possibly rotated) section.
     """
-
-    img = image.img
-    background_color = image.background_color
-
-    img_section = img.crop(text_rect.xyrb)  # type: ignore
     img_width, img_height = img_section.size
 
     # get the image data as a 2D array
-    img_data = img_section.quantize(2).getdata()
+    img_data = quantised.getdata()
 
     # find the base value
     base_value = None
-    for original, quantised in zip(img_section.getdata(), img_data):
+    for original, quantised_value in zip(img_section.getdata(), img_data):
         if original == background_color:
-            base_value = quantised
+            base_value = quantised_value
             break
 
     if base_value is None:
         raise ValueError("The background color was not found in the image.")
 
-    # img_data = [val for val in img_data]
     img_data = list(img_data)
     img_data = [
         img_data[i * img_width : (i + 1) * img_width] for i in range(img_height)
@@ -392,39 +472,215 @@ def fill_space_around_word(
     if fill_direction == "horizontal":
         img_data = list(zip(*img_data))
 
-    rectangles = [Rectangle(x=0, y=0, width=len(img_data[0]), height=0)]
+    # x, y, width and height of every rectangle, grown in place one row at a time
+    row_width = len(img_data[0])
+    rectangles = [[0, 0, row_width, 0]]
+    # the rectangles that end at the current row, by their left and right edges, as a run
+    # with the same edges in this row extends them
+    open_rectangles = {(0, row_width): 0}
     for row_ind, img_row in enumerate(img_data):
 
         if fill_direction == "horizontal":
             img_row = img_row[::-1]
 
-        left_inds, right_inds = _find_gaps_for_img_row(
-            img_row, base_value, len(img_data[0])
-        )
+        left_inds, right_inds = _find_gaps_for_img_row(img_row, base_value, row_width)
 
-        new_rectangles = _make_new_rectangles(
-            rectangles, row_ind, left_inds, right_inds
-        )
-        rectangles.extend(new_rectangles)
+        next_open_rectangles = {}
+        for left_ind, right_ind in zip(left_inds, right_inds):
+            # if the rectangle is too small
+            if right_ind - left_ind < MIN_RECTANGLE_SIDE_LENGTH:
+                continue
 
-    rectangles = _remove_small_rectangles(rectangles)
+            rect_ind = open_rectangles.get((left_ind, right_ind))
+            if rect_ind is not None:
+                rectangles[rect_ind][3] += 1
+            else:
+                rect_ind = len(rectangles)
+                rectangles.append([left_ind, row_ind, right_ind - left_ind, 1])
+            next_open_rectangles[left_ind, right_ind] = rect_ind
+        open_rectangles = next_open_rectangles
+
+    return [
+        Rectangle(x=x, y=y, width=width, height=height)
+        for x, y, width, height in rectangles
+    ]
 
-    # if we rotated the image, we need to rotate the rectangles back
+
+def _section_background(
+    img_section: PILImage,
+    quantised: PILImage,
+    background_color: Color,
+    fill_direction: str,
+) -> "np.ndarray":
+    """
+    Finds the pixels of an image section that are quantised to the same value as the
+    background, transposed and mirrored for a horizontal fill like `_scan_section_python`.
+
+    Returns:
+        np.ndarray: 2D boolean array, True where the pixel is background.
+    """
+    original = np.asarray(img_section)
+    quantised_data = np.asarray(quantised)
+
+    # find the base value
+    is_background = np.all(original == background_color, axis=-1)
+    if not is_background.any():
+        raise ValueError("The background color was not found in the image.")
+    base_value = quantised_data.flat[np.argmax(is_background)]
+
+    background: np.ndarray = quantised_data == base_value
     if fill_direction == "horizontal":
-        rotated_rectangles = []
-        for rectangle in rectangles:
-            rotated_rectangles.append(
-                Rectangle(
-                    x=rectangle.y,
-                    y=len(img_data[0]) - (rectangle.x + rectangle.width),
-                    width=rectangle.height,
-                    height=rectangle.width,
+        background = background.T[:, ::-1]
+
+    return background
+
+
+def _scan_section_numpy(
+    img_section: PILImage,
+    quantised: PILImage,
+    background_color: Color,
+    fill_direction: str,
+) -> list[Rectangle]:
+    """
+    Vectorised version of `_scan_section_python`, returning exactly the same rectangles
+    in the same order.
+
+    Args:
+        img_section (Image): The section of the wordcloud image to scan.
+        quantised (Image): The section quantised to two colors.
+        background_color (Color): The background color of the wordcloud.
+        fill_direction (str): The direction to fill the space in. Either "horizontal" or "vertical".
+
+    Returns:
+        list[Rectangle]: The rectangles found, in the coordinates of the (possibly rotated) section.
+    """
+    return _rectangles_from_background_mask(
+        _section_background(img_section, quantised, background_color, fill_direction)
+    )
+
+
+def _rectangles_from_background_mask(background: "np.ndarray") -> list[Rectangle]:
+    """
+    Like `_rectangle_array_from_background_mask`, as a list of `Rectangle`s that starts
+    like the row scan of `_scan_section_python`.
+    """
+    rectangles = _rectangle_array_from_background_mask(background).to_list()
+
+    # the scan always starts with an empty rectangle spanning the first row
+    row_width = background.shape[1]
+    if not rectangles or rectangles[0].xy != (0, 0) or rectangles[0].width != row_width:
+        rectangles.insert(0, Rectangle(x=0, y=0, width=row_width, height=0))
+
+    return rectangles
+
+
+def _rectangle_array_from_background_mask(background: "np.ndarray") -> RectangleArray:
+    """
+    Finds the runs of background in every row of a boolean mask, and stacks identical
+    runs in consecutive rows into rectangles.
+
+    Args:
+        background (np.ndarray): 2D boolean array, True where the pixel is background.
+
+    Returns:
+        RectangleArray: The rectangles, ordered by the row and column they start at.
+        Runs narrower than `MIN_RECTANGLE_SIDE_LENGTH` are left out.
+    """
+    n_rows, row_width = background.shape
+
+    # run-length detection: +1 where a run starts, -1 one past where it ends
+    padded = np.zeros((n_rows, row_width + 2), dtype=np.int8)
+    padded[:, 1:-1] = background
+    edges = np.diff(padded, axis=1)
+    rows, lefts = np.nonzero(edges == 1)
+    _, rights = np.nonzero(edges == -1)
+
+    wide_enough = rights - lefts >= MIN_RECTANGLE_SIDE_LENGTH
+    rows, lefts, rights = rows[wide_enough], lefts[wide_enough], rights[wide_enough]
+
+    # a run extends the rectangle above it if the previous row had exactly the same run,
+    # so sorting by (left, right, row) puts every rectangle's rows next to each other
+    order = np.lexsort((rows, rights, lefts))
+    sorted_rows, sorted_lefts, sorted_rights = rows[order], lefts[order], rights[order]
+    extends = np.zeros(len(order), dtype=bool)
+    extends[1:] = (
+        (sorted_lefts[1:] == sorted_lefts[:-1])
+        & (sorted_rights[1:] == sorted_rights[:-1])
+        & (sorted_rows[1:] == sorted_rows[:-1] + 1)
+    )
+    heights = np.bincount(np.cumsum(~extends) - 1)
+    firsts = order[~extends]
+
+    # restore the order the rectangles would have been created in, row by row
+    creation_order = np.argsort(firsts, kind="stable")
+    firsts, heights = firsts[creation_order], heights[creation_order]
+
+    lefts = lefts[firsts]
+    return RectangleArray.from_columns(
+        lefts, rows[firsts], rights[firsts] - lefts, heights
+    )
+
+
+@timed("fill_space_around_word")
+def fill_space_around_word(
+    image: Canvas,
+    text_rect: Rectangle,
+    fill_direction: str,
+) -> list[Rectangle]:
+    """
+    Returns a list of rectangles that fill the remaining space
+
+    Uses a vectorised scan when numpy is installed, and falls back to a pure python scan otherwise.
+
+    Args:
+        image (Image): the overall wordcloud image.
+        text_rect (Rectangle): The rectangle containing the new text.
+        fill_direction (str): The direction to fill the space in. Either "horizontal" or "vertical".
+
+    Returns:
+        list[Rectangle]: List of rectangles that fill the remaining space.
+    """
+
+    img_section = image.crop(text_rect.xyrb)
+    img_height = img_section.height
+    quantised = img_section.quantize(2)
+
+    try:
+        if np is not None:
+            # filter, rotate and move the rectangles in bulk, and only make them at the end
+            found = _rectangle_array_from_background_mask(
+                _section_background(
+                    img_section, quantised, image.background_color, fill_direction
                 )
+            ).without_small()
+            if fill_direction == "horizontal":
+                found = found.rotated_ccw_in(img_height)
+
+            return found.offset(text_rect.x, text_rect.y).to_list()
+
+        rectangles = _remove_small_rectangles(
+            _scan_section_python(
+                img_section, quantised, image.background_color, fill_direction
             )
-        rectangles = rotated_rectangles
+        )
+    except ValueError:
+        # the word covers every pixel of its rectangle, e.g. a tiny word in a draft
+        # layout, so there is no space around it
+        return []
+
+    # rotate the rectangles back if the section was rotated, and move them into place
+    if fill_direction == "horizontal":
+        return [
+            Rectangle(
+                x=rectangle.y + text_rect.x,
+                y=img_height - (rectangle.x + rectangle.width) + text_rect.y,
+                width=rectangle.height,
+                height=rectangle.width,
+            )
+            for rectangle in rectangles
+        ]
 
-    # offset the rectangles to the correct position
-    rectangles = [
+    return [
         Rectangle(
             x=rectangle.x + text_rect.x,
             y=rectangle.y + text_rect.y,
@@ -433,5 +689,3 @@ def fill_space_around_word(
         )
         for rectangle in rectangles
     ]
-
-    return rectangles
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+from contextlib import suppress
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+from PIL.Image import Image
+
+from .cache import CacheStats
+from .colors import COLOR_SCHEMES, ColorScheme
+from .encode import encode, encoder_options
+from .font import FontWrapper
+from .layout import Layout
+from .selection import WordSupply, iter_word_counts
+
+DEFAULT_RENDER_CACHE_BYTES = 1024 * 1024 * 1024
+
+# changes whenever the same key could stand for a different image, to ignore old entries
+_KEY_VERSION = 1
+# arguments that don't change the result, so they aren't part of the key
+_UNKEYED = frozenset({"all_words", "metrics", "stats", "cancel"})
+
+_FILE_DIGESTS: dict[tuple[str, int, int], str] = {}
+_FILE_DIGESTS_LOCK = threading.Lock()
+
+
+def _file_digest(path: Path) -> str:
+    """
+    Returns the sha256 digest of a file's contents, which is only read again when its
+    size or modification time change.
+    """
+    stat = os.stat(path)
+    key = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+    with _FILE_DIGESTS_LOCK:
+        digest = _FILE_DIGESTS.get(key)
+    if digest is None:
+        digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        with _FILE_DIGESTS_LOCK:
+            _FILE_DIGESTS[key] = digest
+    return digest
+
+
+def _keyable(name: str, value: Any) -> Any:
+    """
+    Turns an argument into a JSON value that identifies it.
+
+    Raises:
+        TypeError: If the argument can't be identified, e.g. a lambda.
+    """
+    if name == "font_path":
+        return _file_digest(value or FontWrapper.default_font())
+    if name == "color_scheme" and value in COLOR_SCHEMES:
+        # by its colors, so changing a scheme doesn't return images in the old colors
+        value = COLOR_SCHEMES[value]
+    if isinstance(value, ColorScheme):
+        return {"stops": _keyable(name, value.stops)}
+    if isinstance(value, Image):
+        return hashlib.sha256(
+            f"{value.mode}:{value.width}x{value.height}:".encode() + value.tobytes()
+        ).hexdigest()
+    if isinstance(value, (bytes, bytearray)):
+        return {"bytes": value.hex()}
+    if isinstance(value, (tuple, list)):
+        return [_keyable(name, item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _keyable(name, item) for key, item in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    return _keyable_object(name, value)
+
+
+def _keyable_object(name: str, value: Any) -> Any:
+    """
+    Identifies a function by its qualified name, or another object by its class and
+    attributes, e.g. a placement strategy.
+
+    Raises:
+        TypeError: If it is defined in a function or is a lambda.
+    """
+    qualified_name = (
+        f"{value.__module__}.{value.__qualname__}"
+        if inspect.isroutine(value)
+        else f"{type(value).__module__}.{type(value).__qualname__}"
+    )
+    if "<" in qualified_name:
+        raise TypeError(
+            f"{name} can't be cached, use a module level function or a color scheme"
+        )
+    if inspect.isroutine(value):
+        return {"function": qualified_name}
+    return {"object": qualified_name, "state": _keyable(name, vars(value))}
+
+
+def cache_key(
+    function: Callable,
+    all_words: WordSupply,
+    params: dict[str, Any],
+    output: dict[str, Any] | None = None,
+) -> str:
+    """
+    Returns a digest of everything that decides the result of a call, including the
+    order of the words and the contents of the font file.
+
+    Args:
+        function (Callable): `make_word_cloud` or `compute_layout`, which the defaults are taken from.
+        all_words (WordSupply): The words, as for `make_word_cloud`.
+        params (dict[str, Any]): The other arguments of the function.
+        output (dict[str, Any] | None): Anything else that decides the result, e.g. how it is encoded.
+
+    Returns:
+        str: The hexadecimal sha256 digest.
+
+    Raises:
+        TypeError: If an argument can't be identified, e.g. a `font_color_func` lambda.
+    """
+    arguments = inspect.signature(function).bind(all_words, **params)
+    arguments.apply_defaults()
+
+    hasher = hashlib.sha256()
+    hasher.update(
+        json.dumps(
+            {
+                "version": _KEY_VERSION,
+                "function": function.__name__,
+                "output": _keyable("output", output),
+                "params": {
+                    name: _keyable(name, value)
+                    for name, value in arguments.arguments.items()
+                    if name not in _UNKEYED
+                },
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    for word, count in iter_word_counts(all_words):
+        hasher.update(f"{len(word)}:{word}{count!r}\n".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class RenderCache:
+    """
+    A cache of encoded word clouds and layouts in a directory on the local disk, which
+    can be shared by every process on the machine.
+
+    Entries are files named by the `cache_key` of the call that made them. They are
+    written to a temporary file that is then renamed, so readers never see a partial
+    entry. Reading an entry updates its modification time, and the least recently used
+    entries are deleted once the directory holds more than `max_bytes`.
+
+    A hit only reads the entry and digests the font file, without loading any fonts.
+    Calls without a seed aren't reproducible, so they are never cached.
+    """
+
+    def __init__(
+        self, directory: Path | str, max_bytes: int = DEFAULT_RENDER_CACHE_BYTES
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*.entry"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def get(self, key: str, suffix: str) -> bytes | None:
+        """
+        Returns the entry for a key, or None if there is none.
+
+        Args:
+            key (str): The key of the entry.
+            suffix (str): What kind of entry it is, e.g. the image format.
+
+        Returns:
+            bytes | None: The contents of the entry.
+        """
+        path = self.directory / f"{key}.{suffix}.entry"
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        # marks the entry as recently used, unless another process just evicted it
+        with suppress(FileNotFoundError):
+            os.utime(path)
+        with self._lock:
+            self._hits += 1
+        return data
+
+    def put(self, key: str, suffix: str, data: bytes):
+        """
+        Stores an entry, replacing any entry with the same key, and evicts the least
+        recently used entries if the cache is now too large.
+
+        Args:
+            key (str): The key of the entry.
+            suffix (str): What kind of entry it is, e.g. the image format.
+            data (bytes): The contents of the entry.
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        file = tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        )
+        try:
+            with file:
+                file.write(data)
+            os.replace(file.name, self.directory / f"{key}.{suffix}.entry")
+        except BaseException:
+            Path(file.name).unlink(missing_ok=True)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                # another process evicted it first
+                pass
+            else:
+                with self._lock:
+                    self._evictions += 1
+            size -= entry_size
+
+    def make_word_cloud(
+        self,
+        all_words: WordSupply,
+        image_format: str = "PNG",
+        encoder_preset: str = "fast",
+        **params: Any,
+    ) -> bytes:
+        """
+        Makes a word cloud like `make_word_cloud`, encoded, or returns it from the cache.
+
+        Colors must be given as `font_color` or a `color_scheme`, as a `font_color_func`
+        lambda can't be part of the key.
+
+        Args:
+            all_words (WordSupply): The words, as for `make_word_cloud`.
+            image_format (str): The image format, e.g. "PNG".
+            encoder_preset (str): The encoder options of the image format, one of `ENCODER_PRESETS`.
+            **params: The other arguments of `make_word_cloud`.
+
+        Returns:
+            bytes: The encoded word cloud.
+        """
+        # pylint: disable=import-outside-toplevel
+        from . import make_word_cloud
+
+        image_format = image_format.upper()
+        # the key and the render both go through the words, which may be a one-shot
+        # iterable of pairs
+        word_counts = list(iter_word_counts(all_words))
+        key = None
+        if params.get("seed") is not None:
+            key = cache_key(
+                make_word_cloud,
+                word_counts,
+                params,
+                # the image format and encoder options decide the bytes of the entry
+                {
+                    "image_format": image_format,
+                    "encoder_options": encoder_options(image_format, encoder_preset),
+                },
+            )
+            data = self.get(key, image_format.lower())
+            if data is not None:
+                return data
+
+        buffer = BytesIO()
+        encode(
+            make_word_cloud(word_counts, **params), buffer, image_format, encoder_preset
+        )
+        data = buffer.getvalue()
+        if key is not None:
+            self.put(key, image_format.lower(), data)
+        return data
+
+    def compute_layout(self, all_words: WordSupply, **params: Any) -> Layout:
+        """
+        Works out a layout like `compute_layout`, or returns it from the cache.
+
+        Args:
+            all_words (WordSupply): The words, as for `compute_layout`.
+            **params: The other arguments of `compute_layout`.
+
+        Returns:
+            Layout: The layout.
+        """
+        # pylint: disable=import-outside-toplevel
+        from . import compute_layout
+
+        if params.get("seed") is None:
+            return compute_layout(all_words, **params)
+
+        word_counts = list(iter_word_counts(all_words))
+        key = cache_key(compute_layout, word_counts, params)
+        data = self.get(key, "layout")
+        if data is not None:
+            return Layout.from_bytes(data)
+
+        layout = compute_layout(word_counts, **params)
+        self.put(key, "layout", layout.to_bytes())
+        return layout
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        The hits, misses and evictions of this instance, and the entries and size of the
+        whole directory.
+        """
+        entries = self._entries()
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(entries),
+                size=sum(size for _, size, _ in entries),
+                max_size=self.max_bytes,
+            )
+
+    def clear(self):
+        """
+        Deletes every entry in the directory and resets the statistics.
+        """
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping
+from typing import Union
+
+WordSupply = Union[list[str], Mapping[str, int], Iterable[tuple[str, int]]]
+
+
+def iter_word_counts(all_words: WordSupply) -> Iterable[tuple[str, int]]:
+    """
+    Returns the (word, count) pairs of any supported supply of words.
+
+    Args:
+        all_words (WordSupply): A list of words, a mapping (e.g. a Counter) from words to counts, or an iterable of (word, count) pairs.
+
+    Returns:
+        Iterable[tuple[str, int]]: The (word, count) pairs, in the order they were first seen.
+    """
+    if isinstance(all_words, list) and (not all_words or isinstance(all_words[0], str)):
+        return Counter(all_words).items()
+    if isinstance(all_words, Mapping):
+        return all_words.items()
+    return all_words  # type: ignore[return-value]
+
+
+def minimum_renderable_count(
+    max_count: int,
+    maximum_font_size: float,
+    minimum_font_size: float,
+    scaling_func: Callable[[float], float],
+) -> int:
+    """
+    Finds the smallest count at which a word is still drawn, by bisecting over the counts.
+
+    Assumes that the scaling function is non-decreasing.
+
+    Args:
+        max_count (int): The count of the most common word.
+        maximum_font_size (float): The font size of the most common word.
+        minimum_font_size (float): The smallest font size that is drawn.
+        scaling_func (Callable[[float], float]): Maps the frequency of a word to the fraction of the maximum font size.
+
+    Returns:
+        int: The smallest renderable count, or `max_count + 1` if no word is renderable.
+    """
+
+    def renderable(count: int) -> bool:
+        return maximum_font_size * scaling_func(count / max_count) >= minimum_font_size
+
+    low, high = 1, max_count + 1
+    while low < high:
+        middle = (low + high) // 2
+        if renderable(middle):
+            high = middle
+        else:
+            low = middle + 1
+
+    return low
+
+
+def select_renderable_words(
+    word_counts: Iterable[tuple[str, int]],
+    maximum_font_size: float,
+    minimum_font_size: float,
+    scaling_func: Callable[[float], float],
+) -> list[tuple[str, int]]:
+    """
+    Selects the words that are common enough to be drawn, in a single pass.
+
+    Only the words at or above the minimum renderable count (for the most common word seen
+    so far) are kept on a heap, and whenever a more common word comes along the words that
+    fell below the new minimum are popped off. Only the selected words are sorted.
+
+    The minimum renderable count is a whole number, so counts that aren't (e.g. weights
+    below 1) are checked against the font sizes directly.
+
+    Args:
+        word_counts (Iterable[tuple[str, int]]): The (word, count) pairs.
+        maximum_font_size (float): The font size of the most common word.
+        minimum_font_size (float): The smallest font size that is drawn.
+        scaling_func (Callable[[float], float]): Maps the frequency of a word to the fraction of the maximum font size.
+
+    Returns:
+        list[tuple[str, int]]: The renderable (word, count) pairs, ordered like `Counter.most_common`.
+    """
+    heap: list[tuple[int, int, str]] = []
+    max_count = 0
+    min_count = 1
+
+    def renderable(count: int) -> bool:
+        if count >= min_count:
+            return True
+        # whole counts below the minimum never are, without calling the scaling function
+        if isinstance(count, int):
+            return False
+        return maximum_font_size * scaling_func(count / max_count) >= minimum_font_size
+
+    for index, (word, count) in enumerate(word_counts):
+        if count > max_count:
+            max_count = count
+            min_count = minimum_renderable_count(
+                max_count, maximum_font_size, minimum_font_size, scaling_func
+            )
+            while heap and not renderable(heap[0][0]):
+                heapq.heappop(heap)
+
+        if renderable(count):
+            heapq.heappush(heap, (count, index, word))
+
+    heap.sort(key=lambda entry: (-entry[0], entry[1]))
+    return [(word, count) for count, _, word in heap]
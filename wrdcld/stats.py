@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import functools
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+
+@dataclass(frozen=True)
+class StageStats:
+    calls: int
+    seconds: float
+
+
+class RenderStats:
+    """
+    Collects the cumulative time and number of calls of each stage of making a word cloud.
+
+    Stages nest, so e.g. the time of "draw_text" is also part of the time of "fill". To
+    forward the timings somewhere else as they happen, override `record`.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, int] = {}
+        self._seconds: dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float):
+        """
+        Adds one call of a stage that took `seconds`.
+
+        Args:
+            stage (str): The name of the stage.
+            seconds (float): How long the call took.
+        """
+        self._calls[stage] = self._calls.get(stage, 0) + 1
+        self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+
+    @property
+    def stages(self) -> dict[str, StageStats]:
+        return {
+            stage: StageStats(calls=calls, seconds=self._seconds[stage])
+            for stage, calls in self._calls.items()
+        }
+
+    def __getitem__(self, stage: str) -> StageStats:
+        return StageStats(
+            calls=self._calls.get(stage, 0), seconds=self._seconds.get(stage, 0.0)
+        )
+
+    def __repr__(self) -> str:
+        stages = ", ".join(
+            f"{stage}: {stats.calls} calls in {stats.seconds:.4f}s"
+            for stage, stats in self.stages.items()
+        )
+        return f"RenderStats({stages})"
+
+
+# the collector of the word cloud being made in this thread or task, if any
+_STATS: ContextVar[RenderStats | None] = ContextVar("wrdcld_stats", default=None)
+
+
+@contextmanager
+def collect_stats(stats: RenderStats | None = None) -> Iterator[RenderStats]:
+    """
+    Records the stages of everything made in the context, in this thread or task.
+
+    Args:
+        stats (RenderStats | None): The collector, by default a new one.
+
+    Yields:
+        RenderStats: The collector.
+    """
+    stats = stats if stats is not None else RenderStats()
+    token = _STATS.set(stats)
+    try:
+        yield stats
+    finally:
+        _STATS.reset(token)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """
+    Records every call of the decorated function as a call of the stage, while stats are
+    being collected. Otherwise the only cost is looking up the collector.
+    """
+
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            stats = _STATS.get()
+            if stats is None:
+                return function(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.record(stage, time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import random
+from abc import ABC, abstractmethod
+from types import ModuleType
+
+from .freespace import FreeRectangles
+from .rectangle import Rectangle
+from .stats import timed
+
+
+class PlacementStrategy(ABC):
+    """
+    Decides which free rectangle a word goes in, and where in that rectangle, for the
+    rectangles engine.
+
+    Subclasses implement `choose_rectangle`. By default the word is put at a random
+    position in the rectangle; override `position` to put it elsewhere.
+    """
+
+    @abstractmethod
+    def choose_rectangle(
+        self, free_rectangles: FreeRectangles, width: float, height: float
+    ) -> Rectangle | None:
+        """
+        Chooses a free rectangle that a box of the given size fits in.
+
+        Args:
+            free_rectangles (FreeRectangles): The free space.
+            width (float): The width of the word's box.
+            height (float): The height of the word's box.
+
+        Returns:
+            Rectangle | None: The chosen rectangle, or None if the box doesn't fit anywhere.
+        """
+
+    def position(
+        self,
+        rectangle: Rectangle,
+        width: float,
+        height: float,
+        rng: random.Random | ModuleType,
+    ) -> tuple[float, float]:
+        """
+        Chooses where the top left of the word's box goes in the chosen rectangle.
+
+        Args:
+            rectangle (Rectangle): The chosen rectangle.
+            width (float): The width of the word's box.
+            height (float): The height of the word's box.
+            rng (random.Random | ModuleType): The random generator of the layout.
+
+        Returns:
+            tuple[float, float]: The x and y of the top left of the box.
+        """
+        return (
+            rng.uniform(rectangle.x, rectangle.x + rectangle.width - width),
+            rng.uniform(rectangle.y, rectangle.y + rectangle.height - height),
+        )
+
+
+class LargestFit(PlacementStrategy):
+    """
+    Puts every word at a random position in the largest rectangle it fits in.
+
+    Words are spread over the whole canvas, but the large free rectangles are broken up
+    early, so later words fail to fit more often.
+    """
+
+    @timed("rectangle_search")
+    def choose_rectangle(
+        self, free_rectangles: FreeRectangles, width: float, height: float
+    ) -> Rectangle | None:
+        return free_rectangles.largest_fitting(width, height)
+
+
+class BestAreaFit(PlacementStrategy):
+    """
+    Puts every word at a random position in the smallest rectangle it fits in, which
+    keeps the large rectangles free for the words that need them.
+    """
+
+    @timed("rectangle_search")
+    def choose_rectangle(
+        self, free_rectangles: FreeRectangles, width: float, height: float
+    ) -> Rectangle | None:
+        return next(free_rectangles.fitting(width, height, smallest_first=True), None)
+
+
+class BestShortSideFit(PlacementStrategy):
+    """
+    Puts every word at a random position in the rectangle that it fills most tightly
+    along one side, breaking ties by the other side.
+
+    This looks at every rectangle the word fits in, so it is the slowest strategy.
+    """
+
+    @timed("rectangle_search")
+    def choose_rectangle(
+        self, free_rectangles: FreeRectangles, width: float, height: float
+    ) -> Rectangle | None:
+        def leftover(rectangle: Rectangle) -> tuple[float, float]:
+            horizontal = rectangle.width - width
+            vertical = rectangle.height - height
+            return min(horizontal, vertical), max(horizontal, vertical)
+
+        return min(free_rectangles.fitting(width, height), key=leftover, default=None)
+
+
+class BottomLeft(PlacementStrategy):
+    """
+    Puts every word in the bottom left corner of the rectangle that lets it sit lowest on
+    the canvas, and furthest to the left among those.
+
+    Words are packed against each other from the bottom of the canvas up, which leaves
+    the free space in few large rectangles, but the word cloud is denser at the bottom.
+    """
+
+    @timed("rectangle_search")
+    def choose_rectangle(
+        self, free_rectangles: FreeRectangles, width: float, height: float
+    ) -> Rectangle | None:
+        return min(
+            free_rectangles.fitting(width, height),
+            key=lambda rectangle: (-(rectangle.y + rectangle.height), rectangle.x),
+            default=None,
+        )
+
+    def position(
+        self,
+        rectangle: Rectangle,
+        width: float,
+        height: float,
+        rng: random.Random | ModuleType,
+    ) -> tuple[float, float]:
+        return rectangle.x, rectangle.y + rectangle.height - height
+
+
+STRATEGIES: dict[str, PlacementStrategy] = {
+    "largest": LargestFit(),
+    "best_area": BestAreaFit(),
+    "best_short_side": BestShortSideFit(),
+    "bottom_left": BottomLeft(),
+}
+DEFAULT_STRATEGY = STRATEGIES["largest"]
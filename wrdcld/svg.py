@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import base64
+from collections.abc import Callable
+from pathlib import Path
+from typing import TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from .font import FontWrapper
+from .layout import Layout, PlacedWord
+from .util import Color
+
+
+def _number(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _hex(color: Color) -> str:
+    red, green, blue = color
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def _text_element(placed: PlacedWord, font: FontWrapper, color: Color) -> str:
+    """
+    Returns a text element that puts the word where `draw_text` would draw it.
+
+    `draw_text` draws the glyphs cropped to their bounding box, with the top left of the
+    box at the rectangle (or, for rotated words, at the bottom left of the rectangle),
+    so the start of the baseline is found from the bounding box and the ascent of the font.
+    """
+    word_font = font[placed.font_size]
+    bbox = word_font.getbbox(placed.word)
+    ascent, _ = word_font.get().getmetrics()
+    x, y = placed.rectangle.xy
+
+    attributes = f'font-size="{placed.font_size}" fill="{_hex(color)}"'
+    if not placed.rotated:
+        position = f'x="{x - bbox.x}" y="{y - bbox.y + ascent}"'
+    else:
+        # the text runs up from the bottom left of the rectangle
+        bottom = y + placed.rectangle.wh[1]
+        position = (
+            f'x="{-bbox.x}" y="{ascent - bbox.y}" '
+            f'transform="translate({x} {bottom}) rotate(-90)"'
+        )
+
+    return f"<text {position} {attributes}>{escape(placed.word)}</text>\n"
+
+
+def render_svg(
+    layout: Layout,
+    file: TextIO,
+    font_color: Color = (255, 255, 0),
+    font_color_func: Callable[[float], Color] | None = None,
+    background_color: Color = (73, 109, 137),
+    scale: float = 1.0,
+    font_path: Path | str | None = None,
+    embed_font: bool = False,
+):
+    """
+    Writes a layout as an SVG image, one word at a time, without drawing it.
+
+    Only the word metrics are read from the font, so a poster is best laid out at a
+    working resolution and written with a `scale`, which only changes the size of the
+    SVG image and not the coordinates in it.
+
+    Args:
+        layout (Layout): The layout to write.
+        file (TextIO): Where to write the SVG image.
+        font_color (Color): The color of the words, if there is no font_color_func.
+        font_color_func (Callable[[float], Color] | None): Maps the frequency of a word to its color.
+        background_color (Color): The color of the background.
+        scale (float): Scales the size of the image.
+        font_path (Path | str | None): The font to measure the words with, by default the font the layout was made with.
+        embed_font (bool): Whether to embed the font file, so that viewers don't need the font installed.
+    """
+    assert scale > 0, "Scale must be a positive number"
+
+    font_color_func = font_color_func or (lambda _: font_color)
+    font = FontWrapper(
+        color_func=font_color_func, path=Path(font_path or layout.font_path)
+    )
+    family, _ = font.get().getname()
+    family = family or "sans-serif"
+
+    file.write(
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{_number(layout.width * scale)}" '
+        f'height="{_number(layout.height * scale)}" '
+        f'viewBox="0 0 {layout.width} {layout.height}">\n'
+    )
+
+    if embed_font:
+        font_data = base64.b64encode(Path(font.path).read_bytes()).decode("ascii")
+        file.write(
+            f"<style>@font-face{{font-family:{quoteattr(family)};"
+            f"src:url(data:font/ttf;base64,{font_data})}}</style>\n"
+        )
+
+    file.write(
+        f'<rect width="100%" height="100%" fill="{_hex(background_color)}"/>\n'
+        f"<g font-family={quoteattr(family)}>\n"
+    )
+    for placed in layout.words:
+        file.write(_text_element(placed, font, font.color(placed.frequency)))
+    file.write("</g>\n</svg>\n")
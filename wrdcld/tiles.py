@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+from PIL import Image
+
+from .cache import BoundedLRU, CacheStats
+from .util import Color
+
+DEFAULT_TILE_SIZE = 512
+
+TileKey = tuple[int, int]
+
+
+class TiledImage:
+    """
+    An RGB canvas split into square tiles, which are only allocated once something is
+    drawn on them, so that drawing and cropping only touch the tiles they overlap.
+
+    At most `max_memory` bytes of tiles are kept in memory. Beyond that, the least
+    recently used tiles are spilled to temporary files and read back when needed.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        background_color: Color,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        max_memory: int | None = None,
+    ):
+        assert tile_size > 0, "Tile size must be a positive number (in pixels)"
+        if max_memory is None:
+            max_memory = 3 * width * height
+        assert (
+            max_memory >= 3 * tile_size * tile_size
+        ), "The memory budget must fit at least one tile"
+
+        self.width = width
+        self.height = height
+        self.background_color = background_color
+        self.tile_size = tile_size
+
+        self._tiles: BoundedLRU[TileKey, Image.Image] = BoundedLRU(
+            max_memory,
+            sizeof=lambda tile: 3 * tile.width * tile.height,
+            on_evict=self._spill,
+        )
+        self._drawn: set[TileKey] = set()
+        self._spill_dir: tempfile.TemporaryDirectory | None = None
+
+    def _tile_box(self, key: TileKey) -> tuple[int, int, int, int]:
+        row, col = key
+        left, top = col * self.tile_size, row * self.tile_size
+        return (
+            left,
+            top,
+            min(left + self.tile_size, self.width),
+            min(top + self.tile_size, self.height),
+        )
+
+    def _spill_path(self, key: TileKey) -> Path:
+        if self._spill_dir is None:
+            # removed by close, or when the canvas is garbage collected
+            # pylint: disable-next=consider-using-with
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="wrdcld-tiles-")
+        return Path(self._spill_dir.name) / f"{key[0]}_{key[1]}.raw"
+
+    def _spill(self, key: TileKey, tile: Image.Image):
+        self._spill_path(key).write_bytes(tile.tobytes())
+
+    def _load(self, key: TileKey) -> Image.Image:
+        left, top, right, bottom = self._tile_box(key)
+        size = (right - left, bottom - top)
+
+        if key in self._drawn:
+            return Image.frombytes("RGB", size, self._spill_path(key).read_bytes())
+
+        self._drawn.add(key)
+        return Image.new("RGB", size, color=self.background_color)
+
+    def _tile(self, key: TileKey) -> Image.Image:
+        return self._tiles.get_or_create(key, lambda: self._load(key))
+
+    def _keys(self, left: int, top: int, right: int, bottom: int) -> Iterator[TileKey]:
+        """
+        Yields the tiles that overlap a box, clipped to the canvas.
+        """
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right, self.width), min(bottom, self.height)
+        if left >= right or top >= bottom:
+            return
+
+        for row in range(top // self.tile_size, (bottom - 1) // self.tile_size + 1):
+            for col in range(left // self.tile_size, (right - 1) // self.tile_size + 1):
+                yield row, col
+
+    def paste_mask(self, color: Color, xy: tuple[int, int], mask: Image.Image):
+        x, y = xy
+        for key in self._keys(x, y, x + mask.width, y + mask.height):
+            left, top, _, _ = self._tile_box(key)
+            self._tile(key).paste(color, (x - left, y - top), mask)
+
+    def paste(self, image: Image.Image, xy: tuple[int, int]):
+        x, y = xy
+        for key in self._keys(x, y, x + image.width, y + image.height):
+            left, top, _, _ = self._tile_box(key)
+            self._tile(key).paste(image, (x - left, y - top))
+
+    def crop(self, box: tuple[float, float, float, float]) -> Image.Image:
+        # round like Image.crop, and leave the outside of the canvas black like it does
+        left, top, right, bottom = (round(value) for value in box)
+        cropped = Image.new("RGB", (right - left, bottom - top), color=(0, 0, 0))
+        cropped.paste(
+            self.background_color,
+            (
+                max(-left, 0),
+                max(-top, 0),
+                min(self.width, right) - left,
+                min(self.height, bottom) - top,
+            ),
+        )
+
+        for key in self._keys(left, top, right, bottom):
+            if key in self._drawn:
+                tile_left, tile_top, _, _ = self._tile_box(key)
+                cropped.paste(self._tile(key), (tile_left - left, tile_top - top))
+
+        return cropped
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        The tiles in memory, and how often tiles were spilled (evictions) and read back.
+        """
+        return self._tiles.stats
+
+    def close(self):
+        """
+        Deletes the spilled tiles.
+        """
+        self._tiles.clear()
+        self._drawn.clear()
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None